@@ -0,0 +1,429 @@
+"""Benchmark suite for across.
+
+``reduction`` times :class:`across.ERA` and :class:`across.RandomizedERA` on synthetic impulse
+responses of increasing length, separately for the setup (Hankel operator, reductor) and the
+reduction to a given order. ``matvec`` measures the throughput of the products and adjoint products
+of :class:`~across.fastoperators.StreamingHankelOperator`, the Hankel operator of
+:class:`across.RandomizedERA`, against pymor's ``NumpyHankelOperator``. ``outofcore`` reduces
+impulse responses stored in ``.npy`` files with :class:`across.RandomizedERA`, once memory-mapped
+with the Hankel spectrum on disk and once loaded into memory. All reductions report the peak memory
+allocated during setup and first reduction.
+``precision`` simulates models reduced with :class:`across.ERA` with the compact
+matrices of :class:`ssmsolve.models.QuantizedStateSpaceModel` and reports their throughput and
+output error against the full-precision ``float64`` model. Formats whose rounding makes the model
+unstable are reported without timing. ``hybrid`` plans :class:`across.HybridModel` splits of
+impulse responses with a dense early part for several tolerances with :func:`across.plan_hybrid`
+and compares their throughput and output error with pure partitioned convolution. ``dataset``
+reduces a directory of ``.npy`` files with :func:`across.reduce_dataset`, once in a loop in this
+process and with worker processes of fewer threads each, and reports the wall time and the time
+and peak memory per item. ``dtype`` reduces the same impulse responses with
+:class:`across.RandomizedERA` in ``float32`` and ``float64`` from the same random samples and
+reports the time, the peak memory and the size of the Hankel spectrum of both, the relative error
+of both models against the impulse response and the relative difference between their frequency
+responses. Results are stored in a JSON file.
+
+Usage::
+
+    python benchmarks/run.py                        # reduction and matvec suites
+    python benchmarks/run.py --suite matvec --quick -o results.json
+    python benchmarks/run.py --suite outofcore --tmpdir /scratch
+    python benchmarks/run.py --suite precision
+    python benchmarks/run.py --suite hybrid
+    python benchmarks/run.py --suite dataset --tmpdir /scratch
+    python benchmarks/run.py --suite dtype
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+import warnings
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+from across import ERA, HybridModel, RandomizedERA, error_report, plan_hybrid, reduce_dataset
+from across.fastoperators import StreamingHankelOperator
+from pyfar import Signal
+from pymor.operators.numpy import NumpyHankelOperator
+from pymor.tools.random import new_rng
+from ssmsolve.models import QuantizedStateSpaceModel, StateSpaceModel
+
+REDUCTION = {"n_samples": [256, 512, 1024, 2048, 4096], "channels": [(1, 1), (2, 4)], "order": [20, 50]}
+MATVEC = {"n": [1024, 4096, 16384, 65536], "channels": [(1, 1), (4, 4), (2, 16), (32, 64)], "k": [1, 10, 50]}
+QUICK_REDUCTION = {"n_samples": [256, 512], "channels": [(1, 1)], "order": [20]}
+QUICK_MATVEC = {"n": [1024, 4096], "channels": [(1, 1), (4, 4)], "k": [1, 10]}
+OUTOFCORE = {"n_samples": [16384, 65536], "channels": [(4, 256), (4, 1024)], "order": [50]}
+QUICK_OUTOFCORE = {"n_samples": [4096], "channels": [(2, 64)], "order": [20]}
+PRECISION = {"n_samples": [4096], "channels": [(1, 2)], "order": [100, 400, 1000], "duration": 1.0}
+QUICK_PRECISION = {"n_samples": [2048], "channels": [(1, 2)], "order": [50, 200], "duration": 0.1}
+HYBRID = {"n_samples": [4096], "channels": [(1, 2)], "tol": [1e-2, 1e-3], "block_size": 256, "duration": 1.0}
+QUICK_HYBRID = {"n_samples": [1024], "channels": [(1, 1)], "tol": [1e-2], "block_size": 64, "duration": 0.1}
+DATASET = {"items": 32, "n_samples": 4096, "channels": (2, 8), "order": 50, "method": "RandomizedERA"}
+QUICK_DATASET = {"items": 4, "n_samples": 1024, "channels": (1, 2), "order": 10, "method": "RandomizedERA"}
+DTYPE = {"n_samples": [8192, 32768], "channels": [(2, 8), (4, 64)], "order": [100, 200]}
+QUICK_DTYPE = {"n_samples": [2048], "channels": [(1, 4)], "order": [40]}
+SUITES = ("reduction", "matvec", "outofcore", "precision", "hybrid", "dataset", "dtype")
+DTYPES = ("float32", "float64")
+
+
+def impulse_response(n_samples, m, p, order=64, seed=0):
+    """Impulse response of a random stable system of the given order as a pyfar Signal."""
+    rng = np.random.default_rng(seed)
+    poles = 0.995 * rng.uniform(0.5, 1, order // 2) * np.exp(1j * rng.uniform(0, np.pi, order // 2))
+    k = np.arange(n_samples)
+    modes = np.real(poles[:, None] ** k * rng.standard_normal((order // 2, 1)))
+    h = np.einsum("rk,rmp->mpk", modes, rng.standard_normal((order // 2, m, p)))
+    return Signal(h, sampling_rate=48000)
+
+
+def write_impulse_response(path, n_samples, m, p, block=64, **kwargs):
+    """Write an impulse response like :func:`impulse_response` to a ``.npy`` file block by block."""
+    h = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(m, p, n_samples))
+    for i in range(0, p, block):
+        h[:, i : i + block] = impulse_response(n_samples, m, min(block, p - i), seed=i, **kwargs).time
+    h.flush()
+
+
+def reduce_traced(make, order):
+    """Set up a reductor with ``make()`` and reduce it once, return times and the peak memory.
+
+    The peak covers allocations traced by :mod:`tracemalloc`, i.e. Python and NumPy, but not the
+    pages of memory-mapped files.
+    """
+    tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        era = make()
+        t1 = time.perf_counter()
+        era.reduce(order)
+        t2 = time.perf_counter()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return era, t1 - t0, t2 - t1, peak
+
+
+def timings(fn, repeats, min_time=0.5):
+    """Wall-clock times in seconds of at least ``repeats`` calls of ``fn`` over ``min_time`` s."""
+    t = []
+    start = time.perf_counter()
+    while len(t) < repeats or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        fn()
+        t.append(time.perf_counter() - t0)
+    return np.array(t)
+
+
+def stats(t):
+    return {"median": float(np.median(t)), "p10": float(np.percentile(t, 10)), "p90": float(np.percentile(t, 90))}
+
+
+def bench_reduction(grid, repeats):
+    # the numba kernels are compiled on their first call, which is kept out of the timings
+    RandomizedERA(impulse_response(64, 1, 1)).reduce(2)
+    results = []
+    for n_samples in grid["n_samples"]:
+        for m, p in grid["channels"]:
+            ir = impulse_response(n_samples, m, p)
+            for name, cls in (("ERA", ERA), ("RandomizedERA", RandomizedERA)):
+                t_setup = timings(lambda cls=cls, ir=ir: cls(ir), repeats, min_time=0)
+                for order in grid["order"]:
+                    # the reductors cache their SVD, so the first reduction is timed separately
+                    era, _, t_first, peak = reduce_traced(lambda cls=cls, ir=ir: cls(ir), order)
+                    t_reduce = timings(lambda era=era, order=order: era.reduce(order), repeats, min_time=0)
+                    res = {"method": name, "n_samples": n_samples, "m": m, "p": p, "order": order}
+                    res |= {"setup": stats(t_setup), "first_reduce": t_first, "reduce": stats(t_reduce)}
+                    res |= {"peak_memory": peak}
+                    print(
+                        f"{name:>13} N={n_samples:<5} m={m} p={p} r={order:<3} setup {res['setup']['median']:.3g} s, "
+                        f"first reduce {t_first:.3g} s, cached reduce {res['reduce']['median']:.3g} s, "
+                        f"peak memory {peak / 2**20:.1f} MiB"
+                    )
+                    results.append(res)
+    return results
+
+
+def bench_outofcore(grid, tmpdir):
+    results = []
+    for n_samples in grid["n_samples"]:
+        for m, p in grid["channels"]:
+            with tempfile.TemporaryDirectory(dir=tmpdir) as d:
+                path = os.path.join(d, "ir.npy")
+                write_impulse_response(path, n_samples, m, p)
+                makes = {
+                    "memmap": lambda path=path, d=d: RandomizedERA(
+                        np.load(path, mmap_mode="r"), sampling_rate=48000, spectrum_dir=d
+                    ),
+                    "memory": lambda path=path: RandomizedERA(Signal(np.load(path), sampling_rate=48000)),
+                }
+                for mode, make in makes.items():
+                    for order in grid["order"]:
+                        _, t_setup, t_first, peak = reduce_traced(make, order)
+                        res = {"mode": mode, "n_samples": n_samples, "m": m, "p": p, "order": order}
+                        res |= {"dataset": os.path.getsize(path), "setup": t_setup, "first_reduce": t_first}
+                        res |= {"peak_memory": peak}
+                        print(
+                            f"{mode:>6} N={n_samples:<6} m={m} p={p:<5} r={order:<3} "
+                            f"dataset {res['dataset'] / 2**20:.1f} MiB, setup {t_setup:.3g} s, "
+                            f"first reduce {t_first:.3g} s, peak memory {peak / 2**20:.1f} MiB"
+                        )
+                        results.append(res)
+    return results
+
+
+def bench_matvec(grid, dtypes, repeats):
+    rng = np.random.default_rng(0)
+    results = []
+    for n in grid["n"]:
+        for m, p in grid["channels"]:
+            for dtype in dtypes:
+                c = rng.standard_normal((n, p, m)).astype(dtype)
+                # the same block Hankel matrix of n // 2 block rows
+                operators = {
+                    "numpy": NumpyHankelOperator(c[: n // 2], r=c[n // 2 - 1 :]),
+                    "streaming": StreamingHankelOperator(c, n // 2, n - n // 2 + 1),
+                }
+                for k in grid["k"]:
+                    for (impl, op), kind in itertools.product(operators.items(), ("hankel", "adjoint")):
+                        space, product = (op.source, op.apply) if kind == "hankel" else (op.range, op.apply_adjoint)
+                        V = space.from_numpy(rng.standard_normal((space.dim, k)).astype(dtype))
+                        product(V)  # warm-up, includes JIT compilation
+                        t = timings(lambda product=product, V=V: product(V), repeats)
+                        res = {"operator": kind, "impl": impl, "n": n, "m": m, "p": p, "k": k, "dtype": dtype}
+                        res |= {"time": stats(t), "matvecs_per_second": k / float(np.median(t))}
+                        print(
+                            f"{kind:>7} {impl:>9} n={n:<6} m={m:<2} p={p:<2} k={k:<3} {dtype}  "
+                            f"{res['matvecs_per_second']:>10.4g} matvecs/s"
+                        )
+                        results.append(res)
+    return results
+
+
+def bench_precision(grid, repeats):
+    rng = np.random.default_rng(0)
+    results = []
+    for n_samples in grid["n_samples"]:
+        for m, p in grid["channels"]:
+            ir = impulse_response(n_samples, m, p, order=2 * max(grid["order"]))
+            era = ERA(ir)
+            sig = Signal(rng.standard_normal((m, int(grid["duration"] * ir.sampling_rate))), ir.sampling_rate)
+            for order in grid["order"]:
+                ssm = era.reduce(order)
+                ref = StateSpaceModel(ssm.A, ssm.B, ssm.C, ssm.D, sampling_rate=ir.sampling_rate, dtype=np.float64)
+                ref.init_state()
+                y_ref = ref.process(sig).time
+                for dtype in DTYPES:
+                    for matrix_dtype in (None, *QuantizedStateSpaceModel.MATRIX_DTYPES):
+                        kwargs = {"sampling_rate": ir.sampling_rate, "dtype": dtype}
+                        if matrix_dtype is None:
+                            sys = StateSpaceModel(ssm.A, ssm.B, ssm.C, ssm.D, **kwargs)
+                            nbytes = sum(M.nbytes for M in (sys._A, sys._B, sys._C, sys._D))
+                        else:
+                            with warnings.catch_warnings(record=True) as caught:
+                                warnings.simplefilter("always", UserWarning)
+                                sys = QuantizedStateSpaceModel(
+                                    ssm.A, ssm.B, ssm.C, ssm.D, matrix_dtype=matrix_dtype, **kwargs
+                                )
+                            nbytes = sys.nbytes
+                        res = {"n_samples": n_samples, "m": m, "p": p, "order": order, "dtype": dtype}
+                        res |= {"matrices": matrix_dtype or dtype, "matrix_bytes": nbytes}
+                        label = f"r={order:<5} {dtype} matrices {res['matrices']:>8} {nbytes / 2**20:8.2f} MiB  "
+                        if matrix_dtype is not None and caught:
+                            res |= {"relative_error": float("inf"), "samples_per_second": None, "unstable": True}
+                            print(label + "unstable")
+                            results.append(res)
+                            continue
+                        sys.init_state()
+                        y = sys.process(sig).time
+                        error = float(np.linalg.norm(y - y_ref) / np.linalg.norm(y_ref))
+                        error_db = 20 * np.log10(error) if error > 0 else -np.inf
+                        t = timings(lambda sys=sys, sig=sig: sys.process(sig), repeats, min_time=0)
+                        res |= {"relative_error": error, "samples_per_second": sig.n_samples / float(np.median(t))}
+                        print(label + f"{res['samples_per_second']:>10.4g} samples/s  error {error_db:7.1f} dB")
+                        results.append(res)
+    return results
+
+
+def bench_hybrid(grid, repeats):
+    rng = np.random.default_rng(0)
+    N = grid["block_size"]
+    results = []
+    for n_samples in grid["n_samples"]:
+        for m, p in grid["channels"]:
+            # sparse early reflections on top of a smooth modal decay
+            ir = impulse_response(n_samples, m, p)
+            early = n_samples // 8
+            ir.time[..., :early] += rng.standard_normal((m, p, early)) * (rng.uniform(size=early) < 0.05)
+            sig = Signal(rng.standard_normal((m, int(grid["duration"] * ir.sampling_rate))), ir.sampling_rate)
+            fir = HybridModel(ir.time, block_size=N, sampling_rate=ir.sampling_rate)
+            y_ref = fir.process(sig).time
+            fir.init_state()
+            t_fir = timings(lambda fir=fir, sig=sig: fir.process(sig), repeats, min_time=0)
+            fir_rate = sig.n_samples / float(np.median(t_fir))
+            for tol in grid["tol"]:
+                t0 = time.perf_counter()
+                plan = plan_hybrid(ir, tol, block_size=N)
+                t_plan = time.perf_counter() - t0
+                sys = HybridModel.from_ir(ir, plan["head_length"], plan["order"], block_size=N)
+                y = sys.process(sig).time
+                sys.init_state()
+                t = timings(lambda sys=sys, sig=sig: sys.process(sig), repeats, min_time=0)
+                res = {"n_samples": n_samples, "m": m, "p": p, "tol": tol, "block_size": N, "plan_time": t_plan}
+                res |= {key: plan[key] for key in ("head_length", "order", "relative_error", "flops_per_sample")}
+                res |= {"output_error": float(np.linalg.norm(y - y_ref) / np.linalg.norm(y_ref))}
+                res |= {"samples_per_second": sig.n_samples / float(np.median(t)), "fir_samples_per_second": fir_rate}
+                res |= {"fir_flops_per_sample": fir.flops_per_sample, "candidates": plan["candidates"]}
+                print(
+                    f"N={n_samples:<5} m={m} p={p} tol={tol:.0e}: "
+                    f"head {plan['head_length']:>5} order {plan['order']:>4}, "
+                    f"{plan['flops_per_sample']:>8} flops/sample (convolution {fir.flops_per_sample}), "
+                    f"{res['samples_per_second']:>10.4g} samples/s (convolution {fir_rate:.4g}), "
+                    f"output error {res['output_error']:.2e}, planned in {t_plan:.3g} s"
+                )
+                results.append(res)
+    return results
+
+
+def bench_dataset(grid, tmpdir):
+    cpus = os.cpu_count() or 1
+    m, p = grid["channels"]
+    # (workers, threads per worker): a loop in this process on all cores, then worker processes
+    configurations = sorted({(1, cpus), (max(cpus // 2, 1), min(2, cpus)), (cpus, 1)})
+    results = []
+    with tempfile.TemporaryDirectory(dir=tmpdir) as d:
+        inputs = []
+        for i in range(grid["items"]):
+            inputs.append(os.path.join(d, f"item{i:04d}.npy"))
+            np.save(inputs[-1], impulse_response(grid["n_samples"], m, p, seed=i).time.astype(np.float32))
+        for workers, threads in configurations:
+            output_dir = os.path.join(d, f"models-{workers}x{threads}")
+            t0 = time.perf_counter()
+            records = reduce_dataset(
+                inputs,
+                output_dir,
+                48000,
+                order=grid["order"],
+                method=grid["method"],
+                n_workers=workers,
+                threads_per_worker=threads,
+            )
+            wall = time.perf_counter() - t0
+            assert all(r["status"] == "done" for r in records), [r.get("error") for r in records]
+            res = {"workers": workers, "threads_per_worker": threads, "items": len(records), "wall": wall}
+            res |= {"items_per_second": len(records) / wall}
+            res |= {"seconds": stats([r["seconds"] for r in records])}
+            res |= {"peak_memory": stats([r["peak_memory"] for r in records])}
+            print(
+                f"{workers:>3} workers x {threads:>2} threads: {wall:8.3g} s, {res['items_per_second']:7.3g} items/s, "
+                f"{res['seconds']['median']:.3g} s and {res['peak_memory']['median'] / 2**20:.1f} MiB per item"
+            )
+            results.append(res)
+    return results
+
+
+def bench_dtype(grid):
+    # the numba kernels are compiled on their first call, which is kept out of the timings
+    for dtype in DTYPES:
+        RandomizedERA(impulse_response(64, 1, 1), dtype=dtype).reduce(2)
+    results = []
+    for n_samples in grid["n_samples"]:
+        for m, p in grid["channels"]:
+            ir = impulse_response(n_samples, m, p, order=2 * max(grid["order"]))
+            frequencies = np.fft.rfftfreq(n_samples, 1 / ir.sampling_rate)
+            for order in grid["order"]:
+                res, H = {"n_samples": n_samples, "m": m, "p": p, "order": order}, {}
+                for dtype in DTYPES:
+                    # the same random samples for both precisions
+                    with new_rng(0):
+                        era, t_setup, t_reduce, peak = reduce_traced(
+                            lambda dtype=dtype, ir=ir: RandomizedERA(ir, dtype=dtype), order
+                        )
+                        ssm = era.reduce(order)
+                    report = error_report(ssm, ir)
+                    sys = StateSpaceModel(ssm.A, ssm.B, ssm.C, ssm.D, sampling_rate=ir.sampling_rate, dtype=np.float64)
+                    H[dtype] = sys.frequency_response(frequencies)
+                    res[dtype] = {"setup": t_setup, "reduce": t_reduce, "peak_memory": peak}
+                    res[dtype] |= {"spectrum_bytes": era.reductor._H.spectrum.nbytes, "order": ssm.n_states}
+                    res[dtype] |= {key: report[key] for key in ("relative_error", "max_error_db")}
+                single, double = res["float32"], res["float64"]
+                res["difference"] = float(np.linalg.norm(H["float32"] - H["float64"]) / np.linalg.norm(H["float64"]))
+                res["speedup"] = (double["setup"] + double["reduce"]) / (single["setup"] + single["reduce"])
+                res["memory_ratio"] = single["peak_memory"] / double["peak_memory"]
+                print(
+                    f"N={n_samples:<6} m={m} p={p:<3} r={order:<4} "
+                    f"float32 {single['setup'] + single['reduce']:7.3g} s {single['peak_memory'] / 2**20:7.1f} MiB, "
+                    f"float64 {double['setup'] + double['reduce']:7.3g} s {double['peak_memory'] / 2**20:7.1f} MiB "
+                    f"({res['speedup']:.2f}x faster, {res['memory_ratio']:.2f} of the memory), "
+                    f"error {single['relative_error']:.2e} / {double['relative_error']:.2e}, "
+                    f"difference {res['difference']:.2e}"
+                )
+                results.append(res)
+    return results
+
+
+def machine_info():
+    def _version(name):
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return None
+
+    blas = np.show_config(mode="dicts").get("Build Dependencies", {}).get("blas", {})
+    return {
+        "node": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numpy_blas": {key: blas.get(key) for key in ("name", "version")},
+        "packages": {name: _version(name) for name in ("across", "ssmsolve", "pymor", "numba", "rocket-fft", "pyfar")},
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", nargs="+", default=["reduction", "matvec"], choices=SUITES)
+    parser.add_argument("--dtype", nargs="+", default=list(DTYPES), choices=DTYPES, help="operator dtypes")
+    parser.add_argument("--repeats", type=int, default=3, help="minimum number of timed calls")
+    parser.add_argument("--quick", action="store_true", help="use small grids")
+    parser.add_argument("--tmpdir", default=None, help="directory for the out-of-core datasets and spectra")
+    parser.add_argument("-o", "--output", default=os.path.join("benchmarks", "results", f"{platform.node()}.json"))
+    args = parser.parse_args()
+
+    config, results = {"repeats": args.repeats}, {}
+    if "reduction" in args.suite:
+        config["reduction"] = QUICK_REDUCTION if args.quick else REDUCTION
+        results["reduction"] = bench_reduction(config["reduction"], args.repeats)
+    if "matvec" in args.suite:
+        config["matvec"] = QUICK_MATVEC if args.quick else MATVEC
+        results["matvec"] = bench_matvec(config["matvec"], args.dtype, args.repeats)
+    if "outofcore" in args.suite:
+        config["outofcore"] = QUICK_OUTOFCORE if args.quick else OUTOFCORE
+        results["outofcore"] = bench_outofcore(config["outofcore"], args.tmpdir)
+    if "precision" in args.suite:
+        config["precision"] = QUICK_PRECISION if args.quick else PRECISION
+        results["precision"] = bench_precision(config["precision"], args.repeats)
+    if "hybrid" in args.suite:
+        config["hybrid"] = QUICK_HYBRID if args.quick else HYBRID
+        results["hybrid"] = bench_hybrid(config["hybrid"], args.repeats)
+    if "dataset" in args.suite:
+        config["dataset"] = QUICK_DATASET if args.quick else DATASET
+        results["dataset"] = bench_dataset(config["dataset"], args.tmpdir)
+    if "dtype" in args.suite:
+        config["dtype"] = QUICK_DTYPE if args.quick else DTYPE
+        results["dtype"] = bench_dtype(config["dtype"])
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"machine": machine_info(), "config": config, "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,25 @@
-from .era import ERA as ERA
-from .era import RandomizedERA as RandomizedERA
+import importlib
+
+# pymor, scipy and numba are imported on first access of these names, not by ``import across``
+_EXPORTS = {
+    "ERA": "across.era",
+    "RandomizedERA": "across.era",
+    "error_report": "across.validation",
+    "HybridModel": "across.hybrid",
+    "plan_hybrid": "across.hybrid",
+    "reduce_dataset": "across.batch",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_EXPORTS])
@@ -0,0 +1,195 @@
+"""Reduction of whole datasets of impulse responses on a pool of worker processes.
+
+:func:`reduce_dataset` reduces one ``.npy`` file of shape ``(n_inputs, n_outputs, n_samples)`` per
+item, e.g. one per source position, and writes every model with :func:`ssmsolve.io.save` as soon
+as it is reduced::
+
+    output_dir/
+        <name>.ssm          the model of <input_dir>/<name>.npy
+        manifest.jsonl      one line per reduced or failed item: order, time, peak memory, error
+
+The inputs are memory-mapped and the model files are renamed into place once complete, so an
+interrupted run is resumed by calling :func:`reduce_dataset` again, which skips the items whose
+model file exists. Every worker limits the threads of numba and of the BLAS libraries to
+``threads_per_worker``, so that ``n_workers`` reductions do not oversubscribe the cores with the
+parallel kernels of every reduction.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+__all__ = ["reduce_dataset"]
+
+MANIFEST = "manifest.jsonl"
+# read by numba and the BLAS libraries when they are loaded
+_THREAD_VARIABLES = ("NUMBA_NUM_THREADS", "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+# the limits of the BLAS libraries of a worker, kept for its lifetime
+_limits = None
+
+
+def reduce_dataset(
+    inputs,
+    output_dir,
+    sampling_rate,
+    order=None,
+    tol=None,
+    method="RandomizedERA",
+    dtype=np.float32,
+    n_workers=None,
+    threads_per_worker=1,
+    options=None,
+    callback=None,
+):
+    """Reduce a dataset of impulse responses to one model file per item.
+
+    Items are submitted largest first to a pool of ``n_workers`` processes, which take the next
+    item as soon as they are done, so that large items do not hold up the end of the run. Each
+    worker memory-maps its impulse response, reduces it, saves the model and reports the time and
+    the peak memory allocated, traced with :mod:`tracemalloc`. A failing item is reported and
+    skipped, it is retried by the next run.
+
+    Parameters
+    ----------
+    inputs : sequence of str
+        Paths of ``.npy`` files of shape ``(n_inputs, n_outputs, n_samples)``. The model of
+        ``<name>.npy`` is written to ``<output_dir>/<name>.ssm``, so the names must be distinct.
+    output_dir : str
+        Directory of the model files and the manifest, created if needed.
+    sampling_rate : float
+        The sampling rate of all impulse responses in Hz.
+    order : int, optional
+        Order of the models, or their maximum order with ``tol``, see
+        :meth:`across.RandomizedERA.reduce`.
+    tol : float, optional
+        Tolerance of the estimated Hankel error, ``'RandomizedERA'`` only.
+    method : {'RandomizedERA', 'ERA'}, optional
+        The reduction. Defaults to ``'RandomizedERA'``.
+    dtype : numpy.dtype, optional
+        Working dtype of the reduction and of the models. Defaults to ``numpy.float32``.
+    n_workers : int, optional
+        Number of worker processes. ``1`` reduces in this process. Defaults to the number of
+        CPUs divided by ``threads_per_worker``.
+    threads_per_worker : int, optional
+        Threads of the numba kernels and of BLAS per worker. Defaults to ``1``.
+    options : dict, optional
+        Further keyword arguments of the reductor, e.g. ``spectrum_dir`` or ``rrf_opts``.
+    callback : callable, optional
+        Called with the record of every item as soon as it is done, e.g. to report progress.
+
+    Returns
+    -------
+    records : list of dict
+        One record per input: ``name``, ``input``, ``output`` and ``status``, which is
+        ``'done'``, ``'skipped'`` if the model file already existed or ``'failed'``. Reduced items
+        additionally report the ``order``, the ``seconds`` spent and the ``peak_memory`` in bytes,
+        failed items the ``error``.
+    """
+    assert method in ("RandomizedERA", "ERA"), "The method must be 'RandomizedERA' or 'ERA'."
+    assert order is not None or tol is not None, "Either the order or the tolerance is required."
+    assert tol is None or method == "RandomizedERA", "A tolerance requires RandomizedERA."
+    names = [os.path.splitext(os.path.basename(path))[0] for path in inputs]
+    assert len(set(names)) == len(names), "The names of the input files must be distinct."
+    os.makedirs(output_dir, exist_ok=True)
+    n_workers = n_workers or max((os.cpu_count() or 1) // threads_per_worker, 1)
+    reduction = {
+        "sampling_rate": sampling_rate,
+        "order": order,
+        "tol": tol,
+        "method": method,
+        "dtype": np.dtype(dtype).name,
+        "options": options or {},
+    }
+
+    records, pending = {}, []
+    for name, path in zip(names, inputs, strict=True):
+        output = os.path.join(output_dir, f"{name}.ssm")
+        if os.path.exists(output):
+            records[name] = {"name": name, "input": path, "output": output, "status": "skipped"}
+        else:
+            pending.append((name, path, output))
+    pending.sort(key=lambda item: os.path.getsize(item[1]), reverse=True)
+
+    with open(os.path.join(output_dir, MANIFEST), "a") as manifest:
+
+        def finish(record):
+            records[record["name"]] = record
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            if callback is not None:
+                callback(record)
+
+        if n_workers == 1:
+            limits = _limit_threads(threads_per_worker)
+            try:
+                for item in pending:
+                    finish(_reduce_item(*item, reduction))
+            finally:
+                if limits is not None:
+                    limits.restore_original_limits()
+        else:
+            with ProcessPoolExecutor(
+                min(n_workers, max(len(pending), 1)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads_per_worker,),
+            ) as pool:
+                futures = [pool.submit(_reduce_item, *item, reduction) for item in pending]
+                for future in as_completed(futures):
+                    finish(future.result())
+    return [records[name] for name in names]
+
+
+def _init_worker(threads):
+    # numba sizes its thread pool from the environment when it is first imported, i.e. by the
+    # first reduction, the BLAS libraries loaded with numpy are limited at runtime
+    for variable in _THREAD_VARIABLES:
+        os.environ[variable] = str(threads)
+    global _limits
+    _limits = _limit_threads(threads)
+
+
+def _limit_threads(threads):
+    return None if threadpool_limits is None else threadpool_limits(threads)
+
+
+def _reduce_item(name, path, output, reduction):
+    """Reduce one impulse response and save its model, return its record."""
+    # imported here, after _init_worker, so that numba starts with the limited number of threads
+    from ssmsolve import io
+    from ssmsolve.models import StateSpaceModel
+
+    from across.era import ERA, RandomizedERA
+
+    record = {"name": name, "input": path, "output": output}
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        ir = np.load(path, mmap_mode="r")
+        if reduction["method"] == "ERA":
+            era = ERA(ir, sampling_rate=reduction["sampling_rate"], **reduction["options"])
+            ssm = era.reduce(reduction["order"])
+        else:
+            era = RandomizedERA(
+                ir, dtype=reduction["dtype"], sampling_rate=reduction["sampling_rate"], **reduction["options"]
+            )
+            ssm = era.reduce(reduction["order"], tol=reduction["tol"])
+        sys = StateSpaceModel(ssm.A, ssm.B, ssm.C, ssm.D, sampling_rate=ssm.sampling_rate, dtype=reduction["dtype"])
+        io.save(sys, output)
+        record |= {"status": "done", "order": sys.n_states}
+    except Exception as error:
+        record |= {"status": "failed", "error": repr(error)}
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return record | {"seconds": time.perf_counter() - t0, "peak_memory": peak}
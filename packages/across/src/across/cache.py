@@ -0,0 +1,154 @@
+"""Content-addressed on-disk cache of Hankel decompositions.
+
+Reducing the same impulse response to different orders, in one process or across runs, repeats the
+most expensive step: the SVD of the Hankel matrix for :class:`~across.ERA` and the randomized range
+basis for :class:`~across.RandomizedERA`. With ``cache=True``, both store these decompositions in a
+:class:`DecompositionCache`, keyed by a hash of the impulse response, the working dtype and the
+reductor options, and load them memory-mapped in later runs. A cached range basis is extended
+incrementally if a larger order is requested.
+
+The default cache lives in ``$ACROSS_CACHE_DIR``, ``$XDG_CACHE_HOME/across`` or ``~/.cache/across``.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+__all__ = ["DecompositionCache", "array_hash", "default_cache", "make_key"]
+
+
+def array_hash(a):
+    """Hash of the shape, dtype and content of ``a``, read row by row along the last axis."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr((a.shape, np.dtype(a.dtype).str)).encode())
+    for idx in np.ndindex(a.shape[:-1]):
+        h.update(np.ascontiguousarray(a[idx]).data)
+    return h.hexdigest()
+
+
+def make_key(**fields):
+    """Cache key of the JSON-serialisable ``fields``."""
+    return hashlib.blake2b(json.dumps(fields, sort_keys=True).encode(), digest_size=20).hexdigest()
+
+
+class DecompositionCache:
+    """Directory of decompositions with least recently used eviction by total size.
+
+    Every entry is a subdirectory named by its key with one ``.npy`` file per array and a
+    ``meta.json`` file, whose modification time marks the last access.
+
+    Parameters
+    ----------
+    path : str, optional
+        Cache directory. Defaults to ``$ACROSS_CACHE_DIR``, ``$XDG_CACHE_HOME/across`` or
+        ``~/.cache/across``.
+    max_bytes : int, optional
+        Total size above which the least recently used entries are removed. Defaults to 8 GiB.
+
+    """
+
+    def __init__(self, path=None, max_bytes=2**33):
+        if path is None:
+            path = os.environ.get("ACROSS_CACHE_DIR")
+        if path is None:
+            path = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "across")
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def load(self, key):
+        """Return ``(arrays, meta)`` of the entry ``key`` or ``None`` if there is none.
+
+        The arrays are memory-mapped copy-on-write, so they can be modified in memory without
+        touching the cache.
+        """
+        entry = os.path.join(self.path, key)
+        try:
+            with open(os.path.join(entry, "meta.json")) as f:
+                meta = json.load(f)
+            arrays = {name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="c") for name in meta["arrays"]}
+            os.utime(os.path.join(entry, "meta.json"))
+        except (OSError, ValueError, KeyError):
+            return None
+        return arrays, meta
+
+    def save(self, key, arrays, meta=None):
+        """Store the dict of ``arrays`` and the JSON-serialisable ``meta`` as entry ``key``.
+
+        An entry larger than ``max_bytes`` on its own is not stored, and a previous entry
+        ``key`` is kept. Returns whether the entry was stored.
+        """
+        meta = dict(meta or {}, arrays=list(arrays))
+        entry = os.path.join(self.path, key)
+        tmp, old = f"{entry}.tmp-{os.getpid()}", f"{entry}.old-{os.getpid()}"
+        with self._lock:
+            # write to a temporary directory first, so readers never see a partial entry
+            os.makedirs(tmp, exist_ok=True)
+            for name, a in arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(a))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            if _size(tmp) > self.max_bytes:
+                shutil.rmtree(tmp, ignore_errors=True)
+                return False
+            if os.path.exists(entry):
+                os.rename(entry, old)
+            os.rename(tmp, entry)
+            shutil.rmtree(old, ignore_errors=True)
+            self._evict(keep=key)
+        return True
+
+    def entries(self):
+        """List ``(key, size in bytes, last access)`` of all entries, least recently used first."""
+        entries = []
+        if not os.path.isdir(self.path):
+            return entries
+        for key in os.listdir(self.path):
+            entry = os.path.join(self.path, key)
+            meta = os.path.join(entry, "meta.json")
+            if "." in key or not os.path.exists(meta):
+                continue
+            entries.append((key, _size(entry), os.path.getmtime(meta)))
+        return sorted(entries, key=lambda e: e[2])
+
+    @property
+    def nbytes(self):
+        """Total size of all entries in bytes."""
+        return sum(size for _, size, _ in self.entries())
+
+    def _evict(self, keep):
+        """Remove the least recently used entries other than ``keep`` until the total fits."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+                total -= size
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            for key, _, _ in self.entries():
+                shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+
+
+def _size(entry):
+    """Size of the files of the entry directory ``entry`` in bytes."""
+    return sum(f.stat().st_size for f in os.scandir(entry))
+
+
+def default_cache():
+    """The cache used by ``cache=True``, created on first use."""
+    global _default
+    if _default is None:
+        _default = DecompositionCache()
+    return _default
+
+
+_default = None
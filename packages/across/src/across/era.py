@@ -1,9 +1,19 @@
+import time
+
 import numpy as np
+import scipy.linalg as spla
+from pyfar import Signal
 from pyfar.classes.filter import StateSpaceModel
+from pymor.algorithms.chol_qr import BasicShiftedCholQRKernel, RecomputedShiftedCholQRKernel
 from pymor.algorithms.rand_la import RandomizedRangeFinder
+from pymor.algorithms.to_matrix import to_matrix
+from pymor.core.exceptions import AccuracyError
 from pymor.reductors.era import ERAReductor, RandomizedERAReductor
+from pymor.tools.random import get_rng
+from ssmsolve.instrumentation import stage
 
-from across.fastoperators import NumbaHankelOperator
+from across.cache import DecompositionCache, array_hash, default_cache, make_key
+from across.fastoperators import StreamingHankelOperator
 
 
 class ERA:
@@ -14,18 +24,28 @@ class ERA:
 
     Parameters
     ----------
-    ir : pyfar.Signal
-        The impulse response to be reduced. Must be a `pyfar.Signal` with `cdim=2`, where
-        `ir.cshape=(n_inputs, n_outputs)`.
+    ir : pyfar.Signal or numpy.ndarray
+        The impulse response to be reduced. Either a `pyfar.Signal` with `cdim=2`, where
+        `ir.cshape=(n_inputs, n_outputs)`, or an array of shape `(n_inputs, n_outputs, n_samples)`,
+        e.g. a `numpy.memmap` of a dataset on disk.
+    sampling_rate : float, optional
+        The sampling rate in Hz. Required if `ir` is an array.
+    cache : bool or across.cache.DecompositionCache, optional
+        Store the SVD of the Hankel matrix on disk and load it in later runs on the same impulse
+        response, see :mod:`across.cache`. `True` uses the default cache. Defaults to `False`.
 
     """
 
-    def __init__(self, ir):
-        self.reductor = ERAReductor(
-            ir.time.T[1:],
-            sampling_time=1 / ir.sampling_rate,
-            feedthrough=ir.time[..., -1].T,
+    def __init__(self, ir, sampling_rate=None, cache=False):
+        data, feedthrough, sampling_rate = _markov_parameters(ir, sampling_rate)
+        cache = _cache(cache)
+        self.reductor = _CachedERAReductor(
+            data,
+            sampling_time=1 / sampling_rate,
+            feedthrough=feedthrough,
             force_stability=False,
+            cache=cache,
+            key=None if cache is None else {"method": "ERA", "data": array_hash(data.T)},
         )
 
     def reduce(self, order):
@@ -42,7 +62,92 @@ class ERA:
             The state-space matrices of the reduced model.
 
         """
-        return StateSpaceModel(self.reductor.reduce(order).to_matrices()[:4], 1 / self.reductor.sampling_time)
+        with stage(type(self).__name__, "realization", **self.reductor._tags):
+            matrices = self.reductor.reduce(order).to_matrices()[:4]
+        return StateSpaceModel(*matrices, 1 / self.reductor.sampling_time)
+
+
+def _markov_parameters(ir, sampling_rate):
+    """Markov parameters as a view of the impulse response, feedthrough and sampling rate."""
+    if isinstance(ir, Signal):
+        time, sampling_rate = ir.time, ir.sampling_rate
+    else:
+        assert sampling_rate is not None, "The sampling rate is required for impulse responses given as arrays."
+        time = ir
+    assert time.ndim == 3, "The impulse response must be of shape (n_inputs, n_outputs, n_samples)."
+    # the first sample is the feedthrough, the transpose is a view, memory-mapped data stays on disk
+    return time.T[1:], np.array(time[..., 0].T), sampling_rate
+
+
+def _cache(cache):
+    if cache is True:
+        return default_cache()
+    assert cache is False or cache is None or isinstance(cache, DecompositionCache)
+    return cache or None
+
+
+def _mixed_chol_qr(Q, offset, maxiter=3, orth_tol=None, recompute_shift=False, check_finite=True):
+    """Orthonormalize `Q[offset:]` against `Q[:offset]` with shifted CholeskyQR in float64.
+
+    Follows pymor's `shifted_chol_qr` for a basis in single precision. The new vectors are kept in
+    float64 while they are orthonormalized and the Gramian is factorized in float64, so samples
+    whose condition number exceeds the inverse precision of the basis do not break down. They are
+    projected out of the existing basis, in its dtype, before every Gramian, which keeps the
+    Gramian positive semidefinite. Returns the `R` factor in float64.
+    """
+    basis = Q[:offset].to_numpy()
+    chol = (RecomputedShiftedCholQRKernel if recompute_shift else BasicShiftedCholQRKernel)(
+        Q.dim, check_finite=check_finite
+    )
+
+    def project(A):
+        B = basis.T @ A.astype(basis.dtype)
+        A -= basis @ B
+        return B.astype(np.float64), A
+
+    B, A = project(Q[offset:].to_numpy().astype(np.float64))
+    R, X = np.eye(len(Q)), A.T @ A
+    R[:offset, offset:] = B
+    for _ in range(maxiter):
+        Rx = chol.apply(X)
+        A = A @ spla.solve_triangular(Rx, np.eye(len(Rx)), check_finite=check_finite)
+        R[offset:, offset:] = Rx @ R[offset:, offset:]
+        B, A = project(A)
+        R[:offset, offset:] += B @ R[offset:, offset:]
+        X = A.T @ A
+        if orth_tol is not None and spla.norm(X - np.eye(len(X))) <= orth_tol * np.sqrt(len(Q)):
+            break
+    else:
+        if orth_tol is not None:
+            raise AccuracyError("Orthonormality could not be achieved within the given tolerance.")
+    del Q[offset:]
+    Q.append(Q.space.make_array(A.astype(basis.dtype)))
+    return R
+
+
+class _CachedERAReductor(ERAReductor):
+    def __init__(self, data, sampling_time, force_stability=True, feedthrough=None, cache=None, key=None):
+        super().__init__(data, sampling_time, force_stability=force_stability, feedthrough=feedthrough)
+        self.cache, self.key = cache, key
+        self._tags = {"dtype": np.dtype(data.dtype).name}
+
+    def _sv_U_V(self, num_left, num_right):
+        if self.cache is None:
+            # pymor assembles the Hankel matrix and decomposes it in one step
+            with stage("ERA", "svd", **self._tags):
+                return super()._sv_U_V(num_left, num_right)
+        key = make_key(**self.key, force_stability=self.force_stability, num_left=num_left, num_right=num_right)
+        with stage("ERA", "cache", **self._tags):
+            entry = self.cache.load(key)
+        if entry is not None:
+            self.logger.info("Loading SVD of the Hankel matrix from cache ...")
+            arrays, _ = entry
+            return arrays["sv"], arrays["U"], arrays["V"]
+        with stage("ERA", "svd", **self._tags):
+            sv, U, V = super()._sv_U_V(num_left, num_right)
+        with stage("ERA", "cache", **self._tags):
+            self.cache.save(key, {"sv": sv, "U": U, "V": V})
+        return sv, U, V
 
 
 class _NumbaRandomizedERAReductor(RandomizedERAReductor):
@@ -56,44 +161,269 @@ class _NumbaRandomizedERAReductor(RandomizedERAReductor):
         rrf_opts={},  # noqa: B006
         num_left=None,
         num_right=None,
+        dtype=None,
+        block_size=None,
+        spectrum_dir=None,
+        cache=None,
+        key=None,
     ):
         super(RandomizedERAReductor, self).__init__(
             data, sampling_time, force_stability=force_stability, feedthrough=feedthrough
         )
         self.__auto_init(locals())
-        # data = data.copy()
-        if num_left is not None or num_right is not None:
-            self.logger.info("Computing the projected Markov parameters ...")
-            data = self._project_markov_parameters(num_left, num_right)
-        if self.force_stability:
-            data = np.concatenate([data, np.zeros_like(data)[1:]], axis=0)
-        s = (data.shape[0] + 1) // 2
-        self._transpose = (data.shape[1] < data.shape[2]) if allow_transpose else False
-        self._H = NumbaHankelOperator(data[:s], r=data[s - 1 :])
+        self._tags = {"dtype": np.dtype(dtype or np.float64).name}
+        with stage("RandomizedERA", "hankel", **self._tags):
+            if num_left is not None or num_right is not None:
+                self.logger.info("Computing the projected Markov parameters ...")
+                data = self._project_markov_parameters(num_left, num_right)
+            # the zero padding of the stable formulation is implicit in the Hankel shape
+            n = data.shape[0]
+            rows, cols = (n, n) if self.force_stability else ((n + 1) // 2, n - (n + 1) // 2 + 1)
+            self._transpose = (data.shape[1] < data.shape[2]) if allow_transpose else False
+            self._h, self._shape, self._norm = data, (rows, cols), None
+            self.logger.info("Computing the spectrum of the Markov parameters ...")
+            self._H = StreamingHankelOperator(
+                data, rows, cols, dtype=dtype, block_size=block_size, spectrum_dir=spectrum_dir
+            )
+        self.logger.info(
+            f"Hankel spectrum: {self._H.spectrum.nbytes / 2**20:.1f} MiB "
+            f"{'in memory' if spectrum_dir is None else 'on disk'}."
+        )
         if self._transpose:
             self.logger.info("Using transposed formulation.")
             self._H = self._H.H
 
         # monkey patch RRF with dtype of data for memory efficiency
-        dtype = data.dtype
+        dtype = self._H.dtype
+        # basis size and SVD of the last projection, see _projected_svd
         self._last_sv_U_V = None
         self._rrf = RandomizedRangeFinder(self._H, **rrf_opts)
         self._rrf.Omega = self._rrf.A.range.make_array(np.empty((self._rrf.A.range.dim, 0), dtype=dtype))
-        self._rrf.estimator_last_basis_size, self.last_estimated_error = 0, np.inf
+        self._rrf.estimator_last_basis_size, self._rrf.last_estimated_error = 0, np.inf
         self._rrf.Q = [
             self._rrf.A.range.make_array(np.empty((self._rrf.A.range.dim, 0), dtype=dtype))
             for _ in range(self._rrf.power_iterations + 1)
         ]
         self._rrf.R = [np.empty((0, 0), dtype=dtype) for _ in range(self._rrf.power_iterations + 1)]
         self._rrf._draw_samples = self._draw_samples
+        self._rrf._qr_update = self._qr_update
+        self._rrf.find_range = self._find_range
+        self._cached_basis_size = 0
+        if cache is not None:
+            self._key = make_key(
+                **key,
+                dtype=np.dtype(dtype).name,
+                force_stability=self.force_stability,
+                transpose=self._transpose,
+                rrf_opts=rrf_opts,
+                num_left=num_left,
+                num_right=num_right,
+            )
+            self._restore_basis()
+
+    def _restore_basis(self):
+        with stage("RandomizedERA", "cache", **self._tags):
+            entry = self.cache.load(self._key)
+        if entry is None:
+            return
+        arrays, meta = entry
+        rrf = self._rrf
+        self.logger.info(f"Loading range basis of size {meta['basis_size']} from cache ...")
+        rrf.Q = [rrf.A.range.make_array(arrays[f"Q{i}"]) for i in range(len(rrf.Q))]
+        rrf.R = [arrays[f"R{i}"] for i in range(len(rrf.R))]
+        rrf.Omega = rrf.A.range.make_array(arrays["Omega"])
+        rrf.estimator_last_basis_size = meta["estimator_last_basis_size"]
+        rrf.last_estimated_error = meta["last_estimated_error"]
+        self._cached_basis_size = meta["basis_size"]
+
+    def _store_basis(self):
+        rrf = self._rrf
+        arrays = {f"Q{i}": Q.to_numpy() for i, Q in enumerate(rrf.Q)}
+        arrays |= {f"R{i}": R for i, R in enumerate(rrf.R)}
+        arrays["Omega"] = rrf.Omega.to_numpy()
+        meta = {
+            "basis_size": len(rrf.Q[-1]),
+            "estimator_last_basis_size": int(rrf.estimator_last_basis_size),
+            "last_estimated_error": float(rrf.last_estimated_error),
+        }
+        with stage("RandomizedERA", "cache", **self._tags):
+            self.cache.save(self._key, arrays, meta)
+        self._cached_basis_size = meta["basis_size"]
+
+    def _update_cache(self):
+        # the range finder extends the basis incrementally, store it whenever it has grown
+        if self.cache is not None and len(self._rrf.Q[-1]) > self._cached_basis_size:
+            self._store_basis()
+
+    def reduce_order(self, order):
+        """Reduce to the given order with a range basis of at least `order` vectors.
+
+        The basis is extended block by block to `order` vectors if it is smaller, e.g. after a
+        reduction to a lower order, and the truncated SVD of the projection onto the whole basis
+        is realized. If the extension breaks down because the range is captured in working
+        precision, the order is limited to the size of the basis.
+
+        Returns
+        -------
+        (A, B, C, D) : tuple of ndarray
+            The state-space matrices of the reduced model in the working dtype.
+
+        """
+        with stage("RandomizedERA", "realization", **self._tags):
+            rrf = self._rrf
+            order = min(order, rrf.A.range.dim, rrf.A.source.dim)
+            while len(rrf.Q[-1]) < order and self._extend_basis(order):
+                pass
+            self._update_cache()
+            sv, U, V = self._projected_svd()
+            order = min(order, len(sv))
+            self.logger.info(f"Constructing reduced realization of order {order} ...")
+            return self._realization(sv[:order], U[:, :order], V[:, :order])
+
+    def _extend_basis(self, max_size):
+        """Extend the range basis by one block of at most `max_size` vectors in total.
+
+        Returns `False` if the extension broke down, in which case the basis is left unchanged.
+        """
+        rrf = self._rrf
+        sizes, n_samples = [len(Q) for Q in rrf.Q], len(rrf.Omega)
+        try:
+            rrf.find_range(basis_size=min(sizes[-1] + (rrf.block_size or 1), max_size))
+        except (AccuracyError, ValueError):
+            # the new samples are numerically in the span of the basis, so the range is
+            # captured in working precision, restore the last consistent state
+            self.logger.warning("Basis extension broke down, the range is exhausted in working precision.")
+            rrf.Q = [Q[:k] for Q, k in zip(rrf.Q, sizes, strict=True)]
+            rrf.R = [R[:k, :k] for R, k in zip(rrf.R, sizes, strict=True)]
+            rrf.Omega = rrf.Omega[:n_samples]
+            return False
+        return True
+
+    def _projected_svd(self):
+        """SVD ``sv, U, V`` of the projection ``Q Q^T H`` of the Hankel matrix onto the range basis.
+
+        The product ``H^T Q`` runs in the working dtype like all products of the range finder, but
+        has only as many columns as the basis, so it is decomposed in float64 and the singular
+        vectors are returned in float64, which keeps the shift invariance of `U` exact enough
+        for the poles of a float32 basis. Cached for the size of the basis.
+        """
+        Q = self._rrf.Q[-1]
+        if self._last_sv_U_V is not None and self._last_sv_U_V[0] == len(Q):
+            return self._last_sv_U_V[1]
+        # SVD of the projection Q Q^T H = Q (H^T Q)^T
+        with stage("RandomizedERA", "svd", **self._tags):
+            W, sv, Zh = spla.svd(self._H.apply_adjoint(Q).to_numpy().astype(np.float64), full_matrices=False)
+            U, V = Q.to_numpy() @ Zh.T, W
+        if self._transpose:  # switch back, if transposed formulation was used
+            U, V = V, U
+        self._last_sv_U_V = (len(Q), (sv, U, V))
+        return sv, U, V
+
+    def _hankel_norm(self):
+        """Frobenius norm of the Hankel matrix, accumulated in chunks of Markov parameters."""
+        if self._norm is None:
+            h, (rows, cols) = self._h, self._shape
+            k = np.arange(len(h))
+            # number of occurrences of every Markov parameter in the Hankel matrix
+            eta = np.minimum(np.minimum(k + 1, rows + cols - 1 - k), min(rows, cols))
+            step = max(1, 2**22 // (h.shape[1] * h.shape[2]))
+            sq = [np.square(h[i : i + step], dtype=np.float64).sum(axis=(1, 2)) for i in range(0, len(h), step)]
+            self._norm = float(np.sqrt(eta @ np.concatenate(sq)))
+        return self._norm
+
+    def reduce_tol(self, tol, max_order=None):
+        """Reduce to the smallest order whose estimated relative Hankel error is below `tol`.
+
+        The range basis is extended block by block until the leave-one-out estimate of the
+        Frobenius norm of the range approximation error, relative to the Frobenius norm of the
+        Hankel matrix, drops below `tol`. The order is then chosen by adding the singular values
+        discarded by the truncation to the estimated error.
+
+        Parameters
+        ----------
+        tol : float
+            Relative error tolerance.
+        max_order : int, optional
+            Upper limit of the basis size and the order. Defaults to no limit.
+
+        Returns
+        -------
+        (A, B, C, D) : tuple of ndarray
+            The state-space matrices of the reduced model.
+        history : list of dict
+            Basis size, number of samples drawn, estimated relative error and time in seconds of
+            every block.
+
+        """
+        with stage("RandomizedERA", "realization", **self._tags):
+            return self._reduce_tol(tol, max_order)
+
+    def _reduce_tol(self, tol, max_order):
+        rrf = self._rrf
+        assert rrf.error_estimator == "loo", "The tolerance requires the leave-one-out error estimator."
+        max_order = min(max_order or np.inf, rrf.A.range.dim, rrf.A.source.dim)
+        tol = tol * self._hankel_norm()
+        error, history = rrf.estimate_error(), []
+        while error > tol and len(rrf.Q[-1]) < max_order:
+            t0 = time.perf_counter()
+            if not self._extend_basis(max_order):
+                break
+            error = rrf.estimate_error()
+            history.append(
+                {
+                    "basis_size": len(rrf.Q[-1]),
+                    "samples": len(rrf.Omega),
+                    "error": float(error / self._hankel_norm()),
+                    "time": time.perf_counter() - t0,
+                }
+            )
+            self.logger.info(
+                f"Basis size {history[-1]['basis_size']}: estimated relative error {history[-1]['error']:.3e}."
+            )
+        self._update_cache()
+
+        sv, U, V = self._projected_svd()
+        # estimated error of every order r = 0, ..., len(sv)
+        errors = np.sqrt(error**2 + np.append(np.cumsum(sv[::-1] ** 2)[::-1], 0))
+        r = max(int(np.argmax(errors <= tol)), 1) if errors[-1] <= tol else len(sv)
+        self.logger.info(f"Constructing reduced realization of order {r} ...")
+        return self._realization(sv[:r], U[:, :r], V[:, :r]), history
+
+    def _realization(self, sv, U, V):
+        # solved in the precision of the singular vectors, returned in the working dtype
+        _, p, m = self.data.shape
+        p, m = self.num_left or p, self.num_right or m
+        sqsv = np.sqrt(sv)
+        U, V = U * sqsv, V * sqsv
+        A = spla.lstsq(U[:-p], U[p:])[0]
+        B, C = V[:m].T, U[:p]
+        if self.num_left:
+            C = self.output_projector(self.num_left) @ C
+        if self.num_right:
+            B = B @ self.input_projector(self.num_right).T
+        D = None if self.feedthrough is None else to_matrix(self.feedthrough)
+        return tuple(None if M is None else np.asarray(M, dtype=self._H.dtype) for M in (A, B, C, D))
 
     def _draw_samples(self, num):
-        # faster way of computing the random samples for Hankel matrices
-        self._rrf.logger.info(f"Taking {num} samples ...")
-        dtype = self.data.dtype
-        V = np.zeros((self._H._circulant.source.dim, num), dtype=dtype)
-        V[: self._H.source.dim] = self._H.source.random(num, distribution="normal").to_numpy()
-        return self._H.range.make_array(self._H._circulant._circular_matvec(V)[: self._H.range.dim])
+        with stage("RandomizedERA", "sampling", **self._tags):
+            self._rrf.logger.info(f"Taking {num} samples ...")
+            # drawn in the working dtype instead of converting float64 samples of the same size
+            V = get_rng().standard_normal((self._H.source.dim, num), dtype=self._H.dtype)
+            return self._H.apply(self._H.source.make_array(V))
+
+    def _qr_update(self, Q, R, offset):
+        with stage("RandomizedERA", "qr", **self._tags):
+            if self._rrf.qr_method != "shifted_chol_qr" or np.finfo(self._H.dtype).eps <= np.finfo(np.float64).eps:
+                return RandomizedRangeFinder._qr_update(self._rrf, Q, R, offset)
+            # the Gramian of a float32 block squares its condition number, factorize it in float64
+            _R = _mixed_chol_qr(Q, offset, **self._rrf.qr_opts)
+            _R[:offset, :offset] = R
+            return _R.astype(R.dtype)
+
+    def _find_range(self, *args, **kwargs):
+        # sampling and QR are nested stages, the remainder are the products of the power iterations
+        with stage("RandomizedERA", "power_iterations", **self._tags):
+            return RandomizedRangeFinder.find_range(self._rrf, *args, **kwargs)
 
 
 class RandomizedERA(ERA):
@@ -102,25 +432,103 @@ class RandomizedERA(ERA):
     Wraps pymor's RandomizedERAReductor and adds numba acceleration to provide a
     simple interface for reducing impulse responses in pyFAR format.
 
+    The Hankel matrix is never formed. Its products are computed from the spectrum of the impulse
+    response, which is built block by block from `ir` without copying it, and streamed in blocks of
+    channels. Together with `spectrum_dir`, this reduces datasets that do not fit into memory,
+    given as memory-mapped arrays.
+
+    The spectrum, the random samples, the range basis and all products with the Hankel matrix are
+    kept in `dtype`, so `numpy.float32` halves the memory and its traffic in the FFT products.
+    The Gramians of the QR of the basis, the SVD of the projection onto the basis, which has as
+    many columns as the basis, and the realization are computed in float64, the returned
+    matrices are in `dtype`.
+
     Parameters
     ----------
-    ir : pyfar.Signal
-        The impulse response to be reduced. Must be a `pyfar.Signal` with `cdim=2`, where
-        `ir.cshape=(n_inputs, n_outputs)`.
+    ir : pyfar.Signal or numpy.ndarray
+        The impulse response to be reduced. Either a `pyfar.Signal` with `cdim=2`, where
+        `ir.cshape=(n_inputs, n_outputs)`, or an array of shape `(n_inputs, n_outputs, n_samples)`,
+        e.g. a `numpy.memmap` of a dataset on disk.
+    dtype : numpy.dtype, optional
+        The working precision. Defaults to `numpy.float32`.
+    sampling_rate : float, optional
+        The sampling rate in Hz. Required if `ir` is an array.
+    block_size : int, optional
+        Number of channels per block of the Hankel spectrum. Defaults to blocks of about 64 MiB of
+        spectra.
+    spectrum_dir : str, optional
+        Directory of a temporary file holding the Hankel spectrum. Defaults to `None`, i.e. the
+        spectrum is kept in memory.
+    cache : bool or across.cache.DecompositionCache, optional
+        Store the randomized range basis on disk and load it in later runs on the same impulse
+        response, extending it only if a larger order is requested, see :mod:`across.cache`. `True`
+        uses the default cache. Defaults to `False`.
+    rrf_opts : dict, optional
+        Options of pymor's `RandomizedRangeFinder` that override the defaults in `RRF_OPTS`, e.g.
+        the number of basis vectors per block `block_size` or the number of `power_iterations`.
 
     """
 
-    def __init__(self, ir, dtype=np.float32):
+    RRF_OPTS = {
+        "block_size": 50,
+        "power_iterations": 2,
+        "qr_method": "shifted_chol_qr",
+        "error_estimator": "loo",
+        "qr_opts": {"orth_tol": 1e-6, "maxiter": 10},
+    }
+
+    def __init__(
+        self,
+        ir,
+        dtype=np.float32,
+        sampling_rate=None,
+        block_size=None,
+        spectrum_dir=None,
+        cache=False,
+        rrf_opts=None,
+    ):
+        data, feedthrough, sampling_rate = _markov_parameters(ir, sampling_rate)
+        cache = _cache(cache)
+        self.history = []
         self.reductor = _NumbaRandomizedERAReductor(
-            ir.time.T[1:].astype(dtype),
-            sampling_time=1 / ir.sampling_rate,
-            feedthrough=ir.time[..., -1].T,
+            data,
+            sampling_time=1 / sampling_rate,
+            feedthrough=feedthrough if dtype is None else feedthrough.astype(dtype),
             force_stability=True,
-            rrf_opts={
-                "block_size": 50,
-                "power_iterations": 2,
-                "qr_method": "shifted_chol_qr",
-                "error_estimator": "loo",
-                "qr_opts": {"orth_tol": 1e-6, "maxiter": 10},
-            },
+            rrf_opts=self.RRF_OPTS | (rrf_opts or {}),
+            dtype=dtype,
+            block_size=block_size,
+            spectrum_dir=spectrum_dir,
+            cache=cache,
+            key=None if cache is None else {"method": "RandomizedERA", "data": array_hash(data.T)},
         )
+
+    def reduce(self, order=None, tol=None):
+        """Reduce the impulse response to a state-space model of given order or accuracy.
+
+        With `tol`, the randomized range basis is grown block by block until the estimated error
+        of the Hankel approximation meets the tolerance, and the smallest model that meets it is
+        returned. The basis size, the samples drawn, the estimated error and the time of every
+        block are appended to `history`.
+
+        Parameters
+        ----------
+        order : int, optional
+            The desired order of the reduced model if `tol` is `None`, otherwise the maximum order.
+        tol : float, optional
+            Tolerance of the estimated Frobenius norm error of the Hankel matrix, relative to its
+            Frobenius norm.
+
+        Returns
+        -------
+        pyfar.StateSpaceModel
+            The reduced model in the working dtype.
+
+        """
+        assert order is not None or tol is not None, "Either the order or the tolerance is required."
+        if tol is None:
+            matrices = self.reductor.reduce_order(order)
+        else:
+            matrices, history = self.reductor.reduce_tol(tol, max_order=order)
+            self.history += history
+        return StateSpaceModel(*matrices, 1 / self.reductor.sampling_time)
@@ -1,83 +1,296 @@
+import functools
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
 import numba as nb
 import numpy as np
-from pymor.operators.numpy import NumpyCirculantOperator, NumpyHankelOperator
-from scipy.fft import fft, ifft, irfft, rfft
-from scipy.sparse.linalg import LinearOperator
-
-
-class NumbaCirculantOperator(NumpyCirculantOperator):
-    @staticmethod
-    @nb.njit(
-        [
-            nb.float32[:, ::1](
-                nb.int64, nb.int64, nb.int64, nb.int64, nb.float32[:, ::1], nb.float32[:, ::1], nb.complex64[:, :, ::1]
-            ),
-            nb.float64[:, ::1](
-                nb.int64, nb.int64, nb.int64, nb.int64, nb.float64[:, ::1], nb.float64[:, ::1], nb.complex128[:, :, ::1]
-            ),
-        ],
-        parallel=True,
-        fastmath=True,
-    )
-    def _real_ops(m, p, n, d, vec, y, C):
-        dim = d // p
-        for j in range(m):
-            x = vec[j::m]
-            X = rfft(x, axis=0)
-            for i in nb.prange(p):
-                Y = X * C[j, i].reshape(-1, 1)
-                # setting n=n below is necessary to allow uneven lengths but considerably slower
-                # Hankel operator will always pad to even length to avoid that
-                y[i::p] += irfft(Y, n=n, axis=0)[:dim]
-        return y
-
-    @staticmethod
-    def _complex_ops(m, p, n, d, vec, y, C):
-        for j in range(m):
-            x = vec[j::m]
-            X = fft(x, axis=0)
-            for i in range(p):
-                Y = X * C[:, i, j].reshape(-1, 1)
-                Y = ifft(Y, axis=0, overwrite_x=True)
-                y[i::p] += Y[: d // p]
-        return y
-
-    def _circular_matvec(self, vec):
-        n, p, m = self._arr.shape
-        s, k = vec.shape
-        d = self.range.dim
-
-        # use real arithmetic if possible
-        isreal = np.isrealobj(self._arr) and np.isrealobj(vec)
-        ismixed = np.isrealobj(self._arr) and np.iscomplexobj(vec)
-
-        C = self._circulant()
-        if ismixed:
-            l = s // m - C.shape[0] + 1
-            C = np.concatenate([C, C[1:l].conj()[::-1]])
-        C = np.ascontiguousarray(C.T)
-        y = np.zeros((self.range.dim, k), dtype=np.promote_types(self._arr.dtype, vec.dtype))
-        return self._real_ops(m, p, n, d, vec, y, C) if isreal else self._complex_ops(m, p, n, d, vec, y, C)
-
-
-class NumbaHankelOperator(NumpyHankelOperator):
-    def __init__(self, c, r=None, solver=None, name=None):
-        super().__init__(c, r=r, name=name)
-        k, l = self.c.shape[0], self.r.shape[0]
-        n = k + l - 1
-        # zero pad to even length if real to avoid slow irfft
-        z = int(np.isrealobj(self.c) and np.isrealobj(self.r) and n % 2)
-        h = np.concatenate((self.c, self.r[1:], np.zeros([z, *self.c.shape[1:]], dtype=c.dtype)))
-        shift = n // 2 + int(np.ceil((k - l) / 2)) + (n % 2) + z  # this works
-        self._circulant = NumbaCirculantOperator(
-            np.roll(h, shift, axis=0), solver=solver, name=self.name + " (implicit circulant)"
-        )
+from pymor.operators.interface import Operator
+from pymor.vectorarrays.numpy import NumpyVectorSpace
+from scipy.fft import irfft, next_fast_len, rfft
+
+
+def _lazy_njit(signatures, **options):
+    """``numba.njit`` for explicit ``signatures``, compiled on first call and cached on disk.
+
+    Numba compiles all signatures of a dispatcher when it is created. For the parallel kernels of
+    this module, that time would otherwise be paid by every process importing :mod:`across`,
+    whether it uses the kernels or not. With ``cache=True``, later
+    processes load the compiled kernels from numba's cache directory instead.
+    """
+
+    def decorator(func):
+        dispatcher, lock = None, threading.Lock()
+
+        @functools.wraps(func)
+        def kernel(*args):
+            nonlocal dispatcher
+            if dispatcher is None:
+                with lock:
+                    if dispatcher is None:
+                        dispatcher = nb.njit(signatures, cache=True, **options)(func)
+            return dispatcher(*args)
+
+        return kernel
+
+    return decorator
+
+
+class SpectrumCache:
+    """Least recently used cache of Hankel spectra converted to the dtype of a product.
+
+    A :class:`StreamingHankelOperator` stores its spectrum in its working dtype. Products with
+    vectors of a higher precision convert it, which is done once per spectrum and dtype and kept
+    here. Entries are evicted oldest first as soon as their total size exceeds ``max_bytes`` and
+    are removed when their spectrum is garbage collected. Conversions larger than the budget are
+    not cached at all, such spectra are converted block by block in every product instead.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Memory budget in bytes. Defaults to 1 GiB.
+
+    """
+
+    def __init__(self, max_bytes=2**30):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._finalizers = {}
+        # reentrant, a garbage collection within a locked section may discard entries
+        self._lock = threading.RLock()
+
+    def get(self, spectrum, dtype):
+        """Return ``spectrum`` converted to ``dtype``, or ``None`` if that exceeds the budget."""
+        dtype = np.dtype(dtype)
+        if spectrum.size * dtype.itemsize > self.max_bytes:
+            return None
+        key = (id(spectrum), dtype.name)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = np.asarray(spectrum, dtype=dtype)
+        with self._lock:
+            if key not in self._entries:
+                if id(spectrum) not in self._finalizers:
+                    self._finalizers[id(spectrum)] = weakref.finalize(spectrum, self._discard, id(spectrum))
+                self._entries[key] = value
+                self.nbytes += value.nbytes
+                while self.nbytes > self.max_bytes:
+                    _, old = self._entries.popitem(last=False)
+                    self.nbytes -= old.nbytes
+        return value
+
+    def _discard(self, owner):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == owner]:
+                self.nbytes -= self._entries.pop(key).nbytes
+            self._finalizers.pop(owner, None)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+spectrum_cache = SpectrumCache()
+
 
-    def to_scipy_linear_operator(self):
-        def matvec(x):
-            return self.apply(self.source.from_numpy(x.T)).to_numpy().T
+_PRODUCT_SIGNATURES = [
+    nb.void(nb.complex64[:, :, ::1], nb.complex64[:, :, ::1], nb.complex64[:, :, ::1]),
+    nb.void(nb.complex128[:, :, ::1], nb.complex128[:, :, ::1], nb.complex128[:, :, ::1]),
+]
 
-        def rmatvec(x):
-            return self.apply_adjoint(self.range.from_numpy(x.T)).to_numpy().T
 
-        return LinearOperator(shape=(self.range.dim, self.source.dim), matvec=matvec, rmatvec=rmatvec)
+@_lazy_njit(_PRODUCT_SIGNATURES, parallel=True, fastmath=True)
+def _scatter(S, X, Y):
+    # Y[i] += sum_j S[i, j] * X[j], one thread per row of the spectrum block
+    for i in nb.prange(S.shape[0]):
+        for j in range(S.shape[1]):
+            for f in range(S.shape[2]):
+                s = S[i, j, f]
+                for l in range(X.shape[2]):
+                    Y[i, f, l] += s * X[j, f, l]
+
+
+@_lazy_njit(_PRODUCT_SIGNATURES, parallel=True, fastmath=True)
+def _gather(S, X, Y):
+    # Y[j] += sum_i S[i, j] * X[i], one thread per column of the spectrum block
+    for j in nb.prange(S.shape[1]):
+        for i in range(S.shape[0]):
+            for f in range(S.shape[2]):
+                s = S[i, j, f]
+                for l in range(X.shape[2]):
+                    Y[j, f, l] += s * X[i, f, l]
+
+
+class StreamingHankelOperator(Operator):
+    """Block Hankel operator of a sequence of real Markov parameters, applied out-of-core.
+
+    Represents the block Hankel matrix with ``rows x cols`` blocks ``H[a, b] = data[a + b]``, where
+    ``data[k]`` is zero for ``k >= len(data)``, so the zero padding required by the stable
+    formulation of ERA is never allocated. Matrix-vector products are computed as linear
+    convolutions with the spectrum of ``data``, which is computed once in blocks of channels
+    and kept in memory or in a temporary file. ``data`` is only read block by block and may
+    be a :class:`numpy.memmap`.
+
+    The spectrum is stored with the larger of the two channel dimensions first and streamed in
+    blocks of ``block_size`` channels along it for every product, so apart from the spectrum,
+    the memory footprint of a product is that of a few spectra of the vectors. The adjoint
+    :attr:`H` shares the spectrum. Products with vectors of a higher precision than ``dtype`` use
+    a converted copy of the spectrum from :data:`spectrum_cache`.
+
+    Parameters
+    ----------
+    data : numpy.ndarray, shape (n, p, m)
+        Markov parameters, e.g. a view of a memory-mapped impulse response dataset.
+    rows, cols : int
+        Number of block rows and block columns.
+    dtype : numpy.dtype, optional
+        Real working dtype of the spectrum. Defaults to the dtype of ``data``.
+    block_size : int, optional
+        Number of channels per block. Defaults to blocks of about 64 MiB of spectra, including
+        those of the vectors.
+    spectrum_dir : str, optional
+        Directory of the temporary file holding the spectrum. Defaults to ``None``, i.e. the
+        spectrum is kept in memory.
+    adjoint : bool, optional
+        Represent the adjoint (transpose) of the Hankel matrix instead.
+    spectrum : numpy.ndarray, optional
+        Precomputed spectrum to share, i.e. the :attr:`spectrum` attribute of another operator of
+        the same data. Computed from ``data`` by default.
+    name : str, optional
+        Name of the operator.
+
+    """
+
+    linear = True
+
+    def __init__(
+        self,
+        data,
+        rows,
+        cols,
+        dtype=None,
+        block_size=None,
+        spectrum_dir=None,
+        adjoint=False,
+        spectrum=None,
+        name=None,
+    ):
+        assert data.ndim == 3 and np.isrealobj(data)
+        assert 0 < rows and 0 < cols
+        dtype = np.dtype(data.dtype if dtype is None else dtype)
+        assert dtype in (np.float32, np.float64)
+        self.__auto_init(locals())
+        _, p, m = data.shape
+        self.n_fft = next_fast_len(rows + cols - 1, real=True)
+        self._wide = m > p
+        self.spectrum = self._compute_spectrum() if spectrum is None else spectrum
+        if adjoint:
+            self.source, self.range = NumpyVectorSpace(rows * p), NumpyVectorSpace(cols * m)
+        else:
+            self.source, self.range = NumpyVectorSpace(cols * m), NumpyVectorSpace(rows * p)
+
+    def _block(self, k):
+        """Channels per block for products with ``k`` vectors, about 64 MiB of spectra per block."""
+        if self.block_size is not None:
+            return self.block_size
+        _, p, m = self.data.shape
+        itemsize = np.promote_types(self.dtype, np.complex64).itemsize
+        return max(1, 2**26 // ((self.n_fft // 2 + 1) * ((p if self._wide else m) + k) * itemsize))
+
+    def _compute_spectrum(self):
+        n, p, m = self.data.shape
+        n_blocked, n_kept = (m, p) if self._wide else (p, m)
+        shape = (n_blocked, n_kept, self.n_fft // 2 + 1)
+        cdtype = np.promote_types(self.dtype, np.complex64)
+        if self.spectrum_dir is None:
+            S = np.empty(shape, dtype=cdtype)
+        else:
+            # the file is removed as soon as the memory map is released
+            S = np.memmap(tempfile.TemporaryFile(dir=self.spectrum_dir), dtype=cdtype, mode="w+", shape=shape)
+        # entries beyond the last Markov parameter do not contribute, the rest is zero padding
+        n = min(n, self.rows + self.cols - 1)
+        block = self._block(0)
+        for k in range(0, n_blocked, block):
+            blk = slice(k, k + block)
+            h = self.data[:n, :, blk] if self._wide else self.data[:n, blk]
+            H = rfft(np.asarray(h, dtype=self.dtype), n=self.n_fft, axis=0)
+            S[blk] = H.transpose(2, 1, 0) if self._wide else H.transpose(1, 2, 0)
+        if isinstance(S, np.memmap):
+            S.flush()
+        return S
+
+    def _matvec(self, x):
+        _, p, m = self.data.shape
+        n_in, n_out = (self.rows, self.cols) if self.adjoint else (self.cols, self.rows)
+        c_in, c_out = (p, m) if self.adjoint else (m, p)
+        k = x.shape[-1]
+        cdtype = np.promote_types(x.dtype, self.spectrum.dtype)
+        x = x.reshape(n_in, c_in, k)[::-1]
+        y = np.empty((n_out, c_out, k), dtype=x.dtype)
+        # y[t] = sum_s H[t + s] x[s] is the linear convolution of the Markov parameters with the
+        # reversed input, evaluated at t + n_in - 1
+        out = slice(n_in - 1, n_in - 1 + n_out)
+
+        def _spectra(u):
+            return np.ascontiguousarray(rfft(u, n=self.n_fft, axis=0).transpose(1, 0, 2), dtype=cdtype)
+
+        def _signals(U):
+            return irfft(U, n=self.n_fft, axis=1)[:, out].transpose(1, 0, 2)
+
+        spectrum = self.spectrum
+        if spectrum.dtype != cdtype:
+            # converted once and cached, or block by block below if that exceeds the cache budget
+            spectrum = spectrum_cache.get(spectrum, cdtype)
+            spectrum = self.spectrum if spectrum is None else spectrum
+        n_blocked, block = spectrum.shape[0], self._block(k)
+        if self._wide == self.adjoint:
+            # outputs along the blocked dimension: transform all inputs once, then one block of
+            # output channels per spectrum block
+            X = _spectra(x)
+            for i in range(0, n_blocked, block):
+                S = np.asarray(spectrum[i : i + block], dtype=cdtype)
+                Y = np.zeros((S.shape[0], S.shape[2], k), dtype=cdtype)
+                _scatter(S, X, Y)
+                y[:, i : i + S.shape[0]] = _signals(Y)
+        else:
+            # inputs along the blocked dimension: accumulate the spectra of all outputs over the
+            # blocks of input channels
+            Y = np.zeros((spectrum.shape[1], spectrum.shape[2], k), dtype=cdtype)
+            for j in range(0, n_blocked, block):
+                S = np.asarray(spectrum[j : j + block], dtype=cdtype)
+                _gather(S, _spectra(x[:, j : j + S.shape[0]]), Y)
+            y[...] = _signals(Y)
+        return y.reshape(n_out * c_out, k)
+
+    def apply(self, U, mu=None):
+        assert U in self.source
+        x = U.to_numpy()
+        if np.iscomplexobj(x):
+            y = self._matvec(np.ascontiguousarray(x.real)) + 1j * self._matvec(np.ascontiguousarray(x.imag))
+        else:
+            y = self._matvec(x.astype(np.promote_types(x.dtype, self.dtype), copy=False))
+        return self.range.make_array(y)
+
+    def apply_adjoint(self, V, mu=None):
+        assert V in self.range
+        return self.H.apply(V, mu=mu)
+
+    @property
+    def H(self):
+        return StreamingHankelOperator(
+            self.data,
+            self.rows,
+            self.cols,
+            dtype=self.dtype,
+            block_size=self.block_size,
+            spectrum_dir=self.spectrum_dir,
+            adjoint=not self.adjoint,
+            spectrum=self.spectrum,
+            name=self.name + "_adjoint",
+        )
@@ -0,0 +1,388 @@
+"""Hybrid models: partitioned convolution of the head of an impulse response, ERA for its tail.
+
+The early part of a room impulse response, the direct sound and the first reflections, is sparse
+and irregular and needs a high model order, while the late reverberation decays smoothly and is
+well approximated by a small state-space model. :class:`HybridModel` splits the impulse response
+``h`` at ``head_length = L`` samples: the head ``h[..., :L]`` is convolved exactly with a uniformly
+partitioned overlap-save convolution, and the tail ``h[..., L:]`` is reduced with
+:class:`across.ERA` and simulated with :mod:`ssmsolve` on the input delayed by ``L`` samples. Both
+parts are summed sample by sample, so the model streams chunks of any length without latency.
+:func:`plan_hybrid` chooses the split and the order of the tail that minimise the cost per sample
+for a given error.
+"""
+
+import numpy as np
+import scipy.fft as fft
+from pyfar import Signal
+from ssmsolve.models import StateSpaceModel
+
+from across.era import ERA
+from across.validation import error_report
+
+__all__ = ["HybridModel", "plan_hybrid"]
+
+
+class HybridModel:
+    """Impulse response as the sum of a convolution head and a delayed state-space tail.
+
+    The head is split into ``P = ceil(L / block_size)`` partitions of ``block_size`` taps, whose
+    spectra of length ``2 * block_size`` are multiplied with a frequency-domain delay line of the
+    spectra of the past input blocks (uniformly partitioned overlap-save convolution). A complete
+    block costs one forward FFT per input, one inverse FFT per output and ``P`` complex products
+    of the spectra. Chunks that end within a block are handled exactly by transforming the
+    partially filled block, so that the output does not depend on how the input is chunked, at
+    the cost of additional FFTs. Chunks of ``block_size`` samples aligned with the blocks are
+    cheapest.
+
+    The tail is an :class:`ssmsolve.models.StateSpaceModel` whose impulse response approximates
+    ``h[..., L:]``. It runs on the input delayed by ``L`` samples, so that its feedthrough ``D``
+    is the tap ``h[..., L]``.
+
+    Parameters
+    ----------
+    head : numpy.ndarray, shape (n_inputs, n_outputs, L)
+        The first ``L`` taps of the impulse response. ``L`` may be zero.
+    tail : ssmsolve.models.StateSpaceModel, optional
+        The model of the remaining taps. Defaults to ``None``, i.e. the impulse response ends
+        after the head.
+    block_size : int, optional
+        Block size of the partitioned convolution. Defaults to ``256``.
+    sampling_rate : float, optional
+        Sampling rate in Hz. Defaults to that of ``tail``.
+    dtype : numpy.dtype, optional
+        Working dtype of the head, ``float32`` or ``float64``. Defaults to that of ``tail``, or of
+        ``head`` if there is no tail.
+    """
+
+    def __init__(self, head, tail=None, block_size=256, sampling_rate=None, dtype=None):
+        assert isinstance(head, np.ndarray) and head.ndim == 3, "The head must be of shape (n_inputs, n_outputs, L)."
+        assert block_size > 0, "The block size must be positive."
+        m, p, L = head.shape
+        if tail is not None:
+            assert (tail.n_inputs, tail.n_outputs) == (m, p), "The head and the tail do not match."
+            sampling_rate = tail.sampling_rate if sampling_rate is None else sampling_rate
+        dtype = np.dtype(dtype if dtype is not None else tail.dtype if tail is not None else head.dtype)
+        assert dtype in (np.float32, np.float64), "The working dtype must be float32 or float64."
+        self.tail, self.sampling_rate, self.dtype = tail, sampling_rate, dtype
+        self._n_inputs, self._n_outputs, self._head_length, self._block_size = m, p, L, block_size
+
+        # spectra of the partitions, zero-padded to twice the block size, shape (P, p, m, N + 1)
+        N, P = block_size, -(-L // block_size)
+        taps = np.zeros((p, m, P * N), np.float64)
+        taps[..., :L] = np.transpose(head, (1, 0, 2))
+        taps = np.moveaxis(taps.reshape(p, m, P, N), 2, 0)
+        self._spectra = fft.rfft(taps, n=2 * N, axis=-1).astype(np.result_type(dtype, np.complex64))
+        self._block = None
+        self.init_state()
+
+    @classmethod
+    def from_ir(cls, ir, head_length, order, block_size=256, sampling_rate=None, dtype=None, model=None, **kwargs):
+        """Split an impulse response and reduce its tail with :class:`across.ERA`.
+
+        Parameters
+        ----------
+        ir : pyfar.Signal or numpy.ndarray
+            The impulse response of shape `(n_inputs, n_outputs, n_samples)`, see
+            :class:`across.ERA`.
+        head_length : int
+            Number of taps of the head. If it covers the whole impulse response, there is no tail.
+        order : int
+            Order of the tail model. ``0`` drops the tail.
+        block_size : int, optional
+            Block size of the partitioned convolution. Defaults to ``256``.
+        sampling_rate : float, optional
+            The sampling rate in Hz. Required if `ir` is an array.
+        dtype : numpy.dtype, optional
+            Working dtype of head and tail. Defaults to that of the impulse response.
+        model : type, optional
+            Class of the tail model, e.g. :class:`ssmsolve.models.DiagonalStateSpaceModel`.
+            Defaults to :class:`ssmsolve.models.StateSpaceModel`.
+        **kwargs
+            Further keyword arguments of the tail model, e.g. ``backend``.
+
+        Returns
+        -------
+        HybridModel
+        """
+        time, sampling_rate = _time(ir, sampling_rate)
+        dtype = time.dtype if dtype is None else dtype
+        tail = None
+        if head_length < time.shape[-1] and order > 0:
+            ssm = ERA(time[..., head_length:], sampling_rate=sampling_rate).reduce(order)
+            tail = _tail_model(ssm, model, dtype, kwargs)
+        head = np.array(time[..., :head_length], dtype=np.float64)
+        return cls(head, tail, block_size=block_size, sampling_rate=sampling_rate, dtype=dtype)
+
+    @property
+    def n_inputs(self):
+        """Number of inputs."""
+        return self._n_inputs
+
+    @property
+    def n_outputs(self):
+        """Number of outputs."""
+        return self._n_outputs
+
+    @property
+    def head_length(self):
+        """Number of taps of the head, the delay of the tail."""
+        return self._head_length
+
+    @property
+    def block_size(self):
+        """Block size of the partitioned convolution."""
+        return self._block_size
+
+    @property
+    def flops_per_sample(self):
+        """Floating-point operations per sample of head and tail, see :func:`plan_hybrid`."""
+        tail = 0 if self.tail is None else self.tail._flops_per_sample()
+        return _head_flops(self.head_length, self.block_size, self.n_inputs, self.n_outputs) + tail
+
+    def init_state(self):
+        """Reset the input history of head and tail and the state of the tail to zero."""
+        m, p, N = self.n_inputs, self.n_outputs, self.block_size
+        # the window of the overlap-save convolution, the previous block and the current one
+        self._window = np.zeros((m, 2 * N), self.dtype)
+        self._fill = 0
+        # spectra of the windows of the past blocks, a ring buffer with the newest at _position
+        self._delay_line = np.zeros((len(self._spectra), m, N + 1), self._spectra.dtype)
+        self._position = 0
+        # the contribution of the past blocks to the current one
+        self._past = np.zeros((p, N + 1), self._spectra.dtype)
+        self._history = np.zeros((m, self.head_length), self.dtype)
+        if self.tail is not None:
+            self.tail.init_state()
+
+    def process(self, signal):
+        """Process a signal with the hybrid model.
+
+        Parameters
+        ----------
+        signal : pyfar.Signal
+            Input signal with ``cshape = (n_inputs,)``.
+
+        Returns
+        -------
+        pyfar.Signal
+            Output signal with ``cshape = (n_outputs,)``.
+        """
+        assert signal.cshape == (self.n_inputs,), f"The signal needs to be of cshape ({self.n_inputs},)."
+        u = np.asarray(signal.time, dtype=self.dtype)
+        y = np.zeros((self.n_outputs, u.shape[1]), self.dtype)
+        if self.tail is not None:
+            y += self.tail.process(Signal(self._delay(u), signal.sampling_rate)).time
+        self._convolve(u, y)
+        return Signal(y, signal.sampling_rate)
+
+    def init_block(self, n_samples):
+        """Prepare :meth:`process_block` for blocks of ``n_samples`` samples.
+
+        Parameters
+        ----------
+        n_samples : int
+            Block size, ideally :attr:`block_size`.
+
+        Returns
+        -------
+        u : numpy.ndarray, shape (n_inputs, n_samples)
+            Input buffer to be filled by the caller.
+        out : numpy.ndarray, shape (n_outputs, n_samples)
+            Output buffer written by :meth:`process_block`.
+        """
+        self._block = None if self.tail is None else self.tail.init_block(n_samples)
+        u = np.zeros((self.n_inputs, n_samples), self.dtype)
+        out = np.zeros((self.n_outputs, n_samples), self.dtype)
+        return u, out
+
+    def process_block(self, u, out):
+        """Process a block of raw samples into caller-provided memory.
+
+        Streaming counterpart of :meth:`process` without :class:`pyfar.Signal` objects, see
+        :meth:`ssmsolve.models.StateSpaceModel.process_block`. The tail writes into the buffers
+        of :meth:`init_block`, which has to be called once beforehand, the FFTs of the head
+        allocate their results.
+
+        Parameters
+        ----------
+        u : numpy.ndarray, shape (n_inputs, T)
+            Input block.
+        out : numpy.ndarray, shape (n_outputs, T)
+            Output block, overwritten in-place.
+
+        Returns
+        -------
+        out : numpy.ndarray, shape (n_outputs, T)
+            The output block.
+        """
+        if self.tail is None:
+            out[...] = 0
+        else:
+            assert self._block is not None, "Call init_block before process_block."
+            tail_u, tail_out = self._block
+            tail_u[...] = self._delay(u)
+            out[...] = self.tail.process_block(tail_u, tail_out)
+        self._convolve(u, out)
+        return out
+
+    def _delay(self, u):
+        """Input of the tail, ``u`` delayed by the head length."""
+        if self.head_length == 0:
+            return u
+        line = np.concatenate([self._history, u], axis=1)
+        self._history = line[:, -self.head_length :].copy()
+        return line[:, : u.shape[1]]
+
+    def _convolve(self, u, y):
+        """Add the convolution of ``u`` with the head to ``y``, carrying the blocks across calls."""
+        if self.head_length == 0:
+            return
+        N, H0 = self.block_size, self._spectra[0]
+        t, T = 0, u.shape[1]
+        while t < T:
+            # extend the current block as far as possible, its missing samples are still zero
+            r = min(N - self._fill, T - t)
+            start = N + self._fill
+            self._window[:, start : start + r] = u[:, t : t + r]
+            X = fft.rfft(self._window, axis=-1)
+            Y = np.einsum("pif,if->pf", H0, X) + self._past
+            y[:, t : t + r] += fft.irfft(Y, n=2 * N, axis=-1)[:, start : start + r]
+            self._fill += r
+            t += r
+            if self._fill == N:
+                self._advance(X)
+
+    def _advance(self, X):
+        """Push the spectrum ``X`` of the completed block and sum the past for the next one."""
+        N, H = self.block_size, self._spectra
+        self._window[:, :N] = self._window[:, N:]
+        self._window[:, N:] = 0
+        self._fill = 0
+        P = len(H)
+        if P == 1:
+            return
+        position = self._position = (self._position + 1) % P
+        self._delay_line[position] = X
+        # partition k multiplies the spectrum of the block k - 1 before the newest one, which
+        # lies at position - k + 1 modulo P in the ring, i.e. two reversed slices
+        newer = min(position + 1, P - 1)
+        past = np.einsum("kpif,kif->pf", H[1 : 1 + newer], self._delay_line[position::-1][:newer])
+        if newer < P - 1:
+            past += np.einsum("kpif,kif->pf", H[1 + newer :], self._delay_line[: position + 1 : -1])
+        self._past = past
+
+
+def plan_hybrid(ir, tol, block_size=256, head_lengths=None, max_order=None, sampling_rate=None, model=None):
+    """Choose the head length and tail order of a :class:`HybridModel` of least cost.
+
+    For every candidate head length, the tail is reduced with :class:`across.ERA` and the smallest
+    order whose error meets ``tol`` is searched by doubling the order and bisection, using the
+    relative error of :func:`across.error_report` on the tail. As the head is exact, the error of
+    the hybrid model relative to the whole impulse response is that of the tail scaled by the norm
+    of the tail relative to the norm of the impulse response. Among the candidates that meet
+    ``tol``, the one with the fewest floating-point operations per sample is chosen. The cost of
+    the head per sample is that of one real FFT of length ``2 * block_size`` per input and output,
+    taken as ``5 * block_size * log2(2 * block_size)`` operations, and the complex products of
+    ``P`` partitions, divided by the block size. The cost of the tail is that of the state
+    equations of ``model``. Pure convolution, the head covering the whole impulse response, is
+    always a candidate.
+
+    Parameters
+    ----------
+    ir : pyfar.Signal or numpy.ndarray
+        The impulse response of shape `(n_inputs, n_outputs, n_samples)`, see :class:`across.ERA`.
+    tol : float
+        Bound of the error of the hybrid model relative to the norm of the impulse response.
+    block_size : int, optional
+        Block size of the partitioned convolution. Defaults to ``256``.
+    head_lengths : sequence of int, optional
+        Candidate head lengths. Defaults to ``0`` and the powers of two times ``block_size``
+        shorter than the impulse response.
+    max_order : int, optional
+        Largest order of the tail. Defaults to the largest order ERA realizes from the tail.
+    sampling_rate : float, optional
+        The sampling rate in Hz. Required if `ir` is an array.
+    model : type, optional
+        Class of the tail model, see :meth:`HybridModel.from_ir`.
+
+    Returns
+    -------
+    plan : dict
+        ``head_length``, ``order``, ``relative_error`` and ``flops_per_sample`` of the chosen
+        split, to be passed on to :meth:`HybridModel.from_ir`, and ``candidates``, a list of
+        such dicts for all head lengths, with ``order=0`` where the tail is dropped and
+        ``order=None`` where ``tol`` is not met.
+    """
+    time, sampling_rate = _time(ir, sampling_rate)
+    m, p, n_samples = time.shape
+    if head_lengths is None:
+        head_lengths = [0] + [block_size << k for k in range(int(np.log2(max(n_samples / block_size, 1))) + 1)]
+    head_lengths = sorted({min(L, n_samples) for L in head_lengths} | {n_samples})
+    norm = np.linalg.norm(time)
+    assert norm > 0, "The impulse response is zero."
+
+    candidates = []
+    for L in head_lengths:
+        tail = np.asarray(time[..., L:], dtype=np.float64)
+        tail_norm = np.linalg.norm(tail)
+        plan = {"head_length": L, "order": 0, "relative_error": float(tail_norm / norm)}
+        # ERA realizes at most min(m, p) times the number of block rows of the Hankel matrix
+        cap = min(m, p) * (tail.shape[-1] // 2)
+        if tail_norm <= tol * norm:
+            pass  # the tail is dropped
+        elif cap == 0:
+            plan["order"] = None
+        else:
+            era = ERA(tail, sampling_rate=sampling_rate)
+
+            def error(order, era=era, tail=tail, tail_norm=tail_norm):
+                report = error_report(era.reduce(order), tail, sampling_rate=sampling_rate)
+                return float(report["relative_error"] * tail_norm / norm)
+
+            # double the order until the tolerance is met, then bisect, so that the large orders
+            # whose realization and validation dominate the cost are only reached if needed
+            cap = cap if max_order is None else min(max_order, cap)
+            lo, hi, errors = 1, 1, {1: error(1)}
+            while errors[hi] > tol and hi < cap:
+                lo, hi = hi + 1, min(2 * hi, cap)
+                errors[hi] = error(hi)
+            if errors[hi] <= tol:
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    errors[mid] = error(mid)
+                    lo, hi = (lo, mid) if errors[mid] <= tol else (mid + 1, hi)
+                plan["order"] = hi
+            else:
+                plan["order"] = None
+            plan["relative_error"] = errors[hi]
+        plan["flops_per_sample"] = _head_flops(L, block_size, m, p)
+        if plan["order"]:
+            ssm = era.reduce(plan["order"])
+            plan["flops_per_sample"] += _tail_model(ssm, model, np.float64, {})._flops_per_sample()
+        candidates.append(plan)
+
+    feasible = [plan for plan in candidates if plan["order"] is not None]
+    best = min(feasible, key=lambda plan: plan["flops_per_sample"])
+    return dict(best, candidates=candidates)
+
+
+def _time(ir, sampling_rate):
+    if isinstance(ir, Signal):
+        return ir.time, ir.sampling_rate
+    assert sampling_rate is not None, "The sampling rate is required for impulse responses given as arrays."
+    return ir, sampling_rate
+
+
+def _tail_model(ssm, model, dtype, kwargs):
+    model = StateSpaceModel if model is None else model
+    return model(ssm.A, ssm.B, ssm.C, ssm.D, sampling_rate=ssm.sampling_rate, dtype=dtype, **kwargs)
+
+
+def _head_flops(head_length, block_size, n_inputs, n_outputs):
+    """Floating-point operations per sample of the partitioned convolution of a head."""
+    if head_length == 0:
+        return 0
+    N, P = block_size, -(-head_length // block_size)
+    ffts = (n_inputs + n_outputs) * 5 * N * np.log2(2 * N)
+    products = 8 * P * n_inputs * n_outputs * (N + 1)
+    return int((ffts + products) / N)
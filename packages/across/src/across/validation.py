@@ -0,0 +1,74 @@
+"""Validation of reduced models against the impulse responses they approximate."""
+
+import warnings
+
+import numpy as np
+from ssmsolve.models import DiagonalStateSpaceModel
+
+from across.era import _markov_parameters
+
+__all__ = ["error_report"]
+
+
+def error_report(ssm, ir, sampling_rate=None, n_workers=1):
+    """Compare the frequency response of a reduced model with the spectrum of an impulse response.
+
+    The transfer function of `ssm` is evaluated at the DFT bins of `ir` with
+    :meth:`ssmsolve.models.StateSpaceModel.frequency_response`, in modal form if the model is
+    diagonalisable and in Schur form otherwise. Up to the aliasing of the part of the model's
+    impulse response beyond the length of `ir`, the relative errors equal those in the time
+    domain.
+
+    Parameters
+    ----------
+    ssm : pyfar.StateSpaceModel
+        The reduced model, e.g. the result of :meth:`across.ERA.reduce`.
+    ir : pyfar.Signal or numpy.ndarray
+        The impulse response of shape `(n_inputs, n_outputs, n_samples)`, see :class:`across.ERA`.
+    sampling_rate : float, optional
+        The sampling rate in Hz. Required if `ir` is an array.
+    n_workers : int, optional
+        Number of threads evaluating the frequency response. Defaults to `1`.
+
+    Returns
+    -------
+    report : dict
+        ``frequencies``, the DFT bins in Hz, ``relative_error``, the Frobenius norm of the error
+        over all bins and channels relative to that of the impulse response, ``channel_error``,
+        the relative error of every channel of shape `(n_inputs, n_outputs)`, ``spectral_error``,
+        the Frobenius norm of the error in every bin relative to the largest one of the impulse
+        response, and ``max_error_db``, the largest spectral error in dB.
+
+    """
+    _, _, sampling_rate = _markov_parameters(ir, sampling_rate)
+    time = ir.time if hasattr(ir, "time") else ir
+    n_inputs, n_outputs, n_samples = time.shape
+    assert (ssm.n_inputs, ssm.n_outputs) == (n_inputs, n_outputs), "The model and the impulse response do not match."
+    frequencies = np.fft.rfftfreq(n_samples, 1 / sampling_rate)
+
+    with warnings.catch_warnings():
+        # an ill-conditioned modal form falls back to the Schur form
+        warnings.simplefilter("ignore", UserWarning)
+        sys = DiagonalStateSpaceModel(
+            ssm.A, ssm.B, ssm.C, ssm.D, sampling_rate=sampling_rate, dtype=np.float64, n_workers=n_workers
+        )
+    H = sys.frequency_response(frequencies)
+
+    # one input at a time, so that memory-mapped impulse responses are not loaded at once
+    error, norm = np.empty((n_inputs, n_outputs)), np.empty((n_inputs, n_outputs))
+    spectral_error, spectral_norm = np.zeros(len(frequencies)), np.zeros(len(frequencies))
+    for i in range(n_inputs):
+        reference = np.fft.rfft(np.asarray(time[i], dtype=np.float64), axis=-1)
+        e = np.abs(H[:, i] - reference) ** 2
+        error[i], norm[i] = e.sum(axis=-1), (np.abs(reference) ** 2).sum(axis=-1)
+        spectral_error += e.sum(axis=0)
+        spectral_norm += (np.abs(reference) ** 2).sum(axis=0)
+
+    spectral_error = np.sqrt(spectral_error) / np.sqrt(spectral_norm.max())
+    return {
+        "frequencies": frequencies,
+        "relative_error": float(np.sqrt(error.sum() / norm.sum())),
+        "channel_error": np.sqrt(error / np.where(norm > 0, norm, 1)),
+        "spectral_error": spectral_error,
+        "max_error_db": float(20 * np.log10(spectral_error.max())),
+    }
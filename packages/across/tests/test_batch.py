@@ -0,0 +1,71 @@
+"""Tests for across.batch.
+
+:func:`reduce_dataset` runs on two spawned workers with a dataset of two impulse responses and one
+invalid input: the valid items are reduced to model files, the failure is reported without
+stopping the run, and a second run skips the finished items and retries the failed one.
+"""
+
+import json
+import os
+
+import numpy as np
+from across.batch import MANIFEST, reduce_dataset
+from ssmsolve import io
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+_rng = np.random.default_rng(0)
+
+
+def _impulse_response(m=2, p=3, n_samples=80):
+    """Impulse response of a random stable system of order 8."""
+    A = _rng.standard_normal((8, 8))
+    A *= 0.9 / np.max(np.abs(np.linalg.eigvals(A)))
+    B, C = _rng.standard_normal((8, m)), _rng.standard_normal((p, 8))
+    h, x = np.empty((m, p, n_samples)), B
+    for k in range(n_samples):
+        h[..., k] = (C @ x).T
+        x = A @ x
+    return h
+
+
+def _dataset(path):
+    """Two impulse responses and one input that is not of shape (n_inputs, n_outputs, n_samples)."""
+    inputs = []
+    for name, ir in (("left", _impulse_response()), ("right", _impulse_response(n_samples=120)), ("bad", np.ones(5))):
+        inputs.append(str(path / f"{name}.npy"))
+        np.save(inputs[-1], ir)
+    return inputs
+
+
+# ---------------------------------------------------------------------------
+# reduce_dataset
+# ---------------------------------------------------------------------------
+
+
+class TestReduceDataset:
+    def test_failure_and_resume(self, tmp_path):
+        inputs, output_dir = _dataset(tmp_path), tmp_path / "models"
+        options = {"sampling_rate": 48000, "order": 4, "method": "ERA", "dtype": np.float64, "n_workers": 2}
+
+        done = []
+        records = reduce_dataset(inputs, output_dir, callback=done.append, **options)
+        assert [r["name"] for r in records] == ["left", "right", "bad"]
+        assert [r["status"] for r in records] == ["done", "done", "failed"]
+        assert sorted(r["name"] for r in done) == ["bad", "left", "right"]
+        assert "AssertionError" in records[2]["error"]
+        for record in records[:2]:
+            assert record["order"] == 4 and record["seconds"] > 0 and record["peak_memory"] > 0
+            sys = io.load(record["output"])
+            assert (sys.n_states, sys.n_inputs, sys.n_outputs, sys.sampling_rate) == (4, 2, 3, 48000)
+        assert not os.path.exists(records[2]["output"])
+
+        # the second run skips the models and retries the failed item
+        records = reduce_dataset(inputs, output_dir, **options)
+        assert [r["status"] for r in records] == ["skipped", "skipped", "failed"]
+        with open(output_dir / MANIFEST) as f:
+            manifest = [json.loads(line) for line in f]
+        assert [r["name"] for r in manifest].count("bad") == 2
+        assert sorted(r["name"] for r in manifest if r["status"] == "done") == ["left", "right"]
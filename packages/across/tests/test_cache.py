@@ -0,0 +1,154 @@
+"""Tests for across.cache.
+
+:class:`DecompositionCache` is checked for round trips of its entries, the least recently used
+eviction by ``max_bytes`` and entries exceeding the budget on their own. Through the reductors,
+the cached SVD of :class:`across.ERA` is reused and the cached range basis of
+:class:`across.RandomizedERA` is extended incrementally when a larger order is requested.
+"""
+
+import os
+
+import numpy as np
+import pytest
+from across.cache import DecompositionCache, array_hash, make_key
+from across.era import ERA, RandomizedERA
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+_rng = np.random.default_rng(0)
+
+KIB = 1024
+
+
+def _arrays(n_bytes=4 * KIB):
+    """One float64 array of ``n_bytes`` bytes."""
+    return {"a": _rng.standard_normal(n_bytes // 8)}
+
+
+def _touch(cache, key, t):
+    """Set the last access of the entry ``key`` to ``t`` seconds."""
+    os.utime(os.path.join(cache.path, key, "meta.json"), (t, t))
+
+
+def _impulse_response(m=2, p=3, n_samples=120):
+    """Impulse response of a random stable system of order 12."""
+    A = _rng.standard_normal((12, 12))
+    A *= 0.9 / np.max(np.abs(np.linalg.eigvals(A)))
+    B, C = _rng.standard_normal((12, m)), _rng.standard_normal((p, 12))
+    h, x = np.empty((m, p, n_samples)), B
+    for k in range(n_samples):
+        h[..., k] = (C @ x).T
+        x = A @ x
+    return h
+
+
+# ---------------------------------------------------------------------------
+# DecompositionCache
+# ---------------------------------------------------------------------------
+
+
+class TestDecompositionCache:
+    def test_roundtrip(self, tmp_path):
+        cache = DecompositionCache(tmp_path)
+        arrays = {"a": _rng.standard_normal((3, 4)), "b": np.arange(5)}
+        assert cache.load("key") is None
+        assert cache.save("key", arrays, {"basis_size": 4})
+        loaded, meta = cache.load("key")
+        assert meta == {"basis_size": 4, "arrays": ["a", "b"]}
+        for name, a in arrays.items():
+            np.testing.assert_array_equal(loaded[name], a)
+        # copy-on-write, the entry on disk is unchanged
+        loaded["a"][...] = 0
+        np.testing.assert_array_equal(cache.load("key")[0]["a"], arrays["a"])
+        assert [key for key, _, _ in cache.entries()] == ["key"]
+
+    def test_replaces_entry(self, tmp_path):
+        cache = DecompositionCache(tmp_path)
+        cache.save("key", _arrays())
+        arrays = _arrays()
+        cache.save("key", arrays)
+        np.testing.assert_array_equal(cache.load("key")[0]["a"], arrays["a"])
+        assert sorted(os.listdir(tmp_path)) == ["key"]
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = DecompositionCache(tmp_path, max_bytes=2**40)
+        for t, key in enumerate("abc"):
+            cache.save(key, _arrays())
+            _touch(cache, key, 1000 + t)
+        size = cache.entries()[0][1]
+        # loading ``a`` makes ``b`` the least recently used entry
+        cache.load("a")
+        cache.max_bytes = 3 * size
+        cache.save("d", _arrays())
+        assert sorted(key for key, _, _ in cache.entries()) == ["a", "c", "d"]
+        assert cache.nbytes <= cache.max_bytes
+
+    def test_oversize_entry_is_not_stored(self, tmp_path):
+        cache = DecompositionCache(tmp_path, max_bytes=16 * KIB)
+        small = _arrays()
+        assert cache.save("key", small)
+        assert cache.save("other", _arrays())
+        # neither the oversize entry is stored nor any other entry evicted for it
+        assert not cache.save("key", _arrays(32 * KIB))
+        assert not cache.save("large", _arrays(32 * KIB))
+        assert sorted(os.listdir(tmp_path)) == ["key", "other"]
+        np.testing.assert_array_equal(cache.load("key")[0]["a"], small["a"])
+
+    def test_clear(self, tmp_path):
+        cache = DecompositionCache(tmp_path)
+        for key in "ab":
+            cache.save(key, _arrays())
+        cache.clear()
+        assert cache.entries() == [] and cache.nbytes == 0
+
+    def test_keys(self):
+        a = _rng.standard_normal((2, 3, 8))
+        assert array_hash(a) == array_hash(np.asfortranarray(a))
+        assert array_hash(a) != array_hash(a.astype(np.float32))
+        assert make_key(x=1, y=[2]) == make_key(y=[2], x=1) != make_key(x=1, y=[3])
+
+
+# ---------------------------------------------------------------------------
+# Reductors
+# ---------------------------------------------------------------------------
+
+
+class TestCachedReductors:
+    def test_era_reuses_svd(self, tmp_path):
+        cache, ir = DecompositionCache(tmp_path), _impulse_response()
+        ref = ERA(ir, sampling_rate=1, cache=cache).reduce(6)
+        assert len(cache.entries()) == 1
+        loaded = ERA(ir, sampling_rate=1, cache=cache).reduce(6)
+        for M in "ABCD":
+            np.testing.assert_array_equal(getattr(loaded, M), getattr(ref, M))
+        assert len(cache.entries()) == 1
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64], ids=["f32", "f64"])
+    def test_randomized_era_extends_basis(self, tmp_path, dtype):
+        cache, ir = DecompositionCache(tmp_path), _impulse_response()
+        rrf_opts = {"block_size": 4}
+        first = RandomizedERA(ir, dtype=dtype, sampling_rate=1, cache=cache, rrf_opts=rrf_opts)
+        ref = first.reduce(4)
+        ((key, _, _),) = cache.entries()
+        arrays, meta = cache.load(key)
+        assert meta["basis_size"] == 4
+        basis = np.array(arrays["Q2"])
+
+        # the basis is loaded, a lower order does not extend it
+        second = RandomizedERA(ir, dtype=dtype, sampling_rate=1, cache=cache, rrf_opts=rrf_opts)
+        assert second.reductor._cached_basis_size == 4
+        model = second.reduce(4)
+        for M in "ABCD":
+            np.testing.assert_array_equal(getattr(model, M), getattr(ref, M))
+        assert cache.load(key)[1]["basis_size"] == 4
+
+        # a larger order extends the loaded basis and stores it under the same key
+        second.reduce(10)
+        arrays, meta = cache.load(key)
+        assert meta["basis_size"] >= 10
+        np.testing.assert_array_equal(arrays["Q2"][:, :4], basis)
+        assert [k for k, _, _ in cache.entries()] == [key]
+        third = RandomizedERA(ir, dtype=dtype, sampling_rate=1, cache=cache, rrf_opts=rrf_opts)
+        assert third.reductor._cached_basis_size == meta["basis_size"]
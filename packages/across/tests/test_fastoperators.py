@@ -0,0 +1,172 @@
+"""Tests for the Hankel operators of across.fastoperators.
+
+:class:`StreamingHankelOperator` is compared with the dense block Hankel matrix of its Markov
+parameters, for the square, zero-padded layout of ``force_stability`` and the default layout of
+ERA, tall and wide channel layouts of the spectrum, streamed in one or many channel blocks.
+:class:`SpectrumCache` is checked for its budget, eviction order and the lifetime of its entries.
+"""
+
+import gc
+
+import numpy as np
+import pytest
+from across.fastoperators import SpectrumCache, StreamingHankelOperator, spectrum_cache
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+_rng = np.random.default_rng(0)
+
+DTYPES = [np.float32, np.float64]
+DTYPE_IDS = ["f32", "f64"]
+RTOL = {np.float32: 1e-5, np.float64: 1e-12}
+N = 9
+
+
+def _layouts(n):
+    """Block rows and columns of the stable (zero-padded) and the default ERA layout."""
+    return {"stable": (n, n), "default": ((n + 1) // 2, n - (n + 1) // 2 + 1)}
+
+
+LAYOUTS = list(_layouts(N))
+CHANNELS = [(3, 2), (2, 3)]
+CHANNEL_IDS = ["tall", "wide"]
+
+
+def _dense_hankel(data, rows, cols):
+    """Block Hankel matrix with blocks ``data[a + b]``, zero beyond the last Markov parameter."""
+    n, p, m = data.shape
+    H = np.zeros((rows * p, cols * m), dtype=np.float64)
+    for a in range(rows):
+        for b in range(min(cols, n - a)):
+            H[a * p : (a + 1) * p, b * m : (b + 1) * m] = data[a + b]
+    return H
+
+
+def _make_operator(layout, channels, dtype, **kwargs):
+    p, m = channels
+    data = _rng.standard_normal((N, p, m)).astype(dtype)
+    rows, cols = _layouts(N)[layout]
+    return StreamingHankelOperator(data, rows, cols, **kwargs), _dense_hankel(data, rows, cols)
+
+
+def _assert_close(actual, expected, dtype):
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=RTOL[dtype] * np.abs(expected).max())
+
+
+# ---------------------------------------------------------------------------
+# StreamingHankelOperator
+# ---------------------------------------------------------------------------
+
+
+class TestStreamingHankelOperator:
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("layout", LAYOUTS)
+    @pytest.mark.parametrize("channels", CHANNELS, ids=CHANNEL_IDS)
+    @pytest.mark.parametrize("block_size", [None, 1])
+    def test_apply_matches_dense(self, dtype, layout, channels, block_size):
+        op, H = _make_operator(layout, channels, dtype, block_size=block_size)
+        assert (op.range.dim, op.source.dim) == H.shape
+        U = _rng.standard_normal((op.source.dim, 3)).astype(dtype)
+        _assert_close(op.apply(op.source.make_array(U)).to_numpy(), H @ U, dtype)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("layout", LAYOUTS)
+    @pytest.mark.parametrize("channels", CHANNELS, ids=CHANNEL_IDS)
+    @pytest.mark.parametrize("block_size", [None, 1])
+    def test_adjoint_matches_dense(self, dtype, layout, channels, block_size):
+        op, H = _make_operator(layout, channels, dtype, block_size=block_size)
+        V = _rng.standard_normal((op.range.dim, 3)).astype(dtype)
+        _assert_close(op.apply_adjoint(op.range.make_array(V)).to_numpy(), H.T @ V, dtype)
+        adjoint = op.H
+        assert (adjoint.source, adjoint.range) == (op.range, op.source)
+        _assert_close(adjoint.apply(adjoint.source.make_array(V)).to_numpy(), H.T @ V, dtype)
+        U = _rng.standard_normal((op.source.dim, 3)).astype(dtype)
+        _assert_close(adjoint.apply_adjoint(adjoint.range.make_array(U)).to_numpy(), H @ U, dtype)
+
+    @pytest.mark.parametrize("layout", LAYOUTS)
+    def test_adjoint_shares_spectrum(self, layout):
+        op, _ = _make_operator(layout, (3, 2), np.float64)
+        assert op.H.spectrum is op.spectrum
+        assert op.H.H.spectrum is op.spectrum
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    def test_complex_input(self, dtype):
+        op, H = _make_operator("default", (3, 2), dtype)
+        U = _rng.standard_normal((op.source.dim, 2)) + 1j * _rng.standard_normal((op.source.dim, 2))
+        U = U.astype(np.promote_types(dtype, np.complex64))
+        _assert_close(op.apply(op.source.make_array(U)).to_numpy(), H @ U, dtype)
+
+    @pytest.mark.parametrize("layout", LAYOUTS)
+    def test_spectrum_on_disk(self, layout, tmp_path):
+        op, H = _make_operator(layout, (2, 3), np.float64, spectrum_dir=tmp_path, block_size=1)
+        assert isinstance(op.spectrum, np.memmap)
+        U = _rng.standard_normal((op.source.dim, 2))
+        V = _rng.standard_normal((op.range.dim, 2))
+        _assert_close(op.apply(op.source.make_array(U)).to_numpy(), H @ U, np.float64)
+        _assert_close(op.apply_adjoint(op.range.make_array(V)).to_numpy(), H.T @ V, np.float64)
+
+    def test_memmap_data(self, tmp_path):
+        data = _rng.standard_normal((N, 3, 2))
+        np.save(tmp_path / "ir.npy", data)
+        rows, cols = _layouts(N)["stable"]
+        op = StreamingHankelOperator(np.load(tmp_path / "ir.npy", mmap_mode="r"), rows, cols, dtype=np.float32)
+        U = _rng.standard_normal((op.source.dim, 2)).astype(np.float32)
+        _assert_close(op.apply(op.source.make_array(U)).to_numpy(), _dense_hankel(data, rows, cols) @ U, np.float32)
+
+    def test_higher_precision_vectors_share_one_conversion(self):
+        spectrum_cache.clear()
+        op, H = _make_operator("default", (3, 2), np.float32)
+        U = _rng.standard_normal((op.source.dim, 2))
+        V = _rng.standard_normal((op.range.dim, 2))
+        for _ in range(2):
+            _assert_close(op.apply(op.source.make_array(U)).to_numpy(), H @ U, np.float32)
+            _assert_close(op.apply_adjoint(op.range.make_array(V)).to_numpy(), H.T @ V, np.float32)
+        assert op.apply(op.source.make_array(U)).to_numpy().dtype == np.float64
+        assert spectrum_cache.nbytes == op.spectrum.size * np.dtype(np.complex128).itemsize
+
+
+# ---------------------------------------------------------------------------
+# SpectrumCache
+# ---------------------------------------------------------------------------
+
+
+def _spectra(count, size=8):
+    return [_rng.standard_normal(size).astype(np.complex64) for _ in range(count)]
+
+
+class TestSpectrumCache:
+    def test_converts_and_reuses(self):
+        cache = SpectrumCache()
+        (S,) = _spectra(1)
+        converted = cache.get(S, np.complex128)
+        assert converted.dtype == np.complex128
+        np.testing.assert_array_equal(converted, S)
+        assert cache.get(S, np.complex128) is converted
+        assert cache.nbytes == converted.nbytes
+
+    def test_evicts_least_recently_used(self):
+        S1, S2, S3 = _spectra(3)
+        cache = SpectrumCache(max_bytes=2 * S1.size * 16)
+        first, second = cache.get(S1, np.complex128), cache.get(S2, np.complex128)
+        assert cache.get(S1, np.complex128) is first
+        cache.get(S3, np.complex128)
+        assert cache.nbytes == cache.max_bytes
+        assert cache.get(S1, np.complex128) is first
+        assert cache.get(S2, np.complex128) is not second
+
+    def test_oversize_conversion_is_not_cached(self):
+        (S,) = _spectra(1)
+        cache = SpectrumCache(max_bytes=S.size * 16 - 1)
+        assert cache.get(S, np.complex128) is None
+        assert cache.nbytes == 0
+
+    def test_entries_are_freed_with_spectrum(self):
+        cache = SpectrumCache()
+        S1, S2 = _spectra(2)
+        cache.get(S1, np.complex128)
+        cache.get(S2, np.complex128)
+        del S1
+        gc.collect()
+        assert cache.nbytes == S2.size * 16
@@ -0,0 +1,137 @@
+"""Tests for across.hybrid.
+
+:class:`HybridModel` must not depend on how its input is chunked: chunks of one sample, chunks
+ending within a block, aligned blocks and the whole signal at once, through :meth:`process` and
+:meth:`process_block`, give the same output. The splits cover no head, a head covering the whole
+impulse response and a dropped tail, whose output is the exact convolution with the head.
+:func:`plan_hybrid` is checked for its error bound and the model it plans.
+"""
+
+import numpy as np
+import pytest
+from across.hybrid import HybridModel, plan_hybrid
+from pyfar import Signal
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+_rng = np.random.default_rng(0)
+
+M, P, N_TAPS, BLOCK, T = 2, 3, 200, 32, 320
+CHUNKS = [1, 5, BLOCK, T]
+# (head_length, order): no head, head and tail, the head covering the impulse response (also
+# beyond its end), and a dropped tail
+SPLITS = [(0, 6), (48, 6), (N_TAPS, 6), (N_TAPS + 40, 6), (64, 0)]
+SPLIT_IDS = ["no-head", "hybrid", "head-only", "head-beyond", "no-tail"]
+
+
+def _impulse_response():
+    """Decaying random impulse response of shape ``(M, P, N_TAPS)``."""
+    return _rng.standard_normal((M, P, N_TAPS)) * np.exp(-np.arange(N_TAPS) / 30)
+
+
+def _reverberant_impulse_response(n_taps=400):
+    """Irregular early taps on top of three damped modes, whose tail ERA reduces well."""
+    t = np.arange(n_taps)
+    ir = np.zeros((M, P, n_taps))
+    ir[..., :40] = _rng.standard_normal((M, P, 40))
+    for frequency, decay in ((0.05, 0.98), (0.13, 0.97), (0.31, 0.985)):
+        phase = _rng.uniform(0, 2 * np.pi, (M, P, 1))
+        ir += _rng.standard_normal((M, P, 1)) * decay**t * np.cos(2 * np.pi * frequency * t + phase)
+    return ir
+
+
+def _convolve(ir, u):
+    """Exact output of the impulse response ``ir`` of shape ``(m, p, L)`` for the input ``u``."""
+    y = np.zeros((ir.shape[1], u.shape[1]))
+    for i in range(ir.shape[0]):
+        for o in range(ir.shape[1]):
+            y[o] += np.convolve(u[i], ir[i, o])[: u.shape[1]]
+    return y
+
+
+def _processed(model, u, chunk):
+    """Output of :meth:`HybridModel.process` for ``u`` in chunks of ``chunk`` samples."""
+    model.init_state()
+    chunks = [model.process(Signal(u[:, i : i + chunk], 1)).time for i in range(0, u.shape[1], chunk)]
+    return np.concatenate(chunks, axis=-1)
+
+
+def _blockwise(model, u, chunk):
+    """Output of :meth:`HybridModel.process_block` for ``u`` in blocks of ``chunk`` samples."""
+    model.init_state()
+    buffer, out = model.init_block(chunk)
+    chunks = []
+    for i in range(0, u.shape[1], chunk):
+        buffer[...] = u[:, i : i + chunk]
+        chunks.append(model.process_block(buffer, out).copy())
+    return np.concatenate(chunks, axis=-1)
+
+
+# ---------------------------------------------------------------------------
+# HybridModel
+# ---------------------------------------------------------------------------
+
+
+class TestHybridModel:
+    @pytest.mark.parametrize("chunk", CHUNKS)
+    @pytest.mark.parametrize(("head_length", "order"), SPLITS, ids=SPLIT_IDS)
+    def test_streaming_matches_whole(self, head_length, order, chunk):
+        ir, u = _impulse_response(), _rng.standard_normal((M, T))
+        model = HybridModel.from_ir(ir, head_length, order, block_size=BLOCK, sampling_rate=1)
+        whole = _processed(model, u, T)
+        np.testing.assert_allclose(_processed(model, u, chunk), whole, rtol=0, atol=1e-10)
+        np.testing.assert_allclose(_blockwise(model, u, chunk), whole, rtol=0, atol=1e-10)
+
+    @pytest.mark.parametrize(("head_length", "order"), SPLITS[2:], ids=SPLIT_IDS[2:])
+    def test_head_is_exact(self, head_length, order):
+        ir, u = _impulse_response(), _rng.standard_normal((M, T))
+        model = HybridModel.from_ir(ir, head_length, order, block_size=BLOCK, sampling_rate=1)
+        assert model.tail is None
+        ref = _convolve(ir[..., :head_length], u)
+        np.testing.assert_allclose(_processed(model, u, 5), ref, rtol=0, atol=1e-10)
+
+    def test_tail_is_delayed(self):
+        ir = _impulse_response()
+        model = HybridModel.from_ir(ir, 48, 6, block_size=BLOCK, sampling_rate=1)
+        assert model.tail.n_states == 6
+        impulse = np.zeros((M, T))
+        impulse[0, 0] = 1
+        h = _processed(model, impulse, 1)
+        np.testing.assert_allclose(h[:, :48], ir[0, :, :48], rtol=0, atol=1e-10)
+        np.testing.assert_allclose(h[:, 48], ir[0, :, 48], rtol=0, atol=1e-10)
+
+    def test_float32(self):
+        ir, u = _impulse_response(), _rng.standard_normal((M, T))
+        model = HybridModel.from_ir(ir, 48, 6, block_size=BLOCK, sampling_rate=1, dtype=np.float32)
+        whole = _processed(model, u, T)
+        assert whole.dtype == np.float32
+        np.testing.assert_allclose(_blockwise(model, u, 1), whole, rtol=0, atol=1e-4)
+
+
+# ---------------------------------------------------------------------------
+# plan_hybrid
+# ---------------------------------------------------------------------------
+
+
+class TestPlanHybrid:
+    def test_plan_meets_tolerance(self):
+        ir, u = _reverberant_impulse_response(), _rng.standard_normal((M, T))
+        plan = plan_hybrid(ir, 1e-3, block_size=BLOCK, sampling_rate=1)
+        # the tail of the modes is cheaper than convolving it, pure convolution is a candidate
+        assert 0 < plan["head_length"] < ir.shape[-1] and plan["order"] > 0
+        assert plan["relative_error"] <= 1e-3
+        convolution = plan["candidates"][-1]
+        assert (convolution["head_length"], convolution["order"], convolution["relative_error"]) == (400, 0, 0)
+        model = HybridModel.from_ir(ir, plan["head_length"], plan["order"], block_size=BLOCK, sampling_rate=1)
+        assert model.flops_per_sample == plan["flops_per_sample"]
+        whole = _processed(model, u, T)
+        np.testing.assert_allclose(_blockwise(model, u, 1), whole, rtol=0, atol=1e-10)
+        ref = _convolve(ir, u)
+        assert np.linalg.norm(whole - ref) < 1e-2 * np.linalg.norm(ref)
+
+    def test_zero_tolerance_plans_convolution(self):
+        ir = _impulse_response()
+        plan = plan_hybrid(ir, 0, block_size=BLOCK, head_lengths=[0, 64], max_order=4, sampling_rate=1)
+        assert (plan["head_length"], plan["order"], plan["relative_error"]) == (N_TAPS, 0, 0)
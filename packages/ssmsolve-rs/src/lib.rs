@@ -1,6 +1,12 @@
-use numpy::ndarray::{Array1, ArrayView1, ArrayView2, ArrayViewMut1, ArrayViewMut2};
-use numpy::{PyReadonlyArray2, PyReadwriteArray1, PyReadwriteArray2};
+use numpy::ndarray::{
+    s, Array1, Array2, ArrayView1, ArrayView2, ArrayView3, ArrayViewMut1, ArrayViewMut2, ArrayViewMut3, Axis,
+    ShapeBuilder,
+};
+use numpy::{
+    PyReadonlyArray1, PyReadonlyArray2, PyReadonlyArray3, PyReadwriteArray1, PyReadwriteArray2, PyReadwriteArray3,
+};
 use pyo3::prelude::*;
+use std::ops::{Add, Mul};
 
 // ---------------------------------------------------------------------------
 // BLAS bindings
@@ -21,6 +27,26 @@ unsafe extern "C" {
         x: *const f64, incx: i32,
         beta: f64, y: *mut f64, incy: i32,
     );
+    fn cblas_sgemm(
+        order: i32, transa: i32, transb: i32, m: i32, n: i32, k: i32,
+        alpha: f32, a: *const f32, lda: i32,
+        b: *const f32, ldb: i32,
+        beta: f32, c: *mut f32, ldc: i32,
+    );
+    fn cblas_dgemm(
+        order: i32, transa: i32, transb: i32, m: i32, n: i32, k: i32,
+        alpha: f64, a: *const f64, lda: i32,
+        b: *const f64, ldb: i32,
+        beta: f64, c: *mut f64, ldc: i32,
+    );
+    fn cblas_strmv(
+        order: i32, uplo: i32, trans: i32, diag: i32, n: i32,
+        a: *const f32, lda: i32, x: *mut f32, incx: i32,
+    );
+    fn cblas_dtrmv(
+        order: i32, uplo: i32, trans: i32, diag: i32, n: i32,
+        a: *const f64, lda: i32, x: *mut f64, incx: i32,
+    );
 }
 
 // Fortran BLAS — used for F-order (column-major) arrays; no layout translation.
@@ -37,10 +63,75 @@ unsafe extern "C" {
         x: *const f64, incx: *const i32,
         beta: *const f64, y: *mut f64, incy: *const i32,
     );
+    fn sgemm_(
+        transa: *const u8, transb: *const u8, m: *const i32, n: *const i32, k: *const i32,
+        alpha: *const f32, a: *const f32, lda: *const i32,
+        b: *const f32, ldb: *const i32,
+        beta: *const f32, c: *mut f32, ldc: *const i32,
+    );
+    fn dgemm_(
+        transa: *const u8, transb: *const u8, m: *const i32, n: *const i32, k: *const i32,
+        alpha: *const f64, a: *const f64, lda: *const i32,
+        b: *const f64, ldb: *const i32,
+        beta: *const f64, c: *mut f64, ldc: *const i32,
+    );
+    fn strmv_(
+        uplo: *const u8, trans: *const u8, diag: *const u8, n: *const i32,
+        a: *const f32, lda: *const i32, x: *mut f32, incx: *const i32,
+    );
+    fn dtrmv_(
+        uplo: *const u8, trans: *const u8, diag: *const u8, n: *const i32,
+        a: *const f64, lda: *const i32, x: *mut f64, incx: *const i32,
+    );
+    fn stpmv_(
+        uplo: *const u8, trans: *const u8, diag: *const u8, n: *const i32,
+        ap: *const f32, x: *mut f32, incx: *const i32,
+    );
+    fn dtpmv_(
+        uplo: *const u8, trans: *const u8, diag: *const u8, n: *const i32,
+        ap: *const f64, x: *mut f64, incx: *const i32,
+    );
 }
 
 const CBLAS_ROW_MAJOR: i32 = 101;
 const CBLAS_NO_TRANS: i32 = 111;
+const CBLAS_UPPER: i32 = 121;
+const CBLAS_NON_UNIT: i32 = 131;
+
+/// Leading dimension of a column-major matrix. numpy reports arbitrary strides for axes of length
+/// at most one, e.g. unit strides for a C-ordered column, which BLAS would reject as `lda`.
+#[inline]
+fn ld_f(shape: &[usize], strides: &[isize]) -> i32 {
+    if shape[0] > 0 && shape[1] > 1 { strides[1] as i32 } else { shape[0].max(1) as i32 }
+}
+
+/// Leading dimension of a row-major matrix, see `ld_f`.
+#[inline]
+fn ld_c(shape: &[usize], strides: &[isize]) -> i32 {
+    if shape[1] > 0 && shape[0] > 1 { strides[0] as i32 } else { shape[1].max(1) as i32 }
+}
+
+/// Increment of a vector; the stride of fewer than two elements is arbitrary and may be zero.
+#[inline]
+fn inc(len: usize, stride: isize) -> i32 {
+    if len > 1 { stride as i32 } else { 1 }
+}
+
+/// Whether a matrix can be passed to the Fortran BLAS: unit row stride, at most one row or no
+/// elements. Every matrix is contiguous in the storage order of the model, but one that is
+/// contiguous in both orders, such as a single column, does not reveal that order.
+#[inline]
+fn is_column_major(shape: &[usize], strides: &[isize]) -> bool {
+    shape[0] <= 1 || shape.contains(&0) || strides[0] == 1
+}
+
+/// Whether all matrices handed to BLAS are column-major, which selects the Fortran kernels over
+/// the CBLAS row-major ones.
+macro_rules! column_major {
+    ($($m:expr),+) => {
+        $(is_column_major($m.shape(), $m.strides()))&&+
+    };
+}
 
 // ---------------------------------------------------------------------------
 // BLAS wrappers — one per layout, no branching
@@ -51,9 +142,9 @@ const CBLAS_NO_TRANS: i32 = 111;
 unsafe fn sgemv_f(a: &ArrayView2<f32>, x: &ArrayView1<f32>, y: &mut ArrayViewMut1<f32>, alpha: f32, beta: f32) {
     let m = a.shape()[0] as i32;
     let n = a.shape()[1] as i32;
-    let lda = a.strides()[1] as i32; // column stride = number of rows
-    let incx = x.strides()[0] as i32;
-    let incy = y.strides()[0] as i32;
+    let lda = ld_f(a.shape(), a.strides());
+    let incx = inc(x.len(), x.strides()[0]);
+    let incy = inc(y.len(), y.strides()[0]);
     unsafe { sgemv_(b"N".as_ptr(), &m, &n, &alpha, a.as_ptr(), &lda, x.as_ptr(), &incx, &beta, y.as_mut_ptr(), &incy) };
 }
 
@@ -62,9 +153,9 @@ unsafe fn sgemv_f(a: &ArrayView2<f32>, x: &ArrayView1<f32>, y: &mut ArrayViewMut
 unsafe fn sgemv_c(a: &ArrayView2<f32>, x: &ArrayView1<f32>, y: &mut ArrayViewMut1<f32>, alpha: f32, beta: f32) {
     let m = a.shape()[0] as i32;
     let n = a.shape()[1] as i32;
-    let lda = a.strides()[0] as i32; // row stride = number of columns
-    let incx = x.strides()[0] as i32;
-    let incy = y.strides()[0] as i32;
+    let lda = ld_c(a.shape(), a.strides());
+    let incx = inc(x.len(), x.strides()[0]);
+    let incy = inc(y.len(), y.strides()[0]);
     unsafe { cblas_sgemv(CBLAS_ROW_MAJOR, CBLAS_NO_TRANS, m, n, alpha, a.as_ptr(), lda, x.as_ptr(), incx, beta, y.as_mut_ptr(), incy) };
 }
 
@@ -73,9 +164,9 @@ unsafe fn sgemv_c(a: &ArrayView2<f32>, x: &ArrayView1<f32>, y: &mut ArrayViewMut
 unsafe fn dgemv_f(a: &ArrayView2<f64>, x: &ArrayView1<f64>, y: &mut ArrayViewMut1<f64>, alpha: f64, beta: f64) {
     let m = a.shape()[0] as i32;
     let n = a.shape()[1] as i32;
-    let lda = a.strides()[1] as i32;
-    let incx = x.strides()[0] as i32;
-    let incy = y.strides()[0] as i32;
+    let lda = ld_f(a.shape(), a.strides());
+    let incx = inc(x.len(), x.strides()[0]);
+    let incy = inc(y.len(), y.strides()[0]);
     unsafe { dgemv_(b"N".as_ptr(), &m, &n, &alpha, a.as_ptr(), &lda, x.as_ptr(), &incx, &beta, y.as_mut_ptr(), &incy) };
 }
 
@@ -84,12 +175,112 @@ unsafe fn dgemv_f(a: &ArrayView2<f64>, x: &ArrayView1<f64>, y: &mut ArrayViewMut
 unsafe fn dgemv_c(a: &ArrayView2<f64>, x: &ArrayView1<f64>, y: &mut ArrayViewMut1<f64>, alpha: f64, beta: f64) {
     let m = a.shape()[0] as i32;
     let n = a.shape()[1] as i32;
-    let lda = a.strides()[0] as i32;
-    let incx = x.strides()[0] as i32;
-    let incy = y.strides()[0] as i32;
+    let lda = ld_c(a.shape(), a.strides());
+    let incx = inc(x.len(), x.strides()[0]);
+    let incy = inc(y.len(), y.strides()[0]);
     unsafe { cblas_dgemv(CBLAS_ROW_MAJOR, CBLAS_NO_TRANS, m, n, alpha, a.as_ptr(), lda, x.as_ptr(), incx, beta, y.as_mut_ptr(), incy) };
 }
 
+/// `c = alpha * A @ B + beta * c`  — all matrices F-order (column-major).
+#[inline]
+unsafe fn sgemm_f(a: &ArrayView2<f32>, b: &ArrayView2<f32>, c: &mut ArrayViewMut2<f32>, alpha: f32, beta: f32) {
+    let m = c.shape()[0] as i32;
+    let n = c.shape()[1] as i32;
+    let k = a.shape()[1] as i32;
+    let lda = ld_f(a.shape(), a.strides());
+    let ldb = ld_f(b.shape(), b.strides());
+    let ldc = ld_f(c.shape(), c.strides());
+    unsafe { sgemm_(b"N".as_ptr(), b"N".as_ptr(), &m, &n, &k, &alpha, a.as_ptr(), &lda, b.as_ptr(), &ldb, &beta, c.as_mut_ptr(), &ldc) };
+}
+
+/// `c = alpha * A @ B + beta * c`  — all matrices C-order (row-major).
+#[inline]
+unsafe fn sgemm_c(a: &ArrayView2<f32>, b: &ArrayView2<f32>, c: &mut ArrayViewMut2<f32>, alpha: f32, beta: f32) {
+    let m = c.shape()[0] as i32;
+    let n = c.shape()[1] as i32;
+    let k = a.shape()[1] as i32;
+    let lda = ld_c(a.shape(), a.strides());
+    let ldb = ld_c(b.shape(), b.strides());
+    let ldc = ld_c(c.shape(), c.strides());
+    unsafe { cblas_sgemm(CBLAS_ROW_MAJOR, CBLAS_NO_TRANS, CBLAS_NO_TRANS, m, n, k, alpha, a.as_ptr(), lda, b.as_ptr(), ldb, beta, c.as_mut_ptr(), ldc) };
+}
+
+/// `c = alpha * A @ B + beta * c`  — all matrices F-order (column-major).
+#[inline]
+unsafe fn dgemm_f(a: &ArrayView2<f64>, b: &ArrayView2<f64>, c: &mut ArrayViewMut2<f64>, alpha: f64, beta: f64) {
+    let m = c.shape()[0] as i32;
+    let n = c.shape()[1] as i32;
+    let k = a.shape()[1] as i32;
+    let lda = ld_f(a.shape(), a.strides());
+    let ldb = ld_f(b.shape(), b.strides());
+    let ldc = ld_f(c.shape(), c.strides());
+    unsafe { dgemm_(b"N".as_ptr(), b"N".as_ptr(), &m, &n, &k, &alpha, a.as_ptr(), &lda, b.as_ptr(), &ldb, &beta, c.as_mut_ptr(), &ldc) };
+}
+
+/// `c = alpha * A @ B + beta * c`  — all matrices C-order (row-major).
+#[inline]
+unsafe fn dgemm_c(a: &ArrayView2<f64>, b: &ArrayView2<f64>, c: &mut ArrayViewMut2<f64>, alpha: f64, beta: f64) {
+    let m = c.shape()[0] as i32;
+    let n = c.shape()[1] as i32;
+    let k = a.shape()[1] as i32;
+    let lda = ld_c(a.shape(), a.strides());
+    let ldb = ld_c(b.shape(), b.strides());
+    let ldc = ld_c(c.shape(), c.strides());
+    unsafe { cblas_dgemm(CBLAS_ROW_MAJOR, CBLAS_NO_TRANS, CBLAS_NO_TRANS, m, n, k, alpha, a.as_ptr(), lda, b.as_ptr(), ldb, beta, c.as_mut_ptr(), ldc) };
+}
+
+/// `x = A @ x` for the upper triangle of A  — A is F-order (column-major).
+#[inline]
+unsafe fn strmv_f(a: &ArrayView2<f32>, x: &mut ArrayViewMut1<f32>) {
+    let n = a.shape()[0] as i32;
+    let lda = ld_f(a.shape(), a.strides());
+    let incx = inc(x.len(), x.strides()[0]);
+    unsafe { strmv_(b"U".as_ptr(), b"N".as_ptr(), b"N".as_ptr(), &n, a.as_ptr(), &lda, x.as_mut_ptr(), &incx) };
+}
+
+/// `x = A @ x` for the upper triangle of A  — A is C-order (row-major).
+#[inline]
+unsafe fn strmv_c(a: &ArrayView2<f32>, x: &mut ArrayViewMut1<f32>) {
+    let n = a.shape()[0] as i32;
+    let lda = ld_c(a.shape(), a.strides());
+    let incx = inc(x.len(), x.strides()[0]);
+    unsafe { cblas_strmv(CBLAS_ROW_MAJOR, CBLAS_UPPER, CBLAS_NO_TRANS, CBLAS_NON_UNIT, n, a.as_ptr(), lda, x.as_mut_ptr(), incx) };
+}
+
+/// `x = A @ x` for upper triangular A packed column by column (layout independent).
+#[inline]
+unsafe fn stpmv(ap: &ArrayView1<f32>, x: &mut ArrayViewMut1<f32>) {
+    let n = x.len() as i32;
+    let incx = inc(x.len(), x.strides()[0]);
+    unsafe { stpmv_(b"U".as_ptr(), b"N".as_ptr(), b"N".as_ptr(), &n, ap.as_ptr(), x.as_mut_ptr(), &incx) };
+}
+
+/// `x = A @ x` for the upper triangle of A  — A is F-order (column-major).
+#[inline]
+unsafe fn dtrmv_f(a: &ArrayView2<f64>, x: &mut ArrayViewMut1<f64>) {
+    let n = a.shape()[0] as i32;
+    let lda = ld_f(a.shape(), a.strides());
+    let incx = inc(x.len(), x.strides()[0]);
+    unsafe { dtrmv_(b"U".as_ptr(), b"N".as_ptr(), b"N".as_ptr(), &n, a.as_ptr(), &lda, x.as_mut_ptr(), &incx) };
+}
+
+/// `x = A @ x` for the upper triangle of A  — A is C-order (row-major).
+#[inline]
+unsafe fn dtrmv_c(a: &ArrayView2<f64>, x: &mut ArrayViewMut1<f64>) {
+    let n = a.shape()[0] as i32;
+    let lda = ld_c(a.shape(), a.strides());
+    let incx = inc(x.len(), x.strides()[0]);
+    unsafe { cblas_dtrmv(CBLAS_ROW_MAJOR, CBLAS_UPPER, CBLAS_NO_TRANS, CBLAS_NON_UNIT, n, a.as_ptr(), lda, x.as_mut_ptr(), incx) };
+}
+
+/// `x = A @ x` for upper triangular A packed column by column (layout independent).
+#[inline]
+unsafe fn dtpmv(ap: &ArrayView1<f64>, x: &mut ArrayViewMut1<f64>) {
+    let n = x.len() as i32;
+    let incx = inc(x.len(), x.strides()[0]);
+    unsafe { dtpmv_(b"U".as_ptr(), b"N".as_ptr(), b"N".as_ptr(), &n, ap.as_ptr(), x.as_mut_ptr(), &incx) };
+}
+
 // ---------------------------------------------------------------------------
 // Inner solvers — templated by BLAS variant via function pointer
 // ---------------------------------------------------------------------------
@@ -138,71 +329,1484 @@ make_inner_solver!(solve_f32_c_inner, f32, sgemv_c);
 make_inner_solver!(solve_f64_f_inner, f64, dgemv_f);
 make_inner_solver!(solve_f64_c_inner, f64, dgemv_c);
 
+// Solvers for bursty input: samples whose inputs are all zero skip the `B @ u` and `D @ u` gemvs,
+// and once the state norm is at most `threshold` on such a sample, the state is set to zero and
+// the silent samples up to the next nonzero input are zero without any products.
+macro_rules! make_silent_solver {
+    ($name:ident, $T:ty, $gemv:ident) => {
+        fn $name(
+            mut out: ArrayViewMut2<$T>,
+            mut x:   ArrayViewMut1<$T>,
+            a: ArrayView2<$T>,
+            b: ArrayView2<$T>,
+            c: ArrayView2<$T>,
+            d: ArrayView2<$T>,
+            threshold: $T,
+            sig: ArrayView2<$T>,
+        ) {
+            let n_samples = sig.shape()[1];
+            let n_states  = x.len();
+            let n_outputs = out.shape()[0];
+            let t2 = threshold * threshold;
+
+            let mut x_cur: Array1<$T> = x.to_owned();
+            let mut x_nxt: Array1<$T> = Array1::zeros(n_states);
+            let mut y_buf: Array1<$T> = Array1::zeros(n_outputs);
+            let mut decayed = false;
+
+            for i in 0..n_samples {
+                let sig_i = sig.column(i);
+                if sig_i.iter().any(|&v| v != 0.0) {
+                    decayed = false;
+                    unsafe {
+                        $gemv(&c, &x_cur.view(), &mut y_buf.view_mut(), 1.0, 0.0);
+                        $gemv(&d, &sig_i,        &mut y_buf.view_mut(), 1.0, 1.0);
+                        $gemv(&a, &x_cur.view(), &mut x_nxt.view_mut(), 1.0, 0.0);
+                        $gemv(&b, &sig_i,        &mut x_nxt.view_mut(), 1.0, 1.0);
+                    }
+                } else if decayed {
+                    out.column_mut(i).fill(0.0);
+                    continue;
+                } else if x_cur.dot(&x_cur) <= t2 {
+                    decayed = true;
+                    x_cur.fill(0.0);
+                    out.column_mut(i).fill(0.0);
+                    continue;
+                } else {
+                    // free response
+                    unsafe {
+                        $gemv(&c, &x_cur.view(), &mut y_buf.view_mut(), 1.0, 0.0);
+                        $gemv(&a, &x_cur.view(), &mut x_nxt.view_mut(), 1.0, 0.0);
+                    }
+                }
+                out.column_mut(i).assign(&y_buf);
+                std::mem::swap(&mut x_cur, &mut x_nxt);
+            }
+            x.assign(&x_cur);
+        }
+    };
+}
+
+make_silent_solver!(solve_silent_f32_f_inner, f32, sgemv_f);
+make_silent_solver!(solve_silent_f32_c_inner, f32, sgemv_c);
+make_silent_solver!(solve_silent_f64_f_inner, f64, dgemv_f);
+make_silent_solver!(solve_silent_f64_c_inner, f64, dgemv_c);
+
+// Crossfading solvers: the output is `(1 - g) * (C @ x + D @ u) + g * (C2 @ x + D2 @ u)` with the gain
+// `g` of the sample, and the map whose weight is zero is skipped, so that only the samples of the
+// fade pay for both. The state recursion is the one of the plain solver.
+macro_rules! make_crossfade_solver {
+    ($name:ident, $T:ty, $gemv:ident) => {
+        fn $name(
+            mut out: ArrayViewMut2<$T>,
+            mut x:   ArrayViewMut1<$T>,
+            a: ArrayView2<$T>,
+            b: ArrayView2<$T>,
+            c: ArrayView2<$T>,
+            d: ArrayView2<$T>,
+            c2: ArrayView2<$T>,
+            d2: ArrayView2<$T>,
+            gain: ArrayView1<$T>,
+            sig: ArrayView2<$T>,
+        ) {
+            let n_samples = sig.shape()[1];
+            let n_states  = x.len();
+            let n_outputs = out.shape()[0];
+
+            let mut x_cur: Array1<$T> = x.to_owned();
+            let mut x_nxt: Array1<$T> = Array1::zeros(n_states);
+            let mut y_buf: Array1<$T> = Array1::zeros(n_outputs);
+
+            for i in 0..n_samples {
+                let sig_i = sig.column(i);
+                let g = gain[i];
+                // y_buf = (1 - g) * (C @ x_cur + D @ sig_i) + g * (C2 @ x_cur + D2 @ sig_i)
+                unsafe {
+                    if g >= 1.0 {
+                        $gemv(&c2, &x_cur.view(), &mut y_buf.view_mut(), 1.0, 0.0);
+                        $gemv(&d2, &sig_i,        &mut y_buf.view_mut(), 1.0, 1.0);
+                    } else {
+                        $gemv(&c, &x_cur.view(), &mut y_buf.view_mut(), 1.0, 0.0);
+                        $gemv(&d, &sig_i,        &mut y_buf.view_mut(), 1.0, 1.0);
+                        if g > 0.0 {
+                            $gemv(&c2, &x_cur.view(), &mut y_buf.view_mut(), g, 1.0 - g);
+                            $gemv(&d2, &sig_i,        &mut y_buf.view_mut(), g, 1.0);
+                        }
+                    }
+                }
+                out.column_mut(i).assign(&y_buf);
+                // x_nxt = A @ x_cur + B @ sig_i
+                unsafe {
+                    $gemv(&a, &x_cur.view(), &mut x_nxt.view_mut(), 1.0, 0.0);
+                    $gemv(&b, &sig_i,        &mut x_nxt.view_mut(), 1.0, 1.0);
+                }
+                std::mem::swap(&mut x_cur, &mut x_nxt);
+            }
+            x.assign(&x_cur);
+        }
+    };
+}
+
+make_crossfade_solver!(solve_crossfade_f32_f_inner, f32, sgemv_f);
+make_crossfade_solver!(solve_crossfade_f32_c_inner, f32, sgemv_c);
+make_crossfade_solver!(solve_crossfade_f64_f_inner, f64, dgemv_f);
+make_crossfade_solver!(solve_crossfade_f64_c_inner, f64, dgemv_c);
+
+// Block solvers: `B @ u` and `C @ X + D @ u` as one GEMM per chunk, only the `A @ x` gemv stays
+// in the sequential loop. The state trajectory lives in `traj` with one leading column for the
+// initial state, so `traj[:, i + 1] = A @ traj[:, i] + (B @ u)[:, i]` needs no extra copies.
+macro_rules! make_block_solver {
+    ($name:ident, $T:ty, $gemv:ident, $gemm:ident, $fortran:expr) => {
+        fn $name(
+            mut out: ArrayViewMut2<$T>,
+            mut x:   ArrayViewMut1<$T>,
+            a: ArrayView2<$T>,
+            b: ArrayView2<$T>,
+            c: ArrayView2<$T>,
+            d: ArrayView2<$T>,
+            sig: ArrayView2<$T>,
+        ) {
+            let n_samples = sig.shape()[1];
+            let n_states  = x.len();
+            if n_samples == 0 {
+                return;
+            }
+
+            let shape = (n_states, n_samples + 1);
+            let mut traj: Array2<$T> = if $fortran { Array2::zeros(shape.f()) } else { Array2::zeros(shape) };
+            traj.column_mut(0).assign(&x);
+            // traj[:, 1:] = B @ sig
+            unsafe { $gemm(&b, &sig, &mut traj.slice_mut(s![.., 1..]), 1.0, 0.0) };
+            // traj[:, i + 1] += A @ traj[:, i]
+            for i in 0..n_samples {
+                let (x_cur, mut x_nxt) = traj.multi_slice_mut((s![.., i], s![.., i + 1]));
+                unsafe { $gemv(&a, &x_cur.view(), &mut x_nxt, 1.0, 1.0) };
+            }
+            // out = C @ traj[:, :-1] + D @ sig
+            unsafe {
+                $gemm(&c, &traj.slice(s![.., ..n_samples]), &mut out, 1.0, 0.0);
+                $gemm(&d, &sig,                              &mut out, 1.0, 1.0);
+            }
+            x.assign(&traj.column(n_samples));
+        }
+    };
+}
+
+make_block_solver!(solve_block_f32_f_inner, f32, sgemv_f, sgemm_f, true);
+make_block_solver!(solve_block_f32_c_inner, f32, sgemv_c, sgemm_c, false);
+make_block_solver!(solve_block_f64_f_inner, f64, dgemv_f, dgemm_f, true);
+make_block_solver!(solve_block_f64_c_inner, f64, dgemv_c, dgemm_c, false);
+
 // ---------------------------------------------------------------------------
-// Python-callable functions — dispatch on array layout
+// Small-order solver — one fused update per sample without BLAS calls
 // ---------------------------------------------------------------------------
 
-/// Python-callable solver for `float32` state-space systems.
+/// Sequential recursion for small orders, layout independent.
 ///
-/// Parameters
-/// ----------
-/// out : numpy.ndarray, shape (p, T), float32, writable
-///     Output array filled in place.
-/// x : numpy.ndarray, shape (n,), float32, writable
-///     System state vector; updated in place to the state after the last sample.
-/// a, b, c, d : numpy.ndarray, float32
-///     System matrices (shapes (n,n), (n,m), (p,n), (p,m)).
-/// sig : numpy.ndarray, shape (m, T), float32
-///     Input signal.
-#[pyfunction]
-fn solve_f32<'py>(
-    mut out: PyReadwriteArray2<'py, f32>,
-    mut x:   PyReadwriteArray1<'py, f32>,
-    a: PyReadonlyArray2<'py, f32>,
-    b: PyReadonlyArray2<'py, f32>,
-    c: PyReadonlyArray2<'py, f32>,
-    d: PyReadonlyArray2<'py, f32>,
-    sig: PyReadonlyArray2<'py, f32>,
-) -> PyResult<()> {
-    let a_arr = a.as_array();
-    // Dispatch on A's layout; all system matrices share the same storage order.
-    if a_arr.strides()[0] == 1 {
-        solve_f32_f_inner(out.as_array_mut(), x.as_array_mut(), a_arr, b.as_array(), c.as_array(), d.as_array(), sig.as_array());
-    } else {
-        solve_f32_c_inner(out.as_array_mut(), x.as_array_mut(), a_arr, b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+/// `m` holds `[[C, D], [A, B]]` in column-major order, packed once by the model, so every sample
+/// costs a single `w = m @ [x; u[:, i]]`, whose head is `y[:, i]` and whose tail is the next
+/// state. `w` is a scratch vector of `p + n` entries owned by the model, so nothing is
+/// allocated. The columns are accumulated as contiguous axpys, which the compiler vectorises.
+/// For a few dozen states this is cheaper than the call overhead of four `gemv`s per sample.
+fn solve_small_inner<T>(
+    mut out: ArrayViewMut2<T>,
+    mut x:   ArrayViewMut1<T>,
+    m: ArrayView2<T>,
+    mut w: ArrayViewMut1<T>,
+    sig: ArrayView2<T>,
+) where
+    T: Copy + Default + Add<Output = T> + Mul<Output = T>,
+{
+    let (n, p) = (x.len(), out.shape()[0]);
+    for i in 0..sig.shape()[1] {
+        // w = m @ [x; u[:, i]], column by column
+        w.fill(T::default());
+        for (j, col) in m.axis_iter(Axis(1)).enumerate() {
+            let zj = if j < n { x[j] } else { sig[[j - n, i]] };
+            for (wk, mk) in w.iter_mut().zip(col.iter()) {
+                *wk = *wk + *mk * zj;
+            }
+        }
+        for (yk, wk) in out.column_mut(i).iter_mut().zip(w.iter().take(p)) {
+            *yk = *wk;
+        }
+        for (xk, wk) in x.iter_mut().zip(w.iter().skip(p)) {
+            *xk = *wk;
+        }
     }
-    Ok(())
 }
 
-/// Python-callable solver for `float64` state-space systems.
-///
-/// Parameters
-/// ----------
-/// out : numpy.ndarray, shape (p, T), float64, writable
-///     Output array filled in place.
-/// x : numpy.ndarray, shape (n,), float64, writable
-///     System state vector; updated in place to the state after the last sample.
-/// a, b, c, d : numpy.ndarray, float64
-///     System matrices (shapes (n,n), (n,m), (p,n), (p,m)).
-/// sig : numpy.ndarray, shape (m, T), float64
-///     Input signal.
-#[pyfunction]
-fn solve_f64<'py>(
-    mut out: PyReadwriteArray2<'py, f64>,
-    mut x:   PyReadwriteArray1<'py, f64>,
-    a: PyReadonlyArray2<'py, f64>,
-    b: PyReadonlyArray2<'py, f64>,
-    c: PyReadonlyArray2<'py, f64>,
-    d: PyReadonlyArray2<'py, f64>,
-    sig: PyReadonlyArray2<'py, f64>,
-) -> PyResult<()> {
-    let a_arr = a.as_array();
-    // Dispatch on A's layout; all system matrices share the same storage order.
-    if a_arr.strides()[0] == 1 {
-        solve_f64_f_inner(out.as_array_mut(), x.as_array_mut(), a_arr, b.as_array(), c.as_array(), d.as_array(), sig.as_array());
-    } else {
-        solve_f64_c_inner(out.as_array_mut(), x.as_array_mut(), a_arr, b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+// ---------------------------------------------------------------------------
+// Quantized solver — compact matrices, see `ssmsolve.models.QuantizedStateSpaceModel`
+// ---------------------------------------------------------------------------
+
+/// Codes of a quantized matrix, decoded to `float32`.
+trait Code: Copy {
+    /// `code` 1 reads `bfloat16` and 2 reads `float16` bit patterns without subnormals.
+    fn decode(self, code: i64) -> f32;
+}
+
+impl Code for i8 {
+    #[inline]
+    fn decode(self, _code: i64) -> f32 {
+        self as f32
+    }
+}
+
+impl Code for u16 {
+    #[inline]
+    fn decode(self, code: i64) -> f32 {
+        let h = self as u32;
+        if code == 1 {
+            return f32::from_bits(h << 16);
+        }
+        // rebias the exponent from 15 to 127, zero stays zero
+        let e = (h & 0x7fff) << 13;
+        f32::from_bits(((h & 0x8000) << 16) | if e != 0 { e + 0x3800_0000 } else { 0 })
+    }
+}
+
+/// Sequential recursion on the codes `q` of `[[C, D], [A, B]]`, stored column by column, with
+/// row scales `s[..p + n]` and column scales `s[p + n..]`. Every column is decoded to `float32`
+/// and accumulated as an axpy in `T` in one pass per sample, so only the codes are streamed from
+/// memory.
+fn solve_quantized_inner<T, Q>(
+    mut out: ArrayViewMut2<T>,
+    mut x:   ArrayViewMut1<T>,
+    q: ArrayView2<Q>,
+    s: ArrayView1<T>,
+    code: i64,
+    sig: ArrayView2<T>,
+) where
+    T: Copy + Default + Add<Output = T> + Mul<Output = T> + From<f32>,
+    Q: Code,
+{
+    let (n, p) = (x.len(), out.shape()[0]);
+    let mut w = vec![T::default(); p + n];
+    for i in 0..sig.shape()[1] {
+        w.fill(T::default());
+        for (j, col) in q.axis_iter(Axis(1)).enumerate() {
+            let zj = s[p + n + j] * if j < n { x[j] } else { sig[[j - n, i]] };
+            // the branch on `code` is loop invariant and hoisted by the compiler
+            for (wk, c) in w.iter_mut().zip(col.iter()) {
+                *wk = *wk + T::from(c.decode(code)) * zj;
+            }
+        }
+        for (wk, sk) in w.iter_mut().zip(s.iter()) {
+            *wk = *sk * *wk;
+        }
+        for (yk, wk) in out.column_mut(i).iter_mut().zip(&w[..p]) {
+            *yk = *wk;
+        }
+        for (xk, wk) in x.iter_mut().zip(&w[p..]) {
+            *xk = *wk;
+        }
+    }
+}
+
+// ---------------------------------------------------------------------------
+// Modal solvers — A in real modal form, see `ssmsolve.models.DiagonalStateSpaceModel`
+// ---------------------------------------------------------------------------
+
+/// `x_nxt += A @ x_cur` for A in real modal form: `n_real` scalar modes `ad[k]` followed by
+/// 2x2 blocks `[[ad[k], ae[k]], [ae[k + 1], ad[k + 1]]]`. Linear in the number of states.
+#[inline]
+fn modal_update<T>(x_cur: &ArrayView1<T>, x_nxt: &mut ArrayViewMut1<T>, ad: &ArrayView1<T>, ae: &ArrayView1<T>, n_real: usize)
+where
+    T: Copy + Add<Output = T> + Mul<Output = T>,
+{
+    for k in 0..n_real {
+        x_nxt[k] = x_nxt[k] + ad[k] * x_cur[k];
+    }
+    for k in (n_real..x_cur.len()).step_by(2) {
+        let (x0, x1) = (x_cur[k], x_cur[k + 1]);
+        x_nxt[k]     = x_nxt[k]     + ad[k] * x0     + ae[k] * x1;
+        x_nxt[k + 1] = x_nxt[k + 1] + ae[k + 1] * x0 + ad[k + 1] * x1;
     }
+}
+
+macro_rules! make_diagonal_solver {
+    ($name:ident, $T:ty, $gemv:ident) => {
+        fn $name(
+            mut out: ArrayViewMut2<$T>,
+            mut x:   ArrayViewMut1<$T>,
+            ad: ArrayView1<$T>,
+            ae: ArrayView1<$T>,
+            n_real: usize,
+            b: ArrayView2<$T>,
+            c: ArrayView2<$T>,
+            d: ArrayView2<$T>,
+            sig: ArrayView2<$T>,
+        ) {
+            let n_samples = sig.shape()[1];
+            let n_states  = x.len();
+            let n_outputs = out.shape()[0];
+
+            let mut x_cur: Array1<$T> = x.to_owned();
+            let mut x_nxt: Array1<$T> = Array1::zeros(n_states);
+            let mut y_buf: Array1<$T> = Array1::zeros(n_outputs);
+
+            for i in 0..n_samples {
+                let sig_i = sig.column(i);
+                // y_buf = C @ x_cur + D @ sig_i
+                unsafe {
+                    $gemv(&c, &x_cur.view(), &mut y_buf.view_mut(), 1.0, 0.0);
+                    $gemv(&d, &sig_i,        &mut y_buf.view_mut(), 1.0, 1.0);
+                }
+                out.column_mut(i).assign(&y_buf);
+                // x_nxt = A @ x_cur + B @ sig_i, A applied elementwise
+                unsafe { $gemv(&b, &sig_i, &mut x_nxt.view_mut(), 1.0, 0.0) };
+                modal_update(&x_cur.view(), &mut x_nxt.view_mut(), &ad, &ae, n_real);
+                std::mem::swap(&mut x_cur, &mut x_nxt);
+            }
+            x.assign(&x_cur);
+        }
+    };
+}
+
+macro_rules! make_diagonal_block_solver {
+    ($name:ident, $T:ty, $gemm:ident, $fortran:expr) => {
+        fn $name(
+            mut out: ArrayViewMut2<$T>,
+            mut x:   ArrayViewMut1<$T>,
+            ad: ArrayView1<$T>,
+            ae: ArrayView1<$T>,
+            n_real: usize,
+            b: ArrayView2<$T>,
+            c: ArrayView2<$T>,
+            d: ArrayView2<$T>,
+            sig: ArrayView2<$T>,
+        ) {
+            let n_samples = sig.shape()[1];
+            let n_states  = x.len();
+            if n_samples == 0 {
+                return;
+            }
+
+            let shape = (n_states, n_samples + 1);
+            let mut traj: Array2<$T> = if $fortran { Array2::zeros(shape.f()) } else { Array2::zeros(shape) };
+            traj.column_mut(0).assign(&x);
+            // traj[:, 1:] = B @ sig
+            unsafe { $gemm(&b, &sig, &mut traj.slice_mut(s![.., 1..]), 1.0, 0.0) };
+            // traj[:, i + 1] += A @ traj[:, i], A applied elementwise
+            for i in 0..n_samples {
+                let (x_cur, mut x_nxt) = traj.multi_slice_mut((s![.., i], s![.., i + 1]));
+                modal_update(&x_cur.view(), &mut x_nxt, &ad, &ae, n_real);
+            }
+            // out = C @ traj[:, :-1] + D @ sig
+            unsafe {
+                $gemm(&c, &traj.slice(s![.., ..n_samples]), &mut out, 1.0, 0.0);
+                $gemm(&d, &sig,                              &mut out, 1.0, 1.0);
+            }
+            x.assign(&traj.column(n_samples));
+        }
+    };
+}
+
+make_diagonal_solver!(solve_diagonal_f32_f_inner, f32, sgemv_f);
+make_diagonal_solver!(solve_diagonal_f32_c_inner, f32, sgemv_c);
+make_diagonal_solver!(solve_diagonal_f64_f_inner, f64, dgemv_f);
+make_diagonal_solver!(solve_diagonal_f64_c_inner, f64, dgemv_c);
+
+make_diagonal_block_solver!(solve_diagonal_block_f32_f_inner, f32, sgemm_f, true);
+make_diagonal_block_solver!(solve_diagonal_block_f32_c_inner, f32, sgemm_c, false);
+make_diagonal_block_solver!(solve_diagonal_block_f64_f_inner, f64, dgemm_f, true);
+make_diagonal_block_solver!(solve_diagonal_block_f64_c_inner, f64, dgemm_c, false);
+
+// ---------------------------------------------------------------------------
+// Schur-form solvers — A quasi-upper-triangular, see `ssmsolve.models.TriangularStateSpaceModel`
+// ---------------------------------------------------------------------------
+
+/// `x_nxt += S @ x_cur` for the first subdiagonal `s` of a quasi-upper-triangular A, which is
+/// nonzero only for the 2x2 diagonal blocks of complex-conjugate pole pairs.
+#[inline]
+fn subdiagonal_update<T>(x_cur: &ArrayView1<T>, x_nxt: &mut ArrayViewMut1<T>, s: &ArrayView1<T>)
+where
+    T: Copy + Add<Output = T> + Mul<Output = T>,
+{
+    for k in 0..s.len() {
+        x_nxt[k + 1] = x_nxt[k + 1] + s[k] * x_cur[k];
+    }
+}
+
+// `$A` is the dense Schur factor (`ArrayView2`, `trmv`) or its packed upper triangle
+// (`ArrayView1`, `tpmv`); only the upper triangle is read in either case.
+macro_rules! make_triangular_solver {
+    ($name:ident, $T:ty, $A:ty, $gemv:ident, $trmv:ident) => {
+        fn $name(
+            mut out: ArrayViewMut2<$T>,
+            mut x:   ArrayViewMut1<$T>,
+            t: $A,
+            s: ArrayView1<$T>,
+            b: ArrayView2<$T>,
+            c: ArrayView2<$T>,
+            d: ArrayView2<$T>,
+            sig: ArrayView2<$T>,
+        ) {
+            let n_samples = sig.shape()[1];
+            let n_states  = x.len();
+            let n_outputs = out.shape()[0];
+
+            let mut x_cur: Array1<$T> = x.to_owned();
+            let mut x_nxt: Array1<$T> = Array1::zeros(n_states);
+            let mut y_buf: Array1<$T> = Array1::zeros(n_outputs);
+
+            for i in 0..n_samples {
+                let sig_i = sig.column(i);
+                // y_buf = C @ x_cur + D @ sig_i
+                unsafe {
+                    $gemv(&c, &x_cur.view(), &mut y_buf.view_mut(), 1.0, 0.0);
+                    $gemv(&d, &sig_i,        &mut y_buf.view_mut(), 1.0, 1.0);
+                }
+                out.column_mut(i).assign(&y_buf);
+                // x_nxt = triu(T) @ x_cur + S @ x_cur + B @ sig_i
+                x_nxt.assign(&x_cur);
+                unsafe { $trmv(&t, &mut x_nxt.view_mut()) };
+                subdiagonal_update(&x_cur.view(), &mut x_nxt.view_mut(), &s);
+                unsafe { $gemv(&b, &sig_i, &mut x_nxt.view_mut(), 1.0, 1.0) };
+                std::mem::swap(&mut x_cur, &mut x_nxt);
+            }
+            x.assign(&x_cur);
+        }
+    };
+}
+
+macro_rules! make_triangular_block_solver {
+    ($name:ident, $T:ty, $A:ty, $gemm:ident, $trmv:ident, $fortran:expr) => {
+        fn $name(
+            mut out: ArrayViewMut2<$T>,
+            mut x:   ArrayViewMut1<$T>,
+            t: $A,
+            s: ArrayView1<$T>,
+            b: ArrayView2<$T>,
+            c: ArrayView2<$T>,
+            d: ArrayView2<$T>,
+            sig: ArrayView2<$T>,
+        ) {
+            let n_samples = sig.shape()[1];
+            let n_states  = x.len();
+            if n_samples == 0 {
+                return;
+            }
+
+            let shape = (n_states, n_samples + 1);
+            let mut traj: Array2<$T> = if $fortran { Array2::zeros(shape.f()) } else { Array2::zeros(shape) };
+            let mut tx: Array1<$T> = Array1::zeros(n_states);
+            traj.column_mut(0).assign(&x);
+            // traj[:, 1:] = B @ sig
+            unsafe { $gemm(&b, &sig, &mut traj.slice_mut(s![.., 1..]), 1.0, 0.0) };
+            // traj[:, i + 1] += triu(T) @ traj[:, i] + S @ traj[:, i]
+            for i in 0..n_samples {
+                let (x_cur, mut x_nxt) = traj.multi_slice_mut((s![.., i], s![.., i + 1]));
+                tx.assign(&x_cur);
+                unsafe { $trmv(&t, &mut tx.view_mut()) };
+                subdiagonal_update(&x_cur.view(), &mut tx.view_mut(), &s);
+                x_nxt += &tx;
+            }
+            // out = C @ traj[:, :-1] + D @ sig
+            unsafe {
+                $gemm(&c, &traj.slice(s![.., ..n_samples]), &mut out, 1.0, 0.0);
+                $gemm(&d, &sig,                              &mut out, 1.0, 1.0);
+            }
+            x.assign(&traj.column(n_samples));
+        }
+    };
+}
+
+make_triangular_solver!(solve_triangular_f32_f_inner, f32, ArrayView2<f32>, sgemv_f, strmv_f);
+make_triangular_solver!(solve_triangular_f32_c_inner, f32, ArrayView2<f32>, sgemv_c, strmv_c);
+make_triangular_solver!(solve_triangular_f64_f_inner, f64, ArrayView2<f64>, dgemv_f, dtrmv_f);
+make_triangular_solver!(solve_triangular_f64_c_inner, f64, ArrayView2<f64>, dgemv_c, dtrmv_c);
+make_triangular_solver!(solve_packed_f32_f_inner, f32, ArrayView1<f32>, sgemv_f, stpmv);
+make_triangular_solver!(solve_packed_f32_c_inner, f32, ArrayView1<f32>, sgemv_c, stpmv);
+make_triangular_solver!(solve_packed_f64_f_inner, f64, ArrayView1<f64>, dgemv_f, dtpmv);
+make_triangular_solver!(solve_packed_f64_c_inner, f64, ArrayView1<f64>, dgemv_c, dtpmv);
+
+make_triangular_block_solver!(solve_triangular_block_f32_f_inner, f32, ArrayView2<f32>, sgemm_f, strmv_f, true);
+make_triangular_block_solver!(solve_triangular_block_f32_c_inner, f32, ArrayView2<f32>, sgemm_c, strmv_c, false);
+make_triangular_block_solver!(solve_triangular_block_f64_f_inner, f64, ArrayView2<f64>, dgemm_f, dtrmv_f, true);
+make_triangular_block_solver!(solve_triangular_block_f64_c_inner, f64, ArrayView2<f64>, dgemm_c, dtrmv_c, false);
+make_triangular_block_solver!(solve_packed_block_f32_f_inner, f32, ArrayView1<f32>, sgemm_f, stpmv, true);
+make_triangular_block_solver!(solve_packed_block_f32_c_inner, f32, ArrayView1<f32>, sgemm_c, stpmv, false);
+make_triangular_block_solver!(solve_packed_block_f64_f_inner, f64, ArrayView1<f64>, dgemm_f, dtpmv, true);
+make_triangular_block_solver!(solve_packed_block_f64_c_inner, f64, ArrayView1<f64>, dgemm_c, dtpmv, false);
+
+// ---------------------------------------------------------------------------
+// Batch solvers — many independent states advanced with GEMM
+// ---------------------------------------------------------------------------
+
+// `x` is the (n, batch) stack of states, `sig` and `out` are stacked over time as
+// (T, m, batch) and (T, p, batch); each time slice is a matrix in the storage order of `a`.
+macro_rules! make_batch_solver {
+    ($name:ident, $T:ty, $gemm:ident, $fortran:expr) => {
+        fn $name(
+            mut out: ArrayViewMut3<$T>,
+            mut x:   ArrayViewMut2<$T>,
+            a: ArrayView2<$T>,
+            b: ArrayView2<$T>,
+            c: ArrayView2<$T>,
+            d: ArrayView2<$T>,
+            sig: ArrayView3<$T>,
+        ) {
+            let n_samples = sig.shape()[0];
+            let shape = x.raw_dim();
+            let mut x_cur: Array2<$T> = if $fortran { Array2::zeros(shape.f()) } else { Array2::zeros(shape) };
+            let mut x_nxt: Array2<$T> = x_cur.clone();
+            x_cur.assign(&x);
+
+            for i in 0..n_samples {
+                let sig_i = sig.index_axis(Axis(0), i);
+                let mut out_i = out.index_axis_mut(Axis(0), i);
+                unsafe {
+                    // out[i] = C @ X + D @ sig[i]
+                    $gemm(&c, &x_cur.view(), &mut out_i, 1.0, 0.0);
+                    $gemm(&d, &sig_i,        &mut out_i, 1.0, 1.0);
+                    // X = A @ X + B @ sig[i]
+                    $gemm(&a, &x_cur.view(), &mut x_nxt.view_mut(), 1.0, 0.0);
+                    $gemm(&b, &sig_i,        &mut x_nxt.view_mut(), 1.0, 1.0);
+                }
+                std::mem::swap(&mut x_cur, &mut x_nxt);
+            }
+            x.assign(&x_cur);
+        }
+    };
+}
+
+make_batch_solver!(solve_batch_f32_f_inner, f32, sgemm_f, true);
+make_batch_solver!(solve_batch_f32_c_inner, f32, sgemm_c, false);
+make_batch_solver!(solve_batch_f64_f_inner, f64, dgemm_f, true);
+make_batch_solver!(solve_batch_f64_c_inner, f64, dgemm_c, false);
+
+// ---------------------------------------------------------------------------
+// Time-parallel solvers — segments of the signal on separate threads
+// ---------------------------------------------------------------------------
+
+// Pass 1 runs every segment of `l` samples from a zero state with `$inner` on its own thread. The
+// true boundary states follow from the scan `S[k + 1] = A^l @ S[k] + E[k]` over the zero-state end
+// states `E`, and pass 2 adds their free responses `C @ A^i @ S[k]` to the segment outputs.
+macro_rules! make_parallel_solver {
+    ($name:ident, $T:ty, $inner:ident, $gemv:ident) => {
+        fn $name(
+            mut out: ArrayViewMut2<$T>,
+            mut x:   ArrayViewMut1<$T>,
+            a: ArrayView2<$T>,
+            b: ArrayView2<$T>,
+            c: ArrayView2<$T>,
+            d: ArrayView2<$T>,
+            sig: ArrayView2<$T>,
+            al: ArrayView2<$T>,
+            l: usize,
+        ) {
+            let n_samples = sig.shape()[1];
+            let n_states  = x.len();
+            let n_outputs = out.shape()[0];
+            if n_samples == 0 {
+                return;
+            }
+            let n_segments = n_samples.div_ceil(l);
+
+            // pass 1: zero-state responses and end states E[k]
+            let mut ends: Vec<Array1<$T>> = (0..n_segments).map(|_| Array1::zeros(n_states)).collect();
+            std::thread::scope(|scope| {
+                let segments = out.axis_chunks_iter_mut(Axis(1), l).zip(sig.axis_chunks_iter(Axis(1), l));
+                for ((out_k, sig_k), e_k) in segments.zip(ends.iter_mut()) {
+                    scope.spawn(move || $inner(out_k, e_k.view_mut(), a, b, c, d, sig_k));
+                }
+            });
+
+            // boundary scan: S[0] = x, S[k + 1] = A^l @ S[k] + E[k]
+            let mut starts: Vec<Array1<$T>> = Vec::with_capacity(n_segments);
+            starts.push(x.to_owned());
+            for k in 1..n_segments {
+                let mut s_k = ends[k - 1].clone();
+                unsafe { $gemv(&al, &starts[k - 1].view(), &mut s_k.view_mut(), 1.0, 1.0) };
+                starts.push(s_k);
+            }
+
+            // pass 2: out[:, i] += C @ A^i @ S[k], leaves S[k] = A^len @ S[k]
+            std::thread::scope(|scope| {
+                let segments = out.axis_chunks_iter_mut(Axis(1), l).zip(starts.iter_mut());
+                for (mut out_k, z_cur) in segments {
+                    scope.spawn(move || {
+                        let mut z_nxt: Array1<$T> = Array1::zeros(n_states);
+                        let mut y_buf: Array1<$T> = Array1::zeros(n_outputs);
+                        for mut out_i in out_k.columns_mut() {
+                            unsafe {
+                                $gemv(&c, &z_cur.view(), &mut y_buf.view_mut(), 1.0, 0.0);
+                                $gemv(&a, &z_cur.view(), &mut z_nxt.view_mut(), 1.0, 0.0);
+                            }
+                            out_i += &y_buf;
+                            std::mem::swap(z_cur, &mut z_nxt);
+                        }
+                    });
+                }
+            });
+
+            // the final state is propagated through the recursion of the last segment
+            x.assign(&(&starts[n_segments - 1] + &ends[n_segments - 1]));
+        }
+    };
+}
+
+make_parallel_solver!(solve_parallel_f32_f_inner, f32, solve_f32_f_inner, sgemv_f);
+make_parallel_solver!(solve_parallel_f32_c_inner, f32, solve_f32_c_inner, sgemv_c);
+make_parallel_solver!(solve_parallel_f64_f_inner, f64, solve_f64_f_inner, dgemv_f);
+make_parallel_solver!(solve_parallel_f64_c_inner, f64, solve_f64_c_inner, dgemv_c);
+
+// ---------------------------------------------------------------------------
+// Python-callable functions — dispatch on array layout
+// ---------------------------------------------------------------------------
+
+/// Python-callable solver for `float32` state-space systems.
+///
+/// Parameters
+/// ----------
+/// out : numpy.ndarray, shape (p, T), float32, writable
+///     Output array filled in place.
+/// x : numpy.ndarray, shape (n,), float32, writable
+///     System state vector; updated in place to the state after the last sample.
+/// a, b, c, d : numpy.ndarray, float32
+///     System matrices (shapes (n,n), (n,m), (p,n), (p,m)).
+/// sig : numpy.ndarray, shape (m, T), float32
+///     Input signal.
+#[pyfunction]
+fn solve_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    a: PyReadonlyArray2<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(a, b, c, d) {
+            solve_f32_f_inner(out, x, a, b, c, d, sig);
+        } else {
+            solve_f32_c_inner(out, x, a, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable solver for `float64` state-space systems.
+///
+/// Parameters
+/// ----------
+/// out : numpy.ndarray, shape (p, T), float64, writable
+///     Output array filled in place.
+/// x : numpy.ndarray, shape (n,), float64, writable
+///     System state vector; updated in place to the state after the last sample.
+/// a, b, c, d : numpy.ndarray, float64
+///     System matrices (shapes (n,n), (n,m), (p,n), (p,m)).
+/// sig : numpy.ndarray, shape (m, T), float64
+///     Input signal.
+#[pyfunction]
+fn solve_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    a: PyReadonlyArray2<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(a, b, c, d) {
+            solve_f64_f_inner(out, x, a, b, c, d, sig);
+        } else {
+            solve_f64_c_inner(out, x, a, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable solver for bursty input and `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`, plus the state norm ``threshold`` before ``sig``. Samples
+/// whose inputs are all zero only compute the free response, and once the state norm is at most
+/// ``threshold`` on such a sample, the state is set to zero and the output is zero without any
+/// products until the next nonzero input.
+#[pyfunction]
+fn solve_silent_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    a: PyReadonlyArray2<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    threshold: f32,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    py.detach(|| {
+        if column_major!(a, b, c, d) {
+            solve_silent_f32_f_inner(out, x, a, b, c, d, threshold, sig);
+        } else {
+            solve_silent_f32_c_inner(out, x, a, b, c, d, threshold, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable solver for bursty input and `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_silent_f32` in double precision.
+#[pyfunction]
+fn solve_silent_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    a: PyReadonlyArray2<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    threshold: f64,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    py.detach(|| {
+        if column_major!(a, b, c, d) {
+            solve_silent_f64_f_inner(out, x, a, b, c, d, threshold, sig);
+        } else {
+            solve_silent_f64_c_inner(out, x, a, b, c, d, threshold, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable solver crossfading between two output maps of a `float32` state-space system.
+///
+/// Same arguments as :func:`solve_f32`, plus a second output map ``c2``, ``d2`` of the same shapes as
+/// ``c``, ``d`` and the ``gain`` of every sample before ``sig``. The output of sample ``i`` is
+/// ``(1 - gain[i]) * (c @ x + d @ u) + gain[i] * (c2 @ x + d2 @ u)``.
+#[pyfunction]
+fn solve_crossfade_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    a: PyReadonlyArray2<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    c2: PyReadonlyArray2<'py, f32>,
+    d2: PyReadonlyArray2<'py, f32>,
+    gain: PyReadonlyArray1<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d) = (a.as_array(), b.as_array(), c.as_array(), d.as_array());
+    let (c2, d2, gain, sig) = (c2.as_array(), d2.as_array(), gain.as_array(), sig.as_array());
+    py.detach(|| {
+        if column_major!(a, b, c, d, c2, d2) {
+            solve_crossfade_f32_f_inner(out, x, a, b, c, d, c2, d2, gain, sig);
+        } else {
+            solve_crossfade_f32_c_inner(out, x, a, b, c, d, c2, d2, gain, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable solver crossfading between two output maps of a `float64` state-space system.
+///
+/// Same arguments as :func:`solve_crossfade_f32` in double precision.
+#[pyfunction]
+fn solve_crossfade_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    a: PyReadonlyArray2<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    c2: PyReadonlyArray2<'py, f64>,
+    d2: PyReadonlyArray2<'py, f64>,
+    gain: PyReadonlyArray1<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d) = (a.as_array(), b.as_array(), c.as_array(), d.as_array());
+    let (c2, d2, gain, sig) = (c2.as_array(), d2.as_array(), gain.as_array(), sig.as_array());
+    py.detach(|| {
+        if column_major!(a, b, c, d, c2, d2) {
+            solve_crossfade_f64_f_inner(out, x, a, b, c, d, c2, d2, gain, sig);
+        } else {
+            solve_crossfade_f64_c_inner(out, x, a, b, c, d, c2, d2, gain, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable small-order solver for `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`, with ``m = [[C, D], [A, B]]`` in Fortran order and a
+/// scratch vector ``w`` of ``p + n`` entries in place of ``A, B, C, D``. Computes output and state
+/// update of every sample in one fused pass without BLAS calls, for any storage order of the
+/// signals. Faster than :func:`solve_f32` for models with a few dozen states, see
+/// ``ssmsolve.models._SMALL_ORDER``.
+#[pyfunction]
+fn solve_small_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    m: PyReadonlyArray2<'py, f32>,
+    mut w:   PyReadwriteArray1<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x, w) = (out.as_array_mut(), x.as_array_mut(), w.as_array_mut());
+    let (m, sig) = (m.as_array(), sig.as_array());
+    py.detach(|| solve_small_inner(out, x, m, w, sig));
+    Ok(())
+}
+
+/// Python-callable small-order solver for `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_f64`, with ``m = [[C, D], [A, B]]`` in Fortran order and a
+/// scratch vector ``w`` of ``p + n`` entries in place of ``A, B, C, D``. Computes output and state
+/// update of every sample in one fused pass without BLAS calls, for any storage order of the
+/// signals. Faster than :func:`solve_f64` for models with a few dozen states, see
+/// ``ssmsolve.models._SMALL_ORDER``.
+#[pyfunction]
+fn solve_small_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    m: PyReadonlyArray2<'py, f64>,
+    mut w:   PyReadwriteArray1<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x, w) = (out.as_array_mut(), x.as_array_mut(), w.as_array_mut());
+    let (m, sig) = (m.as_array(), sig.as_array());
+    py.detach(|| solve_small_inner(out, x, m, w, sig));
+    Ok(())
+}
+
+/// Python-callable quantized solver for ``int8`` codes and `float32` state and signals.
+///
+/// ``q`` of shape (p + n, n + m), F-order, holds the codes of ``[[C, D], [A, B]]``, ``s`` of length
+/// (p + n) + (n + m) the row and column scales and ``code`` the format, see
+/// ``ssmsolve.models.QuantizedStateSpaceModel``. ``out``, ``x`` and ``sig`` as in :func:`solve_f32`.
+#[pyfunction]
+fn solve_quantized_i8_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    q: PyReadonlyArray2<'py, i8>,
+    s: PyReadonlyArray1<'py, f32>,
+    code: i64,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (q, s, sig) = (q.as_array(), s.as_array(), sig.as_array());
+    py.detach(|| solve_quantized_inner(out, x, q, s, code, sig));
+    Ok(())
+}
+
+/// Python-callable quantized solver for ``bfloat16`` or ``float16`` bit patterns and `float32` state and signals.
+///
+/// ``q`` of shape (p + n, n + m), F-order, holds the codes of ``[[C, D], [A, B]]``, ``s`` of length
+/// (p + n) + (n + m) the row and column scales and ``code`` the format, see
+/// ``ssmsolve.models.QuantizedStateSpaceModel``. ``out``, ``x`` and ``sig`` as in :func:`solve_f32`.
+#[pyfunction]
+fn solve_quantized_u16_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    q: PyReadonlyArray2<'py, u16>,
+    s: PyReadonlyArray1<'py, f32>,
+    code: i64,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (q, s, sig) = (q.as_array(), s.as_array(), sig.as_array());
+    py.detach(|| solve_quantized_inner(out, x, q, s, code, sig));
+    Ok(())
+}
+
+/// Python-callable quantized solver for ``int8`` codes and `float64` state and signals.
+///
+/// ``q`` of shape (p + n, n + m), F-order, holds the codes of ``[[C, D], [A, B]]``, ``s`` of length
+/// (p + n) + (n + m) the row and column scales and ``code`` the format, see
+/// ``ssmsolve.models.QuantizedStateSpaceModel``. ``out``, ``x`` and ``sig`` as in :func:`solve_f64`.
+#[pyfunction]
+fn solve_quantized_i8_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    q: PyReadonlyArray2<'py, i8>,
+    s: PyReadonlyArray1<'py, f64>,
+    code: i64,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (q, s, sig) = (q.as_array(), s.as_array(), sig.as_array());
+    py.detach(|| solve_quantized_inner(out, x, q, s, code, sig));
+    Ok(())
+}
+
+/// Python-callable quantized solver for ``bfloat16`` or ``float16`` bit patterns and `float64` state and signals.
+///
+/// ``q`` of shape (p + n, n + m), F-order, holds the codes of ``[[C, D], [A, B]]``, ``s`` of length
+/// (p + n) + (n + m) the row and column scales and ``code`` the format, see
+/// ``ssmsolve.models.QuantizedStateSpaceModel``. ``out``, ``x`` and ``sig`` as in :func:`solve_f64`.
+#[pyfunction]
+fn solve_quantized_u16_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    q: PyReadonlyArray2<'py, u16>,
+    s: PyReadonlyArray1<'py, f64>,
+    code: i64,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (q, s, sig) = (q.as_array(), s.as_array(), sig.as_array());
+    py.detach(|| solve_quantized_inner(out, x, q, s, code, sig));
+    Ok(())
+}
+
+/// Python-callable block solver for `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`. ``B @ sig`` and ``C @ X + D @ sig`` are computed for the
+/// whole chunk with GEMM, only the ``A @ x`` recursion is evaluated sample by sample.
+#[pyfunction]
+fn solve_block_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    a: PyReadonlyArray2<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(a, b, c, d, sig, out) {
+            solve_block_f32_f_inner(out, x, a, b, c, d, sig);
+        } else {
+            solve_block_f32_c_inner(out, x, a, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable block solver for `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_f64`. ``B @ sig`` and ``C @ X + D @ sig`` are computed for the
+/// whole chunk with GEMM, only the ``A @ x`` recursion is evaluated sample by sample.
+#[pyfunction]
+fn solve_block_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    a: PyReadonlyArray2<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(a, b, c, d, sig, out) {
+            solve_block_f64_f_inner(out, x, a, b, c, d, sig);
+        } else {
+            solve_block_f64_c_inner(out, x, a, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable modal solver for `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`, with the real modal representation ``ad, ae, n_real`` of
+/// ``A`` (see ``ssmsolve.models.DiagonalStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_diagonal_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    ad: PyReadonlyArray1<'py, f32>,
+    ae: PyReadonlyArray1<'py, f32>,
+    n_real: usize,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (ad, ae, b, c, d, sig) = (ad.as_array(), ae.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(b, c, d) {
+            solve_diagonal_f32_f_inner(out, x, ad, ae, n_real, b, c, d, sig);
+        } else {
+            solve_diagonal_f32_c_inner(out, x, ad, ae, n_real, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable modal block solver for `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`, with the real modal representation ``ad, ae, n_real`` of
+/// ``A`` (see ``ssmsolve.models.DiagonalStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_diagonal_block_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    ad: PyReadonlyArray1<'py, f32>,
+    ae: PyReadonlyArray1<'py, f32>,
+    n_real: usize,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (ad, ae, b, c, d, sig) = (ad.as_array(), ae.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(b, c, d, sig, out) {
+            solve_diagonal_block_f32_f_inner(out, x, ad, ae, n_real, b, c, d, sig);
+        } else {
+            solve_diagonal_block_f32_c_inner(out, x, ad, ae, n_real, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable modal solver for `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_f64`, with the real modal representation ``ad, ae, n_real`` of
+/// ``A`` (see ``ssmsolve.models.DiagonalStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_diagonal_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    ad: PyReadonlyArray1<'py, f64>,
+    ae: PyReadonlyArray1<'py, f64>,
+    n_real: usize,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (ad, ae, b, c, d, sig) = (ad.as_array(), ae.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(b, c, d) {
+            solve_diagonal_f64_f_inner(out, x, ad, ae, n_real, b, c, d, sig);
+        } else {
+            solve_diagonal_f64_c_inner(out, x, ad, ae, n_real, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable modal block solver for `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_f64`, with the real modal representation ``ad, ae, n_real`` of
+/// ``A`` (see ``ssmsolve.models.DiagonalStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_diagonal_block_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    ad: PyReadonlyArray1<'py, f64>,
+    ae: PyReadonlyArray1<'py, f64>,
+    n_real: usize,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (ad, ae, b, c, d, sig) = (ad.as_array(), ae.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(b, c, d, sig, out) {
+            solve_diagonal_block_f64_f_inner(out, x, ad, ae, n_real, b, c, d, sig);
+        } else {
+            solve_diagonal_block_f64_c_inner(out, x, ad, ae, n_real, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable Schur-form solver for `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`, with the quasi-upper-triangular Schur factor ``t`` and its first
+/// subdiagonal ``s`` (see ``ssmsolve.models.TriangularStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_triangular_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    t: PyReadonlyArray2<'py, f32>,
+    s: PyReadonlyArray1<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (t, s, b, c, d, sig) = (t.as_array(), s.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(t, b, c, d) {
+            solve_triangular_f32_f_inner(out, x, t, s, b, c, d, sig);
+        } else {
+            solve_triangular_f32_c_inner(out, x, t, s, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable Schur-form solver for `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_f64`, with the quasi-upper-triangular Schur factor ``t`` and its first
+/// subdiagonal ``s`` (see ``ssmsolve.models.TriangularStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_triangular_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    t: PyReadonlyArray2<'py, f64>,
+    s: PyReadonlyArray1<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (t, s, b, c, d, sig) = (t.as_array(), s.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(t, b, c, d) {
+            solve_triangular_f64_f_inner(out, x, t, s, b, c, d, sig);
+        } else {
+            solve_triangular_f64_c_inner(out, x, t, s, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable Schur-form block solver for `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`, with the quasi-upper-triangular Schur factor ``t`` and its first
+/// subdiagonal ``s`` (see ``ssmsolve.models.TriangularStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_triangular_block_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    t: PyReadonlyArray2<'py, f32>,
+    s: PyReadonlyArray1<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (t, s, b, c, d, sig) = (t.as_array(), s.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(t, b, c, d, sig, out) {
+            solve_triangular_block_f32_f_inner(out, x, t, s, b, c, d, sig);
+        } else {
+            solve_triangular_block_f32_c_inner(out, x, t, s, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable Schur-form block solver for `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_f64`, with the quasi-upper-triangular Schur factor ``t`` and its first
+/// subdiagonal ``s`` (see ``ssmsolve.models.TriangularStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_triangular_block_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    t: PyReadonlyArray2<'py, f64>,
+    s: PyReadonlyArray1<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (t, s, b, c, d, sig) = (t.as_array(), s.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(t, b, c, d, sig, out) {
+            solve_triangular_block_f64_f_inner(out, x, t, s, b, c, d, sig);
+        } else {
+            solve_triangular_block_f64_c_inner(out, x, t, s, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable packed Schur-form solver for `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`, with the upper triangle of the Schur factor packed column by column ``t`` and its first
+/// subdiagonal ``s`` (see ``ssmsolve.models.TriangularStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_packed_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    t: PyReadonlyArray1<'py, f32>,
+    s: PyReadonlyArray1<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (t, s, b, c, d, sig) = (t.as_array(), s.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(b, c, d) {
+            solve_packed_f32_f_inner(out, x, t, s, b, c, d, sig);
+        } else {
+            solve_packed_f32_c_inner(out, x, t, s, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable packed Schur-form solver for `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_f64`, with the upper triangle of the Schur factor packed column by column ``t`` and its first
+/// subdiagonal ``s`` (see ``ssmsolve.models.TriangularStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_packed_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    t: PyReadonlyArray1<'py, f64>,
+    s: PyReadonlyArray1<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (t, s, b, c, d, sig) = (t.as_array(), s.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(b, c, d) {
+            solve_packed_f64_f_inner(out, x, t, s, b, c, d, sig);
+        } else {
+            solve_packed_f64_c_inner(out, x, t, s, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable packed Schur-form block solver for `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`, with the upper triangle of the Schur factor packed column by column ``t`` and its first
+/// subdiagonal ``s`` (see ``ssmsolve.models.TriangularStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_packed_block_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    t: PyReadonlyArray1<'py, f32>,
+    s: PyReadonlyArray1<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (t, s, b, c, d, sig) = (t.as_array(), s.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(b, c, d, sig, out) {
+            solve_packed_block_f32_f_inner(out, x, t, s, b, c, d, sig);
+        } else {
+            solve_packed_block_f32_c_inner(out, x, t, s, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable packed Schur-form block solver for `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_f64`, with the upper triangle of the Schur factor packed column by column ``t`` and its first
+/// subdiagonal ``s`` (see ``ssmsolve.models.TriangularStateSpaceModel``) in place of ``a``.
+#[pyfunction]
+fn solve_packed_block_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    t: PyReadonlyArray1<'py, f64>,
+    s: PyReadonlyArray1<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (t, s, b, c, d, sig) = (t.as_array(), s.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(b, c, d, sig, out) {
+            solve_packed_block_f64_f_inner(out, x, t, s, b, c, d, sig);
+        } else {
+            solve_packed_block_f64_c_inner(out, x, t, s, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable batch solver for `float32` state-space systems.
+///
+/// Advances ``batch`` independent instances of the same system. ``x`` is the ``(n, batch)`` stack
+/// of states, ``sig`` and ``out`` are stacked over time as ``(T, m, batch)`` and ``(T, p, batch)``
+/// with every time slice in the storage order of ``a``. Each sample costs four GEMMs, so ``A`` is
+/// loaded once for the whole batch instead of once per instance.
+#[pyfunction]
+fn solve_batch_f32<'py>(
+    mut out: PyReadwriteArray3<'py, f32>,
+    mut x:   PyReadwriteArray2<'py, f32>,
+    a: PyReadonlyArray2<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray3<'py, f32>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(a, b, c, d, x)
+            && is_column_major(&sig.shape()[1..], &sig.strides()[1..])
+            && is_column_major(&out.shape()[1..], &out.strides()[1..])
+        {
+            solve_batch_f32_f_inner(out, x, a, b, c, d, sig);
+        } else {
+            solve_batch_f32_c_inner(out, x, a, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable batch solver for `float64` state-space systems.
+///
+/// Advances ``batch`` independent instances of the same system. ``x`` is the ``(n, batch)`` stack
+/// of states, ``sig`` and ``out`` are stacked over time as ``(T, m, batch)`` and ``(T, p, batch)``
+/// with every time slice in the storage order of ``a``. Each sample costs four GEMMs, so ``A`` is
+/// loaded once for the whole batch instead of once per instance.
+#[pyfunction]
+fn solve_batch_f64<'py>(
+    mut out: PyReadwriteArray3<'py, f64>,
+    mut x:   PyReadwriteArray2<'py, f64>,
+    a: PyReadonlyArray2<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray3<'py, f64>,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(a, b, c, d, x)
+            && is_column_major(&sig.shape()[1..], &sig.strides()[1..])
+            && is_column_major(&out.shape()[1..], &out.strides()[1..])
+        {
+            solve_batch_f64_f_inner(out, x, a, b, c, d, sig);
+        } else {
+            solve_batch_f64_c_inner(out, x, a, b, c, d, sig);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable time-parallel solver for `float32` state-space systems.
+///
+/// Same arguments as :func:`solve_f32`, plus ``al = A**l`` and the segment length ``l``. The
+/// signal is processed in segments of ``l`` samples, each on its own thread.
+#[pyfunction]
+fn solve_parallel_f32<'py>(
+    mut out: PyReadwriteArray2<'py, f32>,
+    mut x:   PyReadwriteArray1<'py, f32>,
+    a: PyReadonlyArray2<'py, f32>,
+    b: PyReadonlyArray2<'py, f32>,
+    c: PyReadonlyArray2<'py, f32>,
+    d: PyReadonlyArray2<'py, f32>,
+    sig: PyReadonlyArray2<'py, f32>,
+    al: PyReadonlyArray2<'py, f32>,
+    l: usize,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig, al) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array(), al.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(a, b, c, d, al) {
+            solve_parallel_f32_f_inner(out, x, a, b, c, d, sig, al, l);
+        } else {
+            solve_parallel_f32_c_inner(out, x, a, b, c, d, sig, al, l);
+        }
+    });
+    Ok(())
+}
+
+/// Python-callable time-parallel solver for `float64` state-space systems.
+///
+/// Same arguments as :func:`solve_f64`, plus ``al = A**l`` and the segment length ``l``. The
+/// signal is processed in segments of ``l`` samples, each on its own thread.
+#[pyfunction]
+fn solve_parallel_f64<'py>(
+    mut out: PyReadwriteArray2<'py, f64>,
+    mut x:   PyReadwriteArray1<'py, f64>,
+    a: PyReadonlyArray2<'py, f64>,
+    b: PyReadonlyArray2<'py, f64>,
+    c: PyReadonlyArray2<'py, f64>,
+    d: PyReadonlyArray2<'py, f64>,
+    sig: PyReadonlyArray2<'py, f64>,
+    al: PyReadonlyArray2<'py, f64>,
+    l: usize,
+) -> PyResult<()> {
+    let py = sig.py();
+    let (out, x) = (out.as_array_mut(), x.as_array_mut());
+    let (a, b, c, d, sig, al) = (a.as_array(), b.as_array(), c.as_array(), d.as_array(), sig.as_array(), al.as_array());
+    // the recursion only touches the borrowed arrays, other Python threads may run meanwhile
+    py.detach(|| {
+        if column_major!(a, b, c, d, al) {
+            solve_parallel_f64_f_inner(out, x, a, b, c, d, sig, al, l);
+        } else {
+            solve_parallel_f64_c_inner(out, x, a, b, c, d, sig, al, l);
+        }
+    });
     Ok(())
 }
 
@@ -210,5 +1814,33 @@ fn solve_f64<'py>(
 fn ssmsolve_rs(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(solve_f32, m)?)?;
     m.add_function(wrap_pyfunction!(solve_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_silent_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_silent_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_crossfade_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_crossfade_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_small_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_small_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_block_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_block_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_diagonal_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_diagonal_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_diagonal_block_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_diagonal_block_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_triangular_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_triangular_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_triangular_block_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_triangular_block_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_packed_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_packed_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_packed_block_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_packed_block_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_batch_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_batch_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_parallel_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_parallel_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_quantized_i8_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_quantized_u16_f32, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_quantized_i8_f64, m)?)?;
+    m.add_function(wrap_pyfunction!(solve_quantized_u16_f64, m)?)?;
     Ok(())
 }
@@ -0,0 +1,76 @@
+"""Shared helpers for the ssmsolve benchmark scripts."""
+
+import json
+import os
+import platform
+import time
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+import ssmsolve.backends as _backends
+from ssmsolve.backends import BACKENDS, available_backends
+
+
+def backends(names=BACKENDS):
+    """Names of the installed backends in ``names``."""
+    return [name for name in available_backends() if name in names]
+
+
+def random_system(n, m, p, seed=0):
+    """Random stable ``(A, B, C)`` with spectral radius 0.9."""
+    rng = np.random.default_rng(seed)
+    A = rng.standard_normal((n, n))
+    A *= 0.9 / np.max(np.abs(np.linalg.eigvals(A)))
+    return A, rng.standard_normal((n, m)), rng.standard_normal((p, n))
+
+
+def timings(fn, min_calls=3, max_calls=1000, min_time=1.0):
+    """Wall-clock times in seconds of repeated calls of ``fn``.
+
+    Calls ``fn`` at least ``min_calls`` and at most ``max_calls`` times, and stops once
+    ``min_time`` seconds have been spent.
+    """
+    t = []
+    start = time.perf_counter()
+    while len(t) < max_calls and (len(t) < min_calls or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn()
+        t.append(time.perf_counter() - t0)
+    return np.array(t)
+
+
+def percentiles(t, q=(10, 50, 90, 99)):
+    """Percentiles of ``t`` as a dict ``{'p10': ..., ...}``."""
+    return {f"p{k}": float(v) for k, v in zip(q, np.percentile(t, q), strict=True)}
+
+
+def machine_info(packages=()):
+    """Hardware and software description stored with every result file."""
+
+    def _version(name):
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return None
+
+    blas = np.show_config(mode="dicts").get("Build Dependencies", {}).get("blas", {})
+    return {
+        "node": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numpy_blas": {key: blas.get(key) for key in ("name", "version")},
+        "ssmsolve_backend": _backends.BACKEND,
+        "packages": {name: _version(name) for name in packages},
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def save(path, machine, config, results):
+    """Write a result file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"machine": machine, "config": config, "results": results}, f, indent=2)
+    print(f"Results written to {path}")
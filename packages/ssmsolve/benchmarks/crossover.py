@@ -0,0 +1,85 @@
+"""Crossover between the fused small-order kernel and the BLAS solver.
+
+Times :meth:`StateSpaceModel.process_block` with the ``'sample'`` method for increasing model
+orders, once with the fused ``solve_small`` kernel and once with the ``gemv`` based ``solve``
+kernel, by moving the dispatch threshold ``ssmsolve.models._SMALL_ORDER``. The largest order at
+which the fused kernel is still faster is a candidate for the threshold on the machine at hand.
+
+Usage::
+
+    python benchmarks/crossover.py
+    python benchmarks/crossover.py --n 4 8 16 32 64 --m 1 --p 1 --backend rust
+"""
+
+import argparse
+import os
+import platform
+
+import numpy as np
+import ssmsolve.models as _m
+from common import backends, machine_info, random_system, save, timings
+from ssmsolve.models import StateSpaceModel
+
+
+def measure(sys, T, min_time):
+    """Mean time per block of ``T`` samples in seconds."""
+    rng = np.random.default_rng(0)
+    sys.init_state()
+    u, out = sys.init_block(T)
+    u[...] = rng.standard_normal(u.shape)
+    sys.process_block(u, out)  # warm-up, includes JIT compilation
+    return float(np.mean(timings(lambda: sys.process_block(u, out), max_calls=10000, min_time=min_time)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, nargs="+", default=[2, 4, 8, 16, 24, 32, 48, 64, 96, 128], help="orders")
+    parser.add_argument("--m", type=int, default=2, help="number of inputs")
+    parser.add_argument("--p", type=int, default=2, help="number of outputs")
+    parser.add_argument("--T", type=int, default=256, help="block size")
+    parser.add_argument("--backend", nargs="+", default=["rust", "numba"], choices=["rust", "numba"])
+    parser.add_argument("--dtype", nargs="+", default=["float32", "float64"], choices=["float32", "float64"])
+    parser.add_argument("--storage", default="F", choices=["F", "C"])
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent per point")
+    parser.add_argument(
+        "-o", "--output", default=os.path.join("benchmarks", "results", f"{platform.node()}-crossover.json")
+    )
+    args = parser.parse_args()
+
+    threshold = _m._SMALL_ORDER
+    results = []
+    print(f"m={args.m} p={args.p} T={args.T} storage={args.storage}, samples/s, current threshold n <= {threshold}")
+    try:
+        for name in backends(args.backend):
+            for dtype in args.dtype:
+                crossover = None
+                for n in args.n:
+                    sys = StateSpaceModel(
+                        *random_system(n, args.m, args.p),
+                        sampling_rate=48000,
+                        dtype=dtype,
+                        storage=args.storage,
+                        backend=name,
+                    )
+                    rates = {}
+                    for kernel, order in (("fused", max(args.n)), ("blas", 0)):
+                        _m._SMALL_ORDER = order
+                        rates[kernel] = args.T / measure(sys, args.T, args.min_time)
+                    speedup = rates["fused"] / rates["blas"]
+                    if speedup > 1:
+                        crossover = n
+                    results.append({"backend": name, "dtype": dtype, "n": n} | rates | {"speedup": speedup})
+                    print(
+                        f"{name:>5} {dtype} n={n:<4} fused {rates['fused']:>10.4g}  blas {rates['blas']:>10.4g}  "
+                        f"speedup {speedup:.2f}"
+                    )
+                print(f"{name:>5} {dtype} fused kernel faster up to n = {crossover}")
+    finally:
+        _m._SMALL_ORDER = threshold
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    save(args.output, machine_info(("ssmsolve", "ssmsolve-rs", "numba")), config | {"threshold": threshold}, results)
+
+
+if __name__ == "__main__":
+    main()
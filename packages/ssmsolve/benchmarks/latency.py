@@ -0,0 +1,58 @@
+"""Per-block latency of the streaming APIs for every installed backend.
+
+Compares :meth:`StateSpaceModel.process`, which wraps each block in a :class:`pyfar.Signal` and
+allocates the output, with :meth:`StateSpaceModel.process_block` writing into caller-provided
+buffers at small real-time block sizes. The difference of the two is the per-call overhead.
+
+Usage::
+
+    python benchmarks/latency.py --n 64 --blocks 32 64 128 256
+"""
+
+import argparse
+
+import numpy as np
+from common import backends, random_system, timings
+from pyfar import Signal
+from ssmsolve.models import StateSpaceModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=64, help="model order")
+    parser.add_argument("--m", type=int, default=2, help="number of inputs")
+    parser.add_argument("--p", type=int, default=2, help="number of outputs")
+    parser.add_argument("--blocks", type=int, nargs="+", default=[32, 64, 128, 256], help="block sizes")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float64"])
+    parser.add_argument("--storage", default="F", choices=["F", "C"])
+    parser.add_argument("--calls", type=int, default=2000, help="timed calls per configuration")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    A, B, C = random_system(args.n, args.m, args.p)
+
+    header = f"{'backend':>8} {'block':>6} {'process':>18} {'process_block':>18} {'overhead':>10}"
+    print(f"n={args.n} m={args.m} p={args.p} dtype={args.dtype} storage={args.storage}, latency in µs (median / p99)")
+    print(header)
+    print("-" * len(header))
+    for name in backends():
+        sys = StateSpaceModel(A, B, C, sampling_rate=48000, dtype=args.dtype, storage=args.storage, backend=name)
+        for T in args.blocks:
+            sig = Signal(rng.standard_normal((args.m, T)).astype(args.dtype), sampling_rate=48000)
+            sys.init_state()
+            u, out = sys.init_block(T)
+            u[...] = sig.time
+            # warm-up, includes JIT compilation
+            sys.process(sig)
+            sys.process_block(u, out)
+            t_signal = 1e6 * timings(lambda sys=sys, sig=sig: sys.process(sig), args.calls, args.calls)
+            t_block = 1e6 * timings(lambda sys=sys, u=u, out=out: sys.process_block(u, out), args.calls, args.calls)
+            med_signal, med_block = np.median(t_signal), np.median(t_block)
+            print(
+                f"{name:>8} {T:>6} {med_signal:>8.1f} / {np.percentile(t_signal, 99):>7.1f} "
+                f"{med_block:>8.1f} / {np.percentile(t_block, 99):>7.1f} {med_signal - med_block:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
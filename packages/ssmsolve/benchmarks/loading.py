@@ -0,0 +1,130 @@
+"""Load time and memory of many models in many worker processes.
+
+Writes ``--models`` random models with :func:`ssmsolve.io.save` and starts ``--workers`` processes
+that each load all of them with :func:`ssmsolve.io.load`, once memory-mapped and once read into
+private memory, and run one block through every model, which touches all of its matrices. Every
+worker reports the time per model to load it and to run its first block, its resident set size
+(RSS) and its proportional set size (PSS), which splits pages shared by several processes evenly
+between them. Memory-mapped models are held once in the page cache for all workers, so their PSS
+shrinks with the number of workers while that of private copies does not. Memory is read from
+``/proc/self/smaps_rollup`` while all workers hold their models, so the benchmark runs on Linux
+only.
+
+Usage::
+
+    python benchmarks/loading.py
+    python benchmarks/loading.py --models 256 --n 128 --workers 8 --model diagonal
+"""
+
+import argparse
+import multiprocessing
+import os
+import platform
+import tempfile
+import time
+
+import numpy as np
+from common import machine_info, random_system, save
+from ssmsolve import io
+from ssmsolve.models import DiagonalStateSpaceModel, StateSpaceModel, TriangularStateSpaceModel
+
+MODELS = {"dense": StateSpaceModel, "diagonal": DiagonalStateSpaceModel, "triangular": TriangularStateSpaceModel}
+
+
+def memory():
+    """Resident and proportional set size of this process in bytes."""
+    sizes = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                sizes[key] = int(value.split()[0]) * 1024
+    return sizes["Rss"], sizes["Pss"]
+
+
+def first_block(models, block):
+    for sys in models:
+        u, out = sys.init_block(block)
+        sys.process_block(u, out)
+
+
+def worker(paths, mmap, block, barrier, queue):
+    # import and compile the kernels first, so that only the models are measured
+    first_block([io.load(paths[0], mmap=False)], block)
+    rss0, pss0 = memory()
+    t0 = time.perf_counter()
+    models = [io.load(path, mmap=mmap) for path in paths]
+    t_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    first_block(models, block)
+    t_first = time.perf_counter() - t0
+    # all workers hold their models while memory is read
+    barrier.wait()
+    rss, pss = memory()
+    queue.put({"load": t_load, "first_block": t_first, "rss": rss - rss0, "pss": pss - pss0})
+    barrier.wait()
+
+
+def run(paths, mmap, workers, block):
+    ctx = multiprocessing.get_context("spawn")
+    barrier, queue = ctx.Barrier(workers), ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(paths, mmap, block, barrier, queue)) for _ in range(workers)]
+    for p in processes:
+        p.start()
+    results = [queue.get() for _ in processes]
+    for p in processes:
+        p.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=128, help="number of models")
+    parser.add_argument("--n", type=int, default=256, help="model order")
+    parser.add_argument("--m", type=int, default=2, help="number of inputs")
+    parser.add_argument("--p", type=int, default=2, help="number of outputs")
+    parser.add_argument("--model", default="dense", choices=list(MODELS))
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float64"])
+    parser.add_argument("--storage", default="F", choices=["F", "C"])
+    parser.add_argument("--workers", type=int, default=4, help="number of worker processes")
+    parser.add_argument("--block", type=int, default=64, help="block size of the first block")
+    parser.add_argument("--dir", default=None, help="directory of the model files, e.g. /dev/shm")
+    parser.add_argument(
+        "-o", "--output", default=os.path.join("benchmarks", "results", f"{platform.node()}-loading.json")
+    )
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as d:
+        paths = []
+        for i in range(args.models):
+            A, B, C = random_system(args.n, args.m, args.p, seed=i)
+            sys = MODELS[args.model](A, B, C, sampling_rate=48000, dtype=args.dtype, storage=args.storage)
+            paths.append(os.path.join(d, f"model{i}.ssm"))
+            io.save(sys, paths[-1])
+        size = sum(os.path.getsize(path) for path in paths)
+        print(
+            f"{args.models} {args.model} models, n={args.n} m={args.m} p={args.p} {args.dtype}, "
+            f"{size / 2**20:.1f} MiB on disk, {args.workers} workers"
+        )
+        for mmap in (True, False):
+            workers = run(paths, mmap, args.workers, args.block)
+            res = {"mmap": mmap, "file_bytes": size, "workers": workers}
+            for key in ("load", "first_block", "rss", "pss"):
+                res[key] = float(np.median([w[key] for w in workers]))
+            res["load_per_model"] = res["load"] / args.models
+            res["total_pss"] = sum(w["pss"] for w in workers)
+            print(
+                f"{'memory-mapped' if mmap else 'private copy':>13}: load {res['load_per_model'] * 1e6:7.1f} µs/model, "
+                f"first block {res['first_block'] / args.models * 1e6:7.1f} µs/model, "
+                f"per worker RSS {res['rss'] / 2**20:6.1f} MiB PSS {res['pss'] / 2**20:6.1f} MiB, "
+                f"total PSS {res['total_pss'] / 2**20:6.1f} MiB"
+            )
+            results.append(res)
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    save(args.output, machine_info(("ssmsolve", "ssmsolve-rs", "numba", "pyfar")), config, results)
+
+
+if __name__ == "__main__":
+    main()
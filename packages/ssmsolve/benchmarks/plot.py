@@ -0,0 +1,97 @@
+"""Plot benchmark results of ``run.py``, e.g. to regenerate ``benchmarks.png``.
+
+Usage::
+
+    python benchmarks/plot.py benchmarks/results/<node>.json -o benchmarks.png
+
+Requires matplotlib.
+"""
+
+import argparse
+import json
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+COLORS = {"rust": "#e05a47", "numba": "#f0a30a", "pyfar": "#4a90d9"}
+LABELS = {"rust": "rust", "numba": "numba", "pyfar": "pyfar (scipy BLAS)"}
+MARKERS = {"float32": ("o", "-"), "float64": ("s", "--")}
+FS = 48000
+
+
+def select(results, **kwargs):
+    return [r for r in results if all(r[k] == v for k, v in kwargs.items())]
+
+
+def plot_base(ax, results, base):
+    """Bar chart of the block latency at the base configuration."""
+    points = [r for r in results if all(r[k] == base[k] for k in base)]
+    backends = [b for b in COLORS if select(points, backend=b)]
+    groups = sorted({(r["dtype"], r["storage"]) for r in points})
+    width = 0.8 / max(len(backends), 1)
+    for i, backend in enumerate(backends):
+        res = [select(points, backend=backend, dtype=d, storage=s) for d, s in groups]
+        p10, p50, p90 = (
+            np.array([1e3 * r[0]["latency"][q] if r else np.nan for r in res]) for q in ("p10", "p50", "p90")
+        )
+        err = np.nan_to_num([p50 - p10, p90 - p50])
+        x = np.arange(len(groups)) + (i - (len(backends) - 1) / 2) * width
+        ax.bar(x, p50, width, yerr=err, capsize=3, color=COLORS[backend], label=LABELS[backend])
+    ax.axhline(1e3 * base["T"] / FS, color="k", ls=":", label=f"realtime @{FS // 1000} kHz")
+    ax.set_xticks(range(len(groups)), [f"{d}\n{'fortran' if s == 'F' else 'contiguous'}" for d, s in groups])
+    ax.set_yscale("log")
+    ax.set_ylabel("time per block (ms)")
+    ax.set_title(f"Backend comparison · n={base['n']}, m={base['m']}, p={base['p']}, T={base['T']}")
+    ax.legend()
+
+
+def plot_sweep(ax, results, sweep, storage="F", throughput=False):
+    """Block latency (or throughput) over one swept parameter, one line per backend and dtype."""
+    points = select(results, sweep=sweep, storage=storage)
+    for backend in COLORS:
+        for dtype, (marker, ls) in MARKERS.items():
+            res = sorted(select(points, backend=backend, dtype=dtype), key=lambda r: r[sweep])
+            if not res:
+                continue
+            x = [r[sweep] for r in res]
+            if throughput:
+                y = [r["samples_per_second"] for r in res]
+            else:
+                y = [1e3 * r["latency"]["p50"] for r in res]
+                lo, hi = ([1e3 * r["latency"][q] for r in res] for q in ("p10", "p90"))
+                ax.fill_between(x, lo, hi, color=COLORS[backend], alpha=0.15, lw=0)
+            ax.plot(x, y, marker=marker, ls=ls, color=COLORS[backend], label=f"{LABELS[backend]} {dtype}")
+    ax.set_xscale("log", base=2)
+    ax.set_yscale("log")
+    ax.set_xlabel(sweep)
+    ax.set_ylabel("samples / s" if throughput else "time per block (ms)")
+    ax.set_title(f"{'Throughput' if throughput else 'Scaling'} vs {sweep}")
+    ax.grid(True, which="both", ls=":", alpha=0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("results", help="JSON file written by run.py")
+    parser.add_argument("-o", "--output", default="benchmarks.png")
+    args = parser.parse_args()
+
+    with open(args.results) as f:
+        data = json.load(f)
+    results, base = data["results"], data["config"]["base"]
+    sweeps = [s for s in ("n", "m", "p", "T") if select(results, sweep=s)]
+
+    fig, axes = plt.subplots(len(sweeps) + 1, 1, figsize=(6, 4 * (len(sweeps) + 1)), layout="constrained")
+    axes = np.atleast_1d(axes)
+    plot_base(axes[0], results, base)
+    for ax, sweep in zip(axes[1:], sweeps, strict=True):
+        plot_sweep(ax, results, sweep, throughput=sweep == "T")
+    if sweeps:
+        axes[1].legend(fontsize="small")
+    machine = data["machine"]
+    fig.suptitle(f"{machine['processor']} · {machine['cpu_count']} cores · {machine['platform']}", fontsize="small")
+    fig.savefig(args.output, dpi=150)
+    print(f"Plot written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
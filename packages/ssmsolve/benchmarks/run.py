@@ -0,0 +1,89 @@
+"""Backend benchmark suite for ssmsolve.
+
+Sweeps the state order ``n``, the number of inputs ``m`` and outputs ``p``, the block length
+``T``, the dtype, the storage order and the backend. Every sweep varies one parameter around the
+base configuration and runs all combinations of dtype, storage and backend. Blocks are processed
+with :meth:`StateSpaceModel.process_block`, so the numbers show the solver without the
+:class:`pyfar.Signal` overhead. For each point the throughput in samples per second and the
+percentiles of the per-block latency are stored in a JSON file, which ``plot.py`` turns into
+``benchmarks.png``.
+
+Usage::
+
+    python benchmarks/run.py                          # all sweeps
+    python benchmarks/run.py --sweep n --backend rust numba
+    python benchmarks/run.py --quick -o results.json  # smaller grids for a smoke test
+"""
+
+import argparse
+import itertools
+import os
+import platform
+
+import numpy as np
+from common import BACKENDS, backends, machine_info, percentiles, random_system, save, timings
+from ssmsolve.models import StateSpaceModel
+
+BASE = {"n": 512, "m": 5, "p": 12, "T": 4096}
+SWEEPS = {
+    "n": [16, 64, 256, 512, 1024, 2048],
+    "m": [1, 2, 4, 8, 16, 32],
+    "p": [1, 2, 4, 8, 16, 32],
+    "T": [32, 64, 256, 1024, 4096],
+}
+QUICK = {"n": [16, 64, 256], "m": [1, 4], "p": [1, 4], "T": [64, 1024]}
+DTYPES = ("float32", "float64")
+STORAGES = ("F", "C")
+
+
+def measure(sys, T, min_time, max_blocks):
+    """Process random blocks of ``T`` samples, return throughput and latency percentiles."""
+    rng = np.random.default_rng(0)
+    sys.init_state()
+    u, out = sys.init_block(T)
+    u[...] = rng.standard_normal(u.shape)
+    sys.process_block(u, out)  # warm-up, includes JIT compilation
+    t = timings(lambda: sys.process_block(u, out), max_calls=max_blocks, min_time=min_time)
+    return {
+        "samples_per_second": T / float(np.mean(t)),
+        "latency": percentiles(t) | {"mean": float(np.mean(t)), "n_blocks": len(t)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sweep", nargs="+", default=list(SWEEPS), choices=list(SWEEPS), help="parameters to sweep")
+    parser.add_argument("--backend", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--dtype", nargs="+", default=list(DTYPES), choices=DTYPES)
+    parser.add_argument("--storage", nargs="+", default=list(STORAGES), choices=STORAGES)
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent per point")
+    parser.add_argument("--max-blocks", type=int, default=1000, help="upper limit of timed blocks per point")
+    parser.add_argument("--quick", action="store_true", help="use small grids")
+    parser.add_argument("-o", "--output", default=os.path.join("benchmarks", "results", f"{platform.node()}.json"))
+    args = parser.parse_args()
+
+    grids = QUICK if args.quick else SWEEPS
+    installed = backends(args.backend)
+    results = []
+    for sweep in args.sweep:
+        # every sweep passes through the base configuration shown in the top panel of the plot
+        for value in sorted(set(grids[sweep]) | {BASE[sweep]}):
+            point = BASE | {sweep: value}
+            A, B, C = random_system(point["n"], point["m"], point["p"])
+            for name, dtype, storage in itertools.product(installed, args.dtype, args.storage):
+                sys = StateSpaceModel(A, B, C, sampling_rate=48000, dtype=dtype, storage=storage, backend=name)
+                res = point | {"sweep": sweep, "dtype": dtype, "storage": storage, "backend": name}
+                res |= measure(sys, point["T"], args.min_time, args.max_blocks)
+                lat = res["latency"]
+                print(
+                    f"{sweep}={value:<5} {name:>5} {dtype} {storage}  {res['samples_per_second']:>12.4g} samples/s  "
+                    f"latency p50 {1e3 * lat['p50']:.3g} ms, p99 {1e3 * lat['p99']:.3g} ms"
+                )
+                results.append(res)
+
+    config = {"base": BASE, "grids": {k: grids[k] for k in args.sweep}, "min_time": args.min_time}
+    save(args.output, machine_info(("ssmsolve", "ssmsolve-rs", "numba", "pyfar")), config, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Scaling of :func:`ssmsolve.models.process_many` with the number of threads.
+
+Processes one signal per model for an increasing number of worker threads and reports the
+throughput in samples per second summed over all models, the speedup over a single thread and the
+parallel efficiency, i.e. the speedup divided by the number of threads. The solvers release the
+GIL, so the efficiency stays close to one until the cores or the memory bandwidth are saturated.
+
+Usage::
+
+    python benchmarks/scaling.py                          # 1, 2, 4, ... threads up to the CPU count
+    python benchmarks/scaling.py --models 32 --n 256 --workers 1 2 4 8 --backend numba
+"""
+
+import argparse
+import os
+import platform
+
+import numpy as np
+from common import BACKENDS, backends, machine_info, random_system, save, timings
+from pyfar import Signal
+from ssmsolve.models import StateSpaceModel, process_many
+
+
+def default_workers():
+    """Powers of two up to the CPU count, and the CPU count itself."""
+    cpus = os.cpu_count() or 1
+    return sorted({2**k for k in range(cpus.bit_length()) if 2**k <= cpus} | {cpus})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=16, help="number of independent models")
+    parser.add_argument("--n", type=int, default=128, help="model order")
+    parser.add_argument("--m", type=int, default=2, help="number of inputs")
+    parser.add_argument("--p", type=int, default=2, help="number of outputs")
+    parser.add_argument("--T", type=int, default=48000, help="samples per signal")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers(), help="thread counts")
+    parser.add_argument("--backend", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float64"])
+    parser.add_argument("--min-time", type=float, default=2.0, help="seconds spent per point")
+    parser.add_argument(
+        "-o", "--output", default=os.path.join("benchmarks", "results", f"{platform.node()}-scaling.json")
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    signals = [
+        Signal(rng.standard_normal((args.m, args.T)).astype(args.dtype), sampling_rate=48000)
+        for _ in range(args.models)
+    ]
+    total = args.models * args.T
+    print(f"{args.models} models, n={args.n} m={args.m} p={args.p} T={args.T} {args.dtype}")
+    results = []
+    for name in backends(args.backend):
+        models = [
+            StateSpaceModel(
+                *random_system(args.n, args.m, args.p, seed=i), sampling_rate=48000, dtype=args.dtype, backend=name
+            )
+            for i in range(args.models)
+        ]
+        for sys in models:
+            sys.init_state()
+        process_many(models, signals, n_workers=1)  # warm-up, includes JIT compilation
+        base = None
+        for workers in args.workers:
+            t = timings(
+                lambda models=models, workers=workers: process_many(models, signals, workers), min_time=args.min_time
+            )
+            rate = total / float(np.median(t))
+            base = base or rate
+            res = {"backend": name, "workers": workers, "samples_per_second": rate}
+            res |= {"speedup": rate / base, "efficiency": rate / base / workers}
+            print(
+                f"{name:>5} workers={workers:<3} {rate:>12.4g} samples/s  speedup {res['speedup']:.2f}  "
+                f"efficiency {res['efficiency']:.2f}"
+            )
+            results.append(res)
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    save(args.output, machine_info(("ssmsolve", "ssmsolve-rs", "numba", "pyfar", "threadpoolctl")), config, results)
+
+
+if __name__ == "__main__":
+    main()
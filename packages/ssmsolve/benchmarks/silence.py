@@ -0,0 +1,91 @@
+"""Throughput on bursty input with and without the handling of silent input.
+
+Generates signals of short events of white noise separated by digital silence, for decreasing
+fractions of active samples, and times :meth:`StateSpaceModel.process` on them with
+``silence_threshold=None`` (every sample runs the full recursion), ``0`` (silent samples skip the
+input products, exact) and ``decay_threshold(error_energy)`` (the recursion also stops once the
+state has decayed during silence). Reports the throughput, the speedup over ``None`` and the energy
+of the output error relative to the energy of the exact output.
+
+Usage::
+
+    python benchmarks/silence.py
+    python benchmarks/silence.py --n 256 --activity 1 0.1 0.01 --radius 0.999 --backend numba
+"""
+
+import argparse
+import os
+import platform
+
+import numpy as np
+from common import backends, machine_info, random_system, save, timings
+from pyfar import Signal
+from ssmsolve.models import StateSpaceModel
+
+
+def bursty(m, T, activity, event, rng):
+    """``m`` channels of ``T`` samples, active in events of ``event`` samples."""
+    u = np.zeros((m, T))
+    n_events = int(round(activity * T / event))
+    if n_events >= T // event:
+        return rng.standard_normal((m, T))
+    for k in rng.choice(T // event, n_events, replace=False):
+        u[:, k * event : (k + 1) * event] = rng.standard_normal((m, event))
+    return u
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=128, help="model order")
+    parser.add_argument("--m", type=int, default=2, help="number of inputs")
+    parser.add_argument("--p", type=int, default=2, help="number of outputs")
+    parser.add_argument("--T", type=int, default=48000, help="samples per signal")
+    parser.add_argument("--event", type=int, default=2400, help="samples per event")
+    parser.add_argument("--activity", type=float, nargs="+", default=[1, 0.5, 0.2, 0.05, 0.01])
+    parser.add_argument("--radius", type=float, default=0.99, help="spectral radius of A")
+    parser.add_argument("--error-energy", type=float, default=1e-10, help="error energy per reset")
+    parser.add_argument("--backend", nargs="+", default=["rust", "numba"], choices=["rust", "numba"])
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float64"])
+    parser.add_argument("--storage", default="F", choices=["F", "C"])
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent per point")
+    parser.add_argument(
+        "-o", "--output", default=os.path.join("benchmarks", "results", f"{platform.node()}-silence.json")
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    A, B, C = random_system(args.n, args.m, args.p)
+    A *= args.radius / 0.9
+    results = []
+    print(f"n={args.n} m={args.m} p={args.p} T={args.T} radius={args.radius} {args.dtype}, samples/s")
+    for name in backends(args.backend):
+        sys = StateSpaceModel(A, B, C, sampling_rate=48000, dtype=args.dtype, storage=args.storage, backend=name)
+        thresholds = {"off": None, "exact": 0.0, "decay": sys.decay_threshold(args.error_energy)}
+        for activity in args.activity:
+            sig = Signal(bursty(args.m, args.T, activity, args.event, rng), sampling_rate=48000)
+            rates, outputs = {}, {}
+            for mode, threshold in thresholds.items():
+                sys.silence_threshold = threshold
+                sys.init_state()
+                outputs[mode] = sys.process(sig).time  # warm-up, includes JIT compilation
+
+                def run(sys=sys, sig=sig):
+                    sys.init_state()
+                    sys.process(sig)
+
+                rates[mode] = args.T / float(np.median(timings(run, min_time=args.min_time)))
+            energy = max(float(np.sum(outputs["off"].astype(np.float64) ** 2)), np.finfo(np.float64).tiny)
+            errors = {mode: float(np.sum((outputs[mode] - outputs["off"]) ** 2.0)) / energy for mode in thresholds}
+            results.append({"backend": name, "activity": activity, "rates": rates, "relative_error_energy": errors})
+            print(
+                f"{name:>5} activity {activity:5.2f}: off {rates['off']:10.4g}  exact {rates['exact']:10.4g} "
+                f"({rates['exact'] / rates['off']:5.2f}x)  decay {rates['decay']:10.4g} "
+                f"({rates['decay'] / rates['off']:5.2f}x, error {10 * np.log10(errors['decay'] + 1e-300):6.1f} dB)"
+            )
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    save(args.output, machine_info(("ssmsolve", "ssmsolve-rs", "numba")), config, results)
+
+
+if __name__ == "__main__":
+    main()
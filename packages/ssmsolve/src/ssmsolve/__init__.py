@@ -1 +1,8 @@
-from ssmsolve.backends import BACKEND as BACKEND  # noqa: F401
+from ssmsolve import backends as _backends
+
+
+def __getattr__(name):
+    # the backend is detected on first access, see ssmsolve.backends
+    if name == "BACKEND":
+        return _backends.BACKEND
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
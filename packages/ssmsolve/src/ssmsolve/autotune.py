@@ -0,0 +1,168 @@
+"""Runtime autotuning of the backend, storage order and solver method.
+
+Which configuration runs a model fastest depends on its order, the number of inputs and outputs,
+the block size and the machine. :func:`autotune` times :meth:`StateSpaceModel.process_block` for
+every installed backend, both storage orders and both solver methods and returns the fastest
+combination. Models with a ``silence_threshold`` are only tuned with the ``'sample'`` method, which
+handles silent input. Decisions are stored in a JSON file in the cache directory, keyed by the
+model class, its shape and dtype, the silence threshold, the block size, the CPU and the versions of
+the backend packages, so each configuration is measured only once per machine. The cache directory
+is ``$SSMSOLVE_CACHE_DIR``, ``$XDG_CACHE_HOME/ssmsolve`` or ``~/.cache/ssmsolve``.
+"""
+
+import copy
+import json
+import os
+import platform
+import time
+import warnings
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+
+from ssmsolve.backends import available_backends
+
+__all__ = ["autotune", "cache_path", "clear_cache"]
+
+_MAX_BLOCK = 4096
+_PACKAGES = ("ssmsolve", "ssmsolve-rs", "numba", "numpy", "scipy", "pyfar")
+_decisions = None
+
+
+def cache_path():
+    """Path of the JSON file with the persisted decisions."""
+    root = os.environ.get("SSMSOLVE_CACHE_DIR")
+    if root is None:
+        root = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ssmsolve")
+    return os.path.join(root, "autotune.json")
+
+
+def clear_cache():
+    """Forget all decisions, in memory and on disk."""
+    global _decisions
+    _decisions = {}
+    if os.path.exists(cache_path()):
+        os.remove(cache_path())
+
+
+def block_size(n_samples):
+    """Block size the decision for ``n_samples`` is measured and stored at.
+
+    Rounded up to a power of two so that similar block sizes share one decision, and capped at
+    4096 samples, beyond which the per-block overhead no longer matters.
+    """
+    return min(1 << max(int(n_samples) - 1, 0).bit_length(), _MAX_BLOCK)
+
+
+def _versions():
+    def _version(name):
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return None
+
+    return {name: _version(name) for name in _PACKAGES}
+
+
+def _key(sys, n_samples):
+    key = {
+        "model": type(sys).__name__,
+        "shape": [sys.n_states, sys.n_inputs, sys.n_outputs],
+        "dtype": np.dtype(sys.dtype).name,
+        "silence_threshold": sys.silence_threshold,
+        # structural options that select other kernels for the same class and shape
+        "packed": getattr(sys, "packed", None),
+        "matrix_dtype": getattr(sys, "matrix_dtype", None),
+        "block": block_size(n_samples),
+        "cpu": [platform.machine(), platform.processor(), os.cpu_count()],
+        "versions": _versions(),
+    }
+    return json.dumps(key, sort_keys=True)
+
+
+def _load():
+    global _decisions
+    if _decisions is None:
+        try:
+            with open(cache_path()) as f:
+                _decisions = json.load(f)
+        except (OSError, ValueError):
+            _decisions = {}
+    return _decisions
+
+
+def _save(decisions):
+    path = cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first, so concurrent readers never see a partial file
+        tmp = f"{path}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(decisions, f, indent=1)
+        os.replace(tmp, path)
+    except OSError as e:
+        warnings.warn(f"Could not write the autotuning cache {path}: {e}", stacklevel=3)
+
+
+def _measure(sys, n_samples, min_time):
+    """Shortest time of :meth:`process_block` on random blocks of ``n_samples`` samples."""
+    sys.state = np.zeros(sys.n_states, sys.dtype)
+    u, out = sys.init_block(n_samples)
+    u[...] = np.random.default_rng(0).standard_normal(u.shape)
+    sys.process_block(u, out)  # warm-up, includes JIT compilation
+    t = []
+    start = time.perf_counter()
+    while len(t) < 3 or (time.perf_counter() - start < min_time and len(t) < 100):
+        t0 = time.perf_counter()
+        sys.process_block(u, out)
+        t.append(time.perf_counter() - t0)
+    return min(t)
+
+
+def autotune(sys, n_samples, min_time=0.02, cache=True):
+    """Find the fastest backend, storage order and solver method for a model and block size.
+
+    The candidates are timed on a copy of ``sys``, the model itself and its state are not
+    modified. If ``sys.silence_threshold`` is set, only the ``'sample'`` method is timed, as the
+    ``'block'`` method ignores the threshold.
+
+    Parameters
+    ----------
+    sys : ssmsolve.models.StateSpaceModel
+        The model to tune.
+    n_samples : int
+        Block size the model will be run with, see :func:`block_size`.
+    min_time : float, optional
+        Seconds spent on each candidate. Defaults to ``0.02``.
+    cache : bool, optional
+        Look up and persist the decision in the cache file. Defaults to ``True``.
+
+    Returns
+    -------
+    decision : dict
+        The fastest configuration as ``{'backend': ..., 'storage': ..., 'method': ...}``.
+    """
+    key = _key(sys, n_samples)
+    decisions = _load()
+    if cache and key in decisions:
+        return decisions[key]
+
+    trial = copy.copy(sys)
+    trial._autotune = False
+    best, decision = np.inf, None
+    for backend in available_backends():
+        trial._use_backend(backend)
+        for storage in ("F", "C"):
+            trial.storage = storage
+            # the pyfar solver has no block method, and the block method does not handle silence
+            sample_only = backend == "pyfar" or sys.silence_threshold is not None
+            for method in ("sample",) if sample_only else ("sample", "block"):
+                trial.method = method
+                t = _measure(trial, block_size(n_samples), min_time)
+                if t < best:
+                    best, decision = t, {"backend": backend, "storage": storage, "method": method}
+
+    if cache:
+        decisions[key] = decision
+        _save(decisions)
+    return decision
@@ -2,27 +2,48 @@
 
 Detection order: rust (ssmsolve-rs) → jit (numba) → pyfar (scipy BLAS fallback).
 
-The active backend name is exposed as :data:`ssmsolve.BACKEND`.
+The active backend name is exposed as :data:`ssmsolve.BACKEND`. Single models can run on another
+backend, see the ``backend`` argument of :class:`~ssmsolve.models.StateSpaceModel`.
+
+Importing numba or the Rust extension takes a noticeable part of the startup time of short-lived
+processes, so the backend is detected when :data:`BACKEND` or a kernel is first needed, not on
+import, and the numba kernels are compiled or loaded from their cache on their first call.
 """
 
 from __future__ import annotations
 
-__all__ = ["get_solver", "BACKEND"]
+import importlib
 
+__all__ = ["get_solver", "load_backend", "available_backends", "BACKEND", "BACKENDS"]
 
-def _try_rust():
-    from ssmsolve.backends.rust import solve  # noqa: PLC0415
+BACKENDS = ("rust", "numba", "pyfar")
 
-    return solve, "rust"
 
+def load_backend(name):
+    """Return the backend module ``name``, ``None`` for the ``'pyfar'`` fallback.
 
-def _try_numba():
-    from ssmsolve.backends.numba import solve  # noqa: PLC0415
+    Raises
+    ------
+    ImportError
+        If the extra providing the backend is not installed.
+    """
+    assert name in BACKENDS, f"Backend must be one of {BACKENDS}, got {name!r}."
+    return None if name == "pyfar" else importlib.import_module(f"ssmsolve.backends.{name}")
 
-    return solve, "numba"
+
+def available_backends():
+    """Names of the installed backends in detection order, always ending with ``'pyfar'``."""
+    names = []
+    for name in BACKENDS:
+        try:
+            load_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
 
 
-def get_solver():
+def get_solver(kernel="solve"):
     """Return ``(solve_fn, backend_name)`` for the best available backend.
 
     Falls back to ``(None, "pyfar")`` when neither extra is installed;
@@ -34,13 +55,44 @@ def get_solver():
         solve(y, x, A, B, C, D, u) -> None
 
     All arrays are modified in-place (``y`` and ``x``).
+
+    Parameters
+    ----------
+    kernel : str, optional
+        Name of the solver to load from the backend module. ``'solve'`` computes the recursion
+        sample by sample, ``'solve_small'`` does the same without BLAS calls for small orders and
+        takes ``M = [[C, D], [A, B]]`` in Fortran order and a scratch vector ``w`` of ``p + n``
+        entries in place of ``A, B, C, D``,
+        ``'solve_block'`` evaluates the input and output products for the whole chunk as
+        matrix-matrix products. The ``'solve_diagonal'`` and ``'solve_diagonal_block'``
+        variants take the real modal representation ``ad, ae, n_real`` of
+        :class:`~ssmsolve.models.DiagonalStateSpaceModel` in place of ``A``. The
+        ``'solve_triangular'`` and ``'solve_packed'`` variants (and their ``_block`` versions) take
+        the dense or packed Schur factor and its subdiagonal ``T, s`` of
+        :class:`~ssmsolve.models.TriangularStateSpaceModel` in place of ``A``. ``'solve_batch'``
+        advances a stack of independent states ``X`` of shape ``(n, batch)`` with matrix-matrix
+        products, ``y`` and ``u`` are stacked over time as ``(T, p, batch)`` and ``(T, m, batch)``.
+        ``'solve_parallel'`` additionally takes ``AL = A**L`` and the segment length ``L`` and runs
+        the segments of ``L`` samples on separate threads. ``'solve_silent'`` takes the state norm
+        ``threshold`` between ``D`` and ``u`` and skips the products of silent samples, see
+        ``silence_threshold`` of :class:`~ssmsolve.models.StateSpaceModel`. ``'solve_crossfade'``
+        takes a second output map ``C2, D2`` and the gain of every sample between ``D`` and ``u``
+        and blends the outputs of both maps. ``'solve_quantized'``
+        takes the codes and scales ``Q, S, code`` of
+        :class:`~ssmsolve.models.QuantizedStateSpaceModel` in place of ``A, B, C, D``.
     """
-    for loader in (_try_rust, _try_numba):
+    for name in BACKENDS[:-1]:
         try:
-            return loader()
+            return getattr(load_backend(name), kernel), name
         except ImportError:
             continue
     return None, "pyfar"
 
 
-_solver, BACKEND = get_solver()
+def __getattr__(name):
+    # BACKEND is detected on first access and then stored as a module attribute
+    if name == "BACKEND":
+        _, backend = get_solver()
+        globals()["BACKEND"] = backend
+        return backend
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
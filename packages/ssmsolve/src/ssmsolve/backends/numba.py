@@ -2,74 +2,666 @@
 
 from __future__ import annotations
 
-from numba import float32, float64, jit
-
-
-@jit(
-    [
-        (
-            float32[::1, :],
-            float32[::1],
-            float32[::1, :],
-            float32[::1, :],
-            float32[::1, :],
-            float32[::1, :],
-            float32[::1, :],
-        ),
-        (
-            float64[::1, :],
-            float64[::1],
-            float64[::1, :],
-            float64[::1, :],
-            float64[::1, :],
-            float64[::1, :],
-            float64[::1, :],
-        ),
-    ],
-    nopython=True,
-    cache=True,
-)
+import functools
+import threading
+import warnings
+
+import numpy as np
+from numba import NumbaPerformanceWarning, float32, float64, int8, int64, jit, prange, uint16
+
+
+def _lazy_jit(signatures, **options):
+    """``numba.jit`` for explicit ``signatures``, compiled or loaded from the cache on first call.
+
+    Numba compiles all signatures of a dispatcher when it is created, which would make importing
+    this module load every kernel, taking seconds even from the on-disk cache, although a process
+    usually runs only a few of them. Kernels decorated this way can only be called from Python.
+    """
+
+    def decorator(func):
+        dispatcher, lock = None, threading.Lock()
+
+        @functools.wraps(func)
+        def kernel(*args):
+            nonlocal dispatcher
+            if dispatcher is None:
+                with lock:
+                    if dispatcher is None:
+                        with warnings.catch_warnings():
+                            # raised for the any-layout signatures of _signatures_F
+                            warnings.simplefilter("ignore", NumbaPerformanceWarning)
+                            dispatcher = jit(signatures, **options)(func)
+            return dispatcher(*args)
+
+        return kernel
+
+    return decorator
+
+
+def _signatures_F(signature):
+    """Fortran-order signatures for both precisions.
+
+    ``signature(T, I, O, D)`` returns the argument types, where ``I``, ``O`` and ``D`` are the
+    types of the arrays with an input dimension (``B``, ``u``), an output dimension (``C``, ``y``)
+    or both (``D``). Arrays with a single row or column are both C- and F-contiguous and typed as
+    C-order by numba, so variants for single-input and single-output systems are included. Other
+    matrices with a single row or column, such as those of a single state or the buffers of a
+    single sample, fall back to a variant that takes every matrix in any layout.
+    """
+    sigs = []
+    for T in (float32, float64):
+        F, C = T[::1, :], T[:, ::1]
+        for I, O in ((F, F), (C, F), (F, C), (C, C)):
+            sigs.append(signature(T, I, O, F if I is F and O is F else C))
+        sigs.append(tuple(T[:, :] if getattr(t, "ndim", 0) == 2 else t for t in signature(T, F, F, F)))
+    return sigs
+
+
+def _fortran(*arrays):
+    """Whether the system is stored in Fortran order, judged by the first unambiguous array.
+
+    Callers pass the output and input signals first, which are ambiguous only for a single channel
+    or sample, unlike the system matrices of a single state.
+    """
+    for M in arrays:
+        if M.flags["F_CONTIGUOUS"] != M.flags["C_CONTIGUOUS"]:
+            return M.flags["F_CONTIGUOUS"]
+    return False
+
+
+# (y, x, A, B, C, D, u) for both precisions, per memory layout
+_SIGNATURES_F = _signatures_F(lambda T, I, O, D: (O, T[::1], T[::1, :], I, O, D, I))
+_SIGNATURES_C = [(T[:, ::1], T[::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1]) for T in (float32, float64)]
+
+
+@_lazy_jit(_SIGNATURES_F, nopython=True, nogil=True, cache=True)
 def solve_F(y, x, A, B, C, D, u):
     """JIT solver for Fortran-order (column-major) arrays."""
     for i in range(y.shape[1]):
         y[:, i] = C @ x + D @ u[:, i]
-        x = A @ x + B @ u[:, i]
-
-
-@jit(
-    [
-        (
-            float32[:, ::1],
-            float32[::1],
-            float32[:, ::1],
-            float32[:, ::1],
-            float32[:, ::1],
-            float32[:, ::1],
-            float32[:, ::1],
-        ),
-        (
-            float64[:, ::1],
-            float64[::1],
-            float64[:, ::1],
-            float64[:, ::1],
-            float64[:, ::1],
-            float64[:, ::1],
-            float64[:, ::1],
-        ),
-    ],
-    nopython=True,
-    cache=True,
-)
+        x[:] = A @ x + B @ u[:, i]
+
+
+@_lazy_jit(_SIGNATURES_C, nopython=True, nogil=True, cache=True)
 def solve_C(y, x, A, B, C, D, u):
     """JIT solver for C-order (row-major) arrays."""
     for i in range(y.shape[1]):
         y[:, i] = C @ x + D @ u[:, i]
-        x = A @ x + B @ u[:, i]
+        x[:] = A @ x + B @ u[:, i]
+
+
+@_lazy_jit(_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_block_F(y, x, A, B, C, D, u):
+    """JIT block solver for Fortran-order (column-major) arrays.
+
+    ``B @ u`` and ``C @ X + D @ u`` are evaluated for the whole chunk as matrix-matrix products,
+    only ``x = A @ x + (B @ u)[:, i]`` remains in the sequential loop.
+    """
+    Bu = B @ u
+    # transposed C-order buffer gives an F-order state trajectory
+    X = np.empty((u.shape[1], x.shape[0]), dtype=x.dtype).T
+    for i in range(u.shape[1]):
+        X[:, i] = x
+        x[:] = A @ x + Bu[:, i]
+    y[:, :] = C @ X + D @ u
+
+
+@_lazy_jit(_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_block_C(y, x, A, B, C, D, u):
+    """JIT block solver for C-order (row-major) arrays.
+
+    ``B @ u`` and ``C @ X + D @ u`` are evaluated for the whole chunk as matrix-matrix products,
+    only ``x = A @ x + (B @ u)[:, i]`` remains in the sequential loop.
+    """
+    Bu = B @ u
+    X = np.empty((x.shape[0], u.shape[1]), dtype=x.dtype)
+    for i in range(u.shape[1]):
+        X[:, i] = x
+        x[:] = A @ x + Bu[:, i]
+    y[:, :] = C @ X + D @ u
+
+
+# (y, x, A, B, C, D, threshold, u) for both precisions, per memory layout
+_SILENT_SIGNATURES_F = _signatures_F(lambda T, I, O, D: (O, T[::1], T[::1, :], I, O, D, T, I))
+_SILENT_SIGNATURES_C = [
+    (T[:, ::1], T[::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T, T[:, ::1]) for T in (float32, float64)
+]
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _silent_recursion(y, x, A, B, C, D, threshold, u):
+    """Recursion that skips the input products on zero input and stops once the state decayed.
+
+    On samples whose inputs are all zero, only the free response ``C @ x`` and ``A @ x`` is
+    computed. If the state norm is at most ``threshold`` on such a sample, the state is set to zero
+    and the output of the silent samples up to the next nonzero input is zero.
+    """
+    t2 = threshold * threshold
+    decayed = False
+    for i in range(y.shape[1]):
+        silent = True
+        for j in range(u.shape[0]):
+            if u[j, i] != 0:
+                silent = False
+                break
+        if not silent:
+            decayed = False
+            y[:, i] = C @ x + D @ u[:, i]
+            x[:] = A @ x + B @ u[:, i]
+        elif decayed:
+            y[:, i] = 0
+        elif x @ x <= t2:
+            decayed = True
+            x[:] = 0
+            y[:, i] = 0
+        else:
+            y[:, i] = C @ x
+            x[:] = A @ x
+
+
+@_lazy_jit(_SILENT_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_silent_F(y, x, A, B, C, D, threshold, u):
+    """JIT solver for bursty input and Fortran-order (column-major) arrays."""
+    _silent_recursion(y, x, A, B, C, D, threshold, u)
+
+
+@_lazy_jit(_SILENT_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_silent_C(y, x, A, B, C, D, threshold, u):
+    """JIT solver for bursty input and C-order (row-major) arrays."""
+    _silent_recursion(y, x, A, B, C, D, threshold, u)
+
+
+# (y, x, A, B, C, D, C2, D2, gain, u) for both precisions, per memory layout
+_CROSSFADE_SIGNATURES_F = _signatures_F(lambda T, I, O, D: (O, T[::1], T[::1, :], I, O, D, O, D, T[::1], I))
+_CROSSFADE_SIGNATURES_C = [
+    (T[:, ::1], T[::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T[::1], T[:, ::1])
+    for T in (float32, float64)
+]
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _crossfade_recursion(y, x, A, B, C, D, C2, D2, gain, u):
+    """Recursion whose output blends from the map ``(C, D)`` to ``(C2, D2)`` by ``gain``.
+
+    Only the map with a nonzero weight is evaluated, so samples before and after the crossfade
+    cost the same as those of :func:`solve`.
+    """
+    for i in range(y.shape[1]):
+        g = gain[i]
+        if g <= 0:
+            y[:, i] = C @ x + D @ u[:, i]
+        elif g >= 1:
+            y[:, i] = C2 @ x + D2 @ u[:, i]
+        else:
+            y[:, i] = (1 - g) * (C @ x + D @ u[:, i]) + g * (C2 @ x + D2 @ u[:, i])
+        x[:] = A @ x + B @ u[:, i]
+
+
+@_lazy_jit(_CROSSFADE_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_crossfade_F(y, x, A, B, C, D, C2, D2, gain, u):
+    """JIT solver crossfading between two output maps for Fortran-order (column-major) arrays."""
+    _crossfade_recursion(y, x, A, B, C, D, C2, D2, gain, u)
+
+
+@_lazy_jit(_CROSSFADE_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_crossfade_C(y, x, A, B, C, D, C2, D2, gain, u):
+    """JIT solver crossfading between two output maps for C-order (row-major) arrays."""
+    _crossfade_recursion(y, x, A, B, C, D, C2, D2, gain, u)
 
 
 def solve(y, x, A, B, C, D, u):
-    """Dispatch to solve_F or solve_C based on A's memory layout."""
-    if A.flags["F_CONTIGUOUS"]:
+    """Dispatch to solve_F or solve_C based on the memory layout."""
+    if _fortran(y, u, A, B, C):
         solve_F(y, x, A, B, C, D, u)
     else:
         solve_C(y, x, A, B, C, D, u)
+
+
+def solve_block(y, x, A, B, C, D, u):
+    """Dispatch to solve_block_F or solve_block_C based on the memory layout."""
+    if _fortran(y, u, A, B, C):
+        solve_block_F(y, x, A, B, C, D, u)
+    else:
+        solve_block_C(y, x, A, B, C, D, u)
+
+
+def solve_silent(y, x, A, B, C, D, threshold, u):
+    """Dispatch to solve_silent_F or solve_silent_C based on the memory layout."""
+    if _fortran(y, u, A, B, C):
+        solve_silent_F(y, x, A, B, C, D, threshold, u)
+    else:
+        solve_silent_C(y, x, A, B, C, D, threshold, u)
+
+
+def solve_crossfade(y, x, A, B, C, D, C2, D2, gain, u):
+    """Dispatch to solve_crossfade_F or solve_crossfade_C based on the memory layout."""
+    if _fortran(y, u, A, B, C):
+        solve_crossfade_F(y, x, A, B, C, D, C2, D2, gain, u)
+    else:
+        solve_crossfade_C(y, x, A, B, C, D, C2, D2, gain, u)
+
+
+# (y, x, M, w, u) for both precisions, signals in any memory layout
+_SMALL_SIGNATURES = [(T[:, :], T[::1], T[::1, :], T[::1], T[:, :]) for T in (float32, float64)]
+
+
+@_lazy_jit(_SMALL_SIGNATURES, nopython=True, nogil=True, cache=True)
+def solve_small(y, x, M, w, u):
+    """JIT solver for small orders without BLAS calls, in any memory layout.
+
+    ``M`` holds ``[[C, D], [A, B]]`` in Fortran order, so that every sample costs a single fused
+    ``w = M @ [x; u[:, i]]`` as contiguous axpys over its columns, whose head is ``y[:, i]`` and
+    whose tail is the next state. ``w`` is a scratch vector of ``p + n`` entries. For a few dozen
+    states this is cheaper than the overhead of four BLAS calls.
+    """
+    n, p = x.shape[0], y.shape[0]
+    for i in range(u.shape[1]):
+        w[:] = 0
+        for j in range(M.shape[1]):
+            zj = x[j] if j < n else u[j - n, i]
+            for k in range(p + n):
+                w[k] += M[k, j] * zj
+        y[:, i] = w[:p]
+        x[:] = w[p:]
+
+
+# (y, x, Q, S, code, u) for int8 and 16 bit codes and both precisions in any memory layout
+_QUANTIZED_SIGNATURES = [
+    (T[:, :], T[::1], Q[::1, :], T[::1], int64, T[:, :]) for T in (float32, float64) for Q in (int8, uint16)
+]
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _decode(q, bits, values, code):
+    """Decode the codes ``q`` into ``values``, a float32 view of ``bits``.
+
+    ``code`` 0 converts integers, 1 takes ``q`` as the upper half of float32 bit patterns
+    (bfloat16) and 2 rebiases the exponent of float16 bit patterns without subnormals.
+    """
+    if code == 0:
+        for k in range(q.shape[0]):
+            values[k] = q[k]
+    elif code == 1:
+        for k in range(q.shape[0]):
+            bits[k] = np.uint32(q[k]) << np.uint32(16)
+    else:
+        for k in range(q.shape[0]):
+            h = np.uint32(q[k])
+            e = (h & np.uint32(0x7FFF)) << np.uint32(13)
+            bits[k] = ((h & np.uint32(0x8000)) << np.uint32(16)) | (e + np.uint32(0x38000000) if e else e)
+
+
+@_lazy_jit(_QUANTIZED_SIGNATURES, nopython=True, nogil=True, cache=True)
+def solve_quantized(y, x, Q, S, code, u):
+    """JIT solver for quantized matrices, accumulating in the precision of the state.
+
+    ``Q`` holds the codes of ``[[C, D], [A, B]]`` column by column, ``S[:p + n]`` the scales of
+    its rows and ``S[p + n:]`` those of its columns, see
+    :class:`~ssmsolve.models.QuantizedStateSpaceModel`. Every sample streams the codes once,
+    decodes each column to float32 and adds it times the scaled entry of ``[x; u[:, i]]`` in the
+    dtype of ``x``, so that memory traffic shrinks to the size of the codes while the recursion
+    keeps full precision.
+    """
+    n, m, p = x.shape[0], u.shape[0], y.shape[0]
+    bits = np.empty(p + n, dtype=np.uint32)
+    values = bits.view(np.float32)
+    w = np.empty(p + n, dtype=x.dtype)
+    for i in range(u.shape[1]):
+        w[:] = 0
+        for j in range(n + m):
+            zj = S[p + n + j] * (x[j] if j < n else u[j - n, i])
+            if code == 0:
+                # integers are converted on the fly
+                for k in range(p + n):
+                    w[k] += Q[k, j] * zj
+            else:
+                _decode(Q[:, j], bits, values, code)
+                for k in range(p + n):
+                    w[k] += values[k] * zj
+        for k in range(p + n):
+            w[k] *= S[k]
+        y[:, i] = w[:p]
+        x[:] = w[p:]
+
+
+# (y, x, ad, ae, n_real, B, C, D, u) for both precisions, per memory layout
+_DIAGONAL_SIGNATURES_F = _signatures_F(lambda T, I, O, D: (O, T[::1], T[::1], T[::1], int64, I, O, D, I))
+_DIAGONAL_SIGNATURES_C = [
+    (T[:, ::1], T[::1], T[::1], T[::1], int64, T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1]) for T in (float32, float64)
+]
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _modal_update(x, ad, ae, n_real, bu):
+    """In-place ``x = A @ x + bu`` for A in real modal form.
+
+    The first ``n_real`` states are real modes with ``A[k, k] = ad[k]``, the remaining states are
+    consecutive pairs whose 2x2 block is ``[[ad[k], ae[k]], [ae[k + 1], ad[k + 1]]]``.
+    """
+    for k in range(n_real):
+        x[k] = ad[k] * x[k] + bu[k]
+    for k in range(n_real, x.shape[0], 2):
+        x0, x1 = x[k], x[k + 1]
+        x[k] = ad[k] * x0 + ae[k] * x1 + bu[k]
+        x[k + 1] = ae[k + 1] * x0 + ad[k + 1] * x1 + bu[k + 1]
+
+
+@_lazy_jit(_DIAGONAL_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_diagonal_F(y, x, ad, ae, n_real, B, C, D, u):
+    """JIT modal solver for Fortran-order (column-major) arrays."""
+    for i in range(y.shape[1]):
+        y[:, i] = C @ x + D @ u[:, i]
+        _modal_update(x, ad, ae, n_real, B @ u[:, i])
+
+
+@_lazy_jit(_DIAGONAL_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_diagonal_C(y, x, ad, ae, n_real, B, C, D, u):
+    """JIT modal solver for C-order (row-major) arrays."""
+    for i in range(y.shape[1]):
+        y[:, i] = C @ x + D @ u[:, i]
+        _modal_update(x, ad, ae, n_real, B @ u[:, i])
+
+
+@_lazy_jit(_DIAGONAL_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_diagonal_block_F(y, x, ad, ae, n_real, B, C, D, u):
+    """JIT modal block solver for Fortran-order (column-major) arrays."""
+    Bu = B @ u
+    X = np.empty((u.shape[1], x.shape[0]), dtype=x.dtype).T
+    for i in range(u.shape[1]):
+        X[:, i] = x
+        _modal_update(x, ad, ae, n_real, Bu[:, i])
+    y[:, :] = C @ X + D @ u
+
+
+@_lazy_jit(_DIAGONAL_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_diagonal_block_C(y, x, ad, ae, n_real, B, C, D, u):
+    """JIT modal block solver for C-order (row-major) arrays."""
+    Bu = B @ u
+    X = np.empty((x.shape[0], u.shape[1]), dtype=x.dtype)
+    for i in range(u.shape[1]):
+        X[:, i] = x
+        _modal_update(x, ad, ae, n_real, Bu[:, i])
+    y[:, :] = C @ X + D @ u
+
+
+def solve_diagonal(y, x, ad, ae, n_real, B, C, D, u):
+    """Dispatch to solve_diagonal_F or solve_diagonal_C based on the memory layout."""
+    if _fortran(y, u, B, C):
+        solve_diagonal_F(y, x, ad, ae, n_real, B, C, D, u)
+    else:
+        solve_diagonal_C(y, x, ad, ae, n_real, B, C, D, u)
+
+
+def solve_diagonal_block(y, x, ad, ae, n_real, B, C, D, u):
+    """Dispatch to solve_diagonal_block_F or solve_diagonal_block_C based on the memory layout."""
+    if _fortran(y, u, B, C):
+        solve_diagonal_block_F(y, x, ad, ae, n_real, B, C, D, u)
+    else:
+        solve_diagonal_block_C(y, x, ad, ae, n_real, B, C, D, u)
+
+
+# (y, x, T, s, B, C, D, u) and (y, x, ap, s, B, C, D, u) for both precisions, per memory layout
+_TRIANGULAR_SIGNATURES_F = _signatures_F(lambda T, I, O, D: (O, T[::1], T[::1, :], T[::1], I, O, D, I))
+_TRIANGULAR_SIGNATURES_C = [
+    (T[:, ::1], T[::1], T[:, ::1], T[::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1]) for T in (float32, float64)
+]
+_PACKED_SIGNATURES_F = _signatures_F(lambda T, I, O, D: (O, T[::1], T[::1], T[::1], I, O, D, I))
+_PACKED_SIGNATURES_C = [
+    (T[:, ::1], T[::1], T[::1], T[::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1]) for T in (float32, float64)
+]
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _subdiagonal_update(x, s, bu):
+    """``bu += S @ x`` for the subdiagonal ``s`` of a quasi-upper-triangular A."""
+    for k in range(s.shape[0]):
+        bu[k + 1] += s[k] * x[k]
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _triangular_update_F(x, T, s, bu):
+    """In-place ``x = T @ x + bu`` for quasi-upper-triangular T, column-oriented (``trmv``)."""
+    _subdiagonal_update(x, s, bu)
+    for j in range(x.shape[0]):
+        xj = x[j]
+        for i in range(j):
+            x[i] += T[i, j] * xj
+        x[j] = T[j, j] * xj + bu[j]
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _triangular_update_C(x, T, s, bu):
+    """In-place ``x = T @ x + bu`` for quasi-upper-triangular T, row-oriented (``trmv``)."""
+    _subdiagonal_update(x, s, bu)
+    for i in range(x.shape[0]):
+        acc = bu[i]
+        for j in range(i, x.shape[0]):
+            acc += T[i, j] * x[j]
+        x[i] = acc
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _packed_update(x, ap, s, bu):
+    """In-place ``x = T @ x + bu`` for quasi-upper-triangular T in packed storage (``tpmv``)."""
+    _subdiagonal_update(x, s, bu)
+    offset = 0
+    for j in range(x.shape[0]):
+        xj = x[j]
+        for i in range(j):
+            x[i] += ap[offset + i] * xj
+        x[j] = ap[offset + j] * xj + bu[j]
+        offset += j + 1
+
+
+@_lazy_jit(_TRIANGULAR_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_triangular_F(y, x, T, s, B, C, D, u):
+    """JIT Schur-form solver for Fortran-order (column-major) arrays."""
+    for i in range(y.shape[1]):
+        y[:, i] = C @ x + D @ u[:, i]
+        _triangular_update_F(x, T, s, B @ u[:, i])
+
+
+@_lazy_jit(_TRIANGULAR_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_triangular_C(y, x, T, s, B, C, D, u):
+    """JIT Schur-form solver for C-order (row-major) arrays."""
+    for i in range(y.shape[1]):
+        y[:, i] = C @ x + D @ u[:, i]
+        _triangular_update_C(x, T, s, B @ u[:, i])
+
+
+@_lazy_jit(_TRIANGULAR_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_triangular_block_F(y, x, T, s, B, C, D, u):
+    """JIT Schur-form block solver for Fortran-order (column-major) arrays."""
+    Bu = B @ u
+    X = np.empty((u.shape[1], x.shape[0]), dtype=x.dtype).T
+    for i in range(u.shape[1]):
+        X[:, i] = x
+        _triangular_update_F(x, T, s, Bu[:, i])
+    y[:, :] = C @ X + D @ u
+
+
+@_lazy_jit(_TRIANGULAR_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_triangular_block_C(y, x, T, s, B, C, D, u):
+    """JIT Schur-form block solver for C-order (row-major) arrays."""
+    Bu = B @ u
+    X = np.empty((x.shape[0], u.shape[1]), dtype=x.dtype)
+    for i in range(u.shape[1]):
+        X[:, i] = x
+        _triangular_update_C(x, T, s, Bu[:, i])
+    y[:, :] = C @ X + D @ u
+
+
+@_lazy_jit(_PACKED_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_packed_F(y, x, ap, s, B, C, D, u):
+    """JIT packed Schur-form solver for Fortran-order (column-major) arrays."""
+    for i in range(y.shape[1]):
+        y[:, i] = C @ x + D @ u[:, i]
+        _packed_update(x, ap, s, B @ u[:, i])
+
+
+@_lazy_jit(_PACKED_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_packed_C(y, x, ap, s, B, C, D, u):
+    """JIT packed Schur-form solver for C-order (row-major) arrays."""
+    for i in range(y.shape[1]):
+        y[:, i] = C @ x + D @ u[:, i]
+        _packed_update(x, ap, s, B @ u[:, i])
+
+
+@_lazy_jit(_PACKED_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_packed_block_F(y, x, ap, s, B, C, D, u):
+    """JIT packed Schur-form block solver for Fortran-order (column-major) arrays."""
+    Bu = B @ u
+    X = np.empty((u.shape[1], x.shape[0]), dtype=x.dtype).T
+    for i in range(u.shape[1]):
+        X[:, i] = x
+        _packed_update(x, ap, s, Bu[:, i])
+    y[:, :] = C @ X + D @ u
+
+
+@_lazy_jit(_PACKED_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_packed_block_C(y, x, ap, s, B, C, D, u):
+    """JIT packed Schur-form block solver for C-order (row-major) arrays."""
+    Bu = B @ u
+    X = np.empty((x.shape[0], u.shape[1]), dtype=x.dtype)
+    for i in range(u.shape[1]):
+        X[:, i] = x
+        _packed_update(x, ap, s, Bu[:, i])
+    y[:, :] = C @ X + D @ u
+
+
+def solve_triangular(y, x, T, s, B, C, D, u):
+    """Dispatch to solve_triangular_F or solve_triangular_C based on the memory layout."""
+    if _fortran(y, u, T, B, C):
+        solve_triangular_F(y, x, T, s, B, C, D, u)
+    else:
+        solve_triangular_C(y, x, T, s, B, C, D, u)
+
+
+def solve_triangular_block(y, x, T, s, B, C, D, u):
+    """Dispatch to solve_triangular_block_F or _C based on the memory layout."""
+    if _fortran(y, u, T, B, C):
+        solve_triangular_block_F(y, x, T, s, B, C, D, u)
+    else:
+        solve_triangular_block_C(y, x, T, s, B, C, D, u)
+
+
+def solve_packed(y, x, ap, s, B, C, D, u):
+    """Dispatch to solve_packed_F or solve_packed_C based on the memory layout."""
+    if _fortran(y, u, B, C):
+        solve_packed_F(y, x, ap, s, B, C, D, u)
+    else:
+        solve_packed_C(y, x, ap, s, B, C, D, u)
+
+
+def solve_packed_block(y, x, ap, s, B, C, D, u):
+    """Dispatch to solve_packed_block_F or solve_packed_block_C based on the memory layout."""
+    if _fortran(y, u, B, C):
+        solve_packed_block_F(y, x, ap, s, B, C, D, u)
+    else:
+        solve_packed_block_C(y, x, ap, s, B, C, D, u)
+
+
+# (y, X, A, B, C, D, u) for both precisions, per memory layout. ``y`` and ``u`` are stacks over
+# time whose slices ``y[t]`` and ``u[t]`` are (outputs, batch) and (inputs, batch) matrices in the
+# storage order; for Fortran order the kernel receives the C-order buffers (T, batch, ·).
+_BATCH_SIGNATURES_F = _signatures_F(lambda T, I, O, D: (T[:, :, ::1], T[::1, :], T[::1, :], I, O, D, T[:, :, ::1]))
+_BATCH_SIGNATURES_C = [
+    (T[:, :, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, :, ::1]) for T in (float32, float64)
+]
+
+
+@_lazy_jit(_BATCH_SIGNATURES_F, nopython=True, nogil=True, cache=True)
+def solve_batch_F(y, X, A, B, C, D, u):
+    """JIT batch solver for Fortran-order (column-major) arrays."""
+    for t in range(u.shape[0]):
+        y[t].T[:, :] = C @ X + D @ u[t].T
+        X[:, :] = A @ X + B @ u[t].T
+
+
+@_lazy_jit(_BATCH_SIGNATURES_C, nopython=True, nogil=True, cache=True)
+def solve_batch_C(y, X, A, B, C, D, u):
+    """JIT batch solver for C-order (row-major) arrays."""
+    for t in range(u.shape[0]):
+        y[t, :, :] = C @ X + D @ u[t]
+        X[:, :] = A @ X + B @ u[t]
+
+
+def solve_batch(y, X, A, B, C, D, u):
+    """Dispatch to solve_batch_F or solve_batch_C based on the memory layout."""
+    if _fortran(*y[:1], *u[:1], X, A, B, C):
+        solve_batch_F(y.transpose(0, 2, 1), X, A, B, C, D, u.transpose(0, 2, 1))
+    else:
+        solve_batch_C(y, X, A, B, C, D, u)
+
+
+# (y, x, A, B, C, D, u, AL, L) for both precisions, per memory layout, with ``AL = A**L``
+_PARALLEL_SIGNATURES_F = _signatures_F(lambda T, I, O, D: (O, T[::1], T[::1, :], I, O, D, I, T[::1, :], int64))
+_PARALLEL_SIGNATURES_C = [
+    (T[:, ::1], T[::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], T[:, ::1], int64)
+    for T in (float32, float64)
+]
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _recursion(y, x, A, B, C, D, u):
+    """Sequential recursion on a (possibly strided) segment, ``x`` is updated in-place."""
+    for i in range(y.shape[1]):
+        y[:, i] = C @ x + D @ u[:, i]
+        x[:] = A @ x + B @ u[:, i]
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _free_response(y, z, A, C):
+    """In-place ``y[:, i] += C @ A**i @ z`` on a segment, ``z`` ends up as ``A**T @ z``."""
+    for i in range(y.shape[1]):
+        y[:, i] += C @ z
+        z[:] = A @ z
+
+
+@jit(nopython=True, cache=True, inline="always")
+def _boundary_states(x, AL, E):
+    """Sequential scan ``S[k + 1] = AL @ S[k] + E[k]`` over the segment boundaries."""
+    S = np.empty_like(E)
+    S[0] = x
+    for k in range(1, E.shape[0]):
+        S[k] = AL @ S[k - 1] + E[k - 1]
+    return S
+
+
+@_lazy_jit(_PARALLEL_SIGNATURES_F, nopython=True, nogil=True, cache=True, parallel=True)
+def solve_parallel_F(y, x, A, B, C, D, u, AL, L):
+    """JIT time-parallel solver for Fortran-order (column-major) arrays.
+
+    The signal is split into segments of ``L`` samples that are first run from a zero state in
+    parallel. The true states at the segment boundaries follow from a short scan with ``AL``, and
+    a second parallel pass adds their free responses ``C @ A**i @ S[k]`` to the outputs.
+    """
+    K = (u.shape[1] + L - 1) // L
+    E = np.zeros((K, x.shape[0]), dtype=x.dtype)
+    for k in prange(K):
+        _recursion(y[:, k * L : (k + 1) * L], E[k], A, B, C, D, u[:, k * L : (k + 1) * L])
+    S = _boundary_states(x, AL, E)
+    for k in prange(K):
+        _free_response(y[:, k * L : (k + 1) * L], S[k], A, C)
+    x[:] = S[K - 1] + E[K - 1]
+
+
+@_lazy_jit(_PARALLEL_SIGNATURES_C, nopython=True, nogil=True, cache=True, parallel=True)
+def solve_parallel_C(y, x, A, B, C, D, u, AL, L):
+    """JIT time-parallel solver for C-order (row-major) arrays, see :func:`solve_parallel_F`."""
+    K = (u.shape[1] + L - 1) // L
+    E = np.zeros((K, x.shape[0]), dtype=x.dtype)
+    for k in prange(K):
+        _recursion(y[:, k * L : (k + 1) * L], E[k], A, B, C, D, u[:, k * L : (k + 1) * L])
+    S = _boundary_states(x, AL, E)
+    for k in prange(K):
+        _free_response(y[:, k * L : (k + 1) * L], S[k], A, C)
+    x[:] = S[K - 1] + E[K - 1]
+
+
+def solve_parallel(y, x, A, B, C, D, u, AL, L):
+    """Dispatch to solve_parallel_F or solve_parallel_C based on the memory layout."""
+    if _fortran(y, u, A, B, C):
+        solve_parallel_F(y, x, A, B, C, D, u, AL, L)
+    else:
+        solve_parallel_C(y, x, A, B, C, D, u, AL, L)
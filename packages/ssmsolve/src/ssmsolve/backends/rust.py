@@ -3,7 +3,38 @@
 from __future__ import annotations
 
 import numpy as np
-from ssmsolve_rs import solve_f32, solve_f64
+from ssmsolve_rs import (
+    solve_batch_f32,
+    solve_batch_f64,
+    solve_block_f32,
+    solve_block_f64,
+    solve_crossfade_f32,
+    solve_crossfade_f64,
+    solve_diagonal_block_f32,
+    solve_diagonal_block_f64,
+    solve_diagonal_f32,
+    solve_diagonal_f64,
+    solve_f32,
+    solve_f64,
+    solve_packed_block_f32,
+    solve_packed_block_f64,
+    solve_packed_f32,
+    solve_packed_f64,
+    solve_parallel_f32,
+    solve_parallel_f64,
+    solve_quantized_i8_f32,
+    solve_quantized_i8_f64,
+    solve_quantized_u16_f32,
+    solve_quantized_u16_f64,
+    solve_silent_f32,
+    solve_silent_f64,
+    solve_small_f32,
+    solve_small_f64,
+    solve_triangular_block_f32,
+    solve_triangular_block_f64,
+    solve_triangular_f32,
+    solve_triangular_f64,
+)
 
 
 def solve(y, x, A, B, C, D, u):
@@ -12,3 +43,108 @@ def solve(y, x, A, B, C, D, u):
         solve_f32(y, x, A, B, C, D, u)
     else:
         solve_f64(y, x, A, B, C, D, u)
+
+
+def solve_small(y, x, M, w, u):
+    """Dispatch to f32 or f64 small-order solver based on array dtype."""
+    if M.dtype == np.dtype(np.float32):
+        solve_small_f32(y, x, M, w, u)
+    else:
+        solve_small_f64(y, x, M, w, u)
+
+
+def solve_silent(y, x, A, B, C, D, threshold, u):
+    """Dispatch to f32 or f64 CBLAS solver for bursty input based on array dtype."""
+    if A.dtype == np.dtype(np.float32):
+        solve_silent_f32(y, x, A, B, C, D, threshold, u)
+    else:
+        solve_silent_f64(y, x, A, B, C, D, threshold, u)
+
+
+def solve_crossfade(y, x, A, B, C, D, C2, D2, gain, u):
+    """Dispatch to f32 or f64 CBLAS solver crossfading two output maps based on array dtype."""
+    if A.dtype == np.dtype(np.float32):
+        solve_crossfade_f32(y, x, A, B, C, D, C2, D2, gain, u)
+    else:
+        solve_crossfade_f64(y, x, A, B, C, D, C2, D2, gain, u)
+
+
+def solve_block(y, x, A, B, C, D, u):
+    """Dispatch to f32 or f64 CBLAS block solver based on array dtype."""
+    if A.dtype == np.dtype(np.float32):
+        solve_block_f32(y, x, A, B, C, D, u)
+    else:
+        solve_block_f64(y, x, A, B, C, D, u)
+
+
+def solve_diagonal(y, x, ad, ae, n_real, B, C, D, u):
+    """Dispatch to f32 or f64 CBLAS modal solver based on array dtype."""
+    if B.dtype == np.dtype(np.float32):
+        solve_diagonal_f32(y, x, ad, ae, n_real, B, C, D, u)
+    else:
+        solve_diagonal_f64(y, x, ad, ae, n_real, B, C, D, u)
+
+
+def solve_diagonal_block(y, x, ad, ae, n_real, B, C, D, u):
+    """Dispatch to f32 or f64 CBLAS modal block solver based on array dtype."""
+    if B.dtype == np.dtype(np.float32):
+        solve_diagonal_block_f32(y, x, ad, ae, n_real, B, C, D, u)
+    else:
+        solve_diagonal_block_f64(y, x, ad, ae, n_real, B, C, D, u)
+
+
+def solve_triangular(y, x, T, s, B, C, D, u):
+    """Dispatch to f32 or f64 CBLAS Schur-form solver based on array dtype."""
+    if B.dtype == np.dtype(np.float32):
+        solve_triangular_f32(y, x, T, s, B, C, D, u)
+    else:
+        solve_triangular_f64(y, x, T, s, B, C, D, u)
+
+
+def solve_triangular_block(y, x, T, s, B, C, D, u):
+    """Dispatch to f32 or f64 CBLAS Schur-form block solver based on array dtype."""
+    if B.dtype == np.dtype(np.float32):
+        solve_triangular_block_f32(y, x, T, s, B, C, D, u)
+    else:
+        solve_triangular_block_f64(y, x, T, s, B, C, D, u)
+
+
+def solve_packed(y, x, T, s, B, C, D, u):
+    """Dispatch to f32 or f64 CBLAS packed Schur-form solver based on array dtype."""
+    if B.dtype == np.dtype(np.float32):
+        solve_packed_f32(y, x, T, s, B, C, D, u)
+    else:
+        solve_packed_f64(y, x, T, s, B, C, D, u)
+
+
+def solve_packed_block(y, x, T, s, B, C, D, u):
+    """Dispatch to f32 or f64 CBLAS packed Schur-form block solver based on array dtype."""
+    if B.dtype == np.dtype(np.float32):
+        solve_packed_block_f32(y, x, T, s, B, C, D, u)
+    else:
+        solve_packed_block_f64(y, x, T, s, B, C, D, u)
+
+
+def solve_batch(y, X, A, B, C, D, u):
+    """Dispatch to f32 or f64 CBLAS batch solver based on array dtype."""
+    if A.dtype == np.dtype(np.float32):
+        solve_batch_f32(y, X, A, B, C, D, u)
+    else:
+        solve_batch_f64(y, X, A, B, C, D, u)
+
+
+def solve_parallel(y, x, A, B, C, D, u, AL, L):
+    """Dispatch to f32 or f64 CBLAS time-parallel solver based on array dtype."""
+    if A.dtype == np.dtype(np.float32):
+        solve_parallel_f32(y, x, A, B, C, D, u, AL, L)
+    else:
+        solve_parallel_f64(y, x, A, B, C, D, u, AL, L)
+
+
+def solve_quantized(y, x, Q, S, code, u):
+    """Dispatch to the quantized solver for the code and state dtypes."""
+    if Q.dtype == np.dtype(np.int8):
+        solve = solve_quantized_i8_f32 if x.dtype == np.dtype(np.float32) else solve_quantized_i8_f64
+    else:
+        solve = solve_quantized_u16_f32 if x.dtype == np.dtype(np.float32) else solve_quantized_u16_f64
+    solve(y, x, Q, S, code, u)
@@ -0,0 +1,225 @@
+"""Opt-in counters and timers of the solvers and of the reductions of ``across``.
+
+Instrumentation is disabled by default and then costs one check of a module flag per call. Once
+enabled, every :meth:`StateSpaceModel.process <ssmsolve.models.StateSpaceModel.process>` call is
+timed by phase, i.e. the conversion of the input, the allocation of the output, the backend solve
+and the wrapping of the output in a :class:`pyfar.Signal`, and reported as an event tagged with
+the backend, kernel, dtype, storage and method that actually ran::
+
+    {
+        "operation": "StateSpaceModel.process",
+        "tags": {"backend": "numba", "kernel": "solve", "dtype": "float32", "storage": "F", ...},
+        "seconds": {"convert": 2.1e-06, "allocate": 1.2e-06, "solve": 8.4e-04, "wrap": 9.5e-06},
+        "samples": 4096,
+        "flops": 67108864,
+    }
+
+Events are aggregated in a :class:`Stats` object and passed to an optional callback, e.g. to
+forward them to a metrics system::
+
+    from ssmsolve import instrumentation
+
+    with instrumentation.instrument() as stats:
+        sys.process(signal)
+    for row in stats.summary():
+        print(row["operation"], row["tags"], row["samples_per_second"], row["gflops"])
+
+Other code times its own stages with :func:`stage`, as the reductions of ``across`` do.
+"""
+
+import contextlib
+import threading
+import time
+
+__all__ = ["Stats", "disable", "enable", "instrument", "stage", "stats"]
+
+# read on every instrumented call, the only cost while disabled
+_ENABLED = False
+_stats = None
+_callback = None
+_local = threading.local()
+
+
+class Stats:
+    """Counters and timers of the recorded events, aggregated by operation and tags.
+
+    Recording is thread-safe, so one object collects the events of all threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def record(self, event):
+        """Add an event, a dict as described in :mod:`ssmsolve.instrumentation`."""
+        key = (event["operation"], tuple(sorted(event["tags"].items())))
+        with self._lock:
+            entry = self._entries.setdefault(key, {"calls": 0, "samples": 0, "flops": 0, "seconds": {}})
+            entry["calls"] += 1
+            entry["samples"] += event.get("samples", 0)
+            entry["flops"] += event.get("flops", 0)
+            for phase, seconds in event["seconds"].items():
+                entry["seconds"][phase] = entry["seconds"].get(phase, 0.0) + seconds
+
+    def reset(self):
+        """Forget all recorded events."""
+        with self._lock:
+            self._entries = {}
+
+    def summary(self):
+        """Totals and throughput of every combination of operation and tags.
+
+        Returns
+        -------
+        list of dict
+            ``operation``, ``tags``, the number of ``calls``, the ``samples`` and ``flops``
+            processed, the ``seconds`` spent in every phase and their ``total``, the end-to-end
+            ``samples_per_second`` and the ``gflops`` achieved in the ``solve`` phase, or in all
+            phases if there is no such phase.
+        """
+        with self._lock:
+            entries = [(key, dict(entry, seconds=dict(entry["seconds"]))) for key, entry in self._entries.items()]
+        rows = []
+        for (operation, tags), entry in sorted(entries, key=lambda item: repr(item[0])):
+            total = sum(entry["seconds"].values())
+            solve = entry["seconds"].get("solve", total)
+            rows.append(
+                {"operation": operation, "tags": dict(tags)}
+                | entry
+                | {
+                    "total": total,
+                    "samples_per_second": entry["samples"] / total if total > 0 else 0.0,
+                    "gflops": entry["flops"] / solve * 1e-9 if solve > 0 else 0.0,
+                }
+            )
+        return rows
+
+
+def enable(callback=None):
+    """Start recording events into a new :class:`Stats` object.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        Called with every event, in the thread that produced it.
+
+    Returns
+    -------
+    Stats
+        The object the events are recorded in.
+    """
+    global _ENABLED, _stats, _callback
+    _stats, _callback = Stats(), callback
+    _ENABLED = True
+    return _stats
+
+
+def disable():
+    """Stop recording events. The last :class:`Stats` object keeps its contents."""
+    global _ENABLED, _callback
+    _ENABLED, _callback = False, None
+
+
+def stats():
+    """The :class:`Stats` object of the running or last recording, ``None`` before the first."""
+    return _stats
+
+
+@contextlib.contextmanager
+def instrument(callback=None):
+    """Record events within a ``with`` block, restoring the previous state afterwards.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        See :func:`enable`.
+
+    Yields
+    ------
+    Stats
+        The object the events of the block are recorded in.
+    """
+    global _ENABLED, _stats, _callback
+    previous = _ENABLED, _stats, _callback
+    try:
+        yield enable(callback)
+    finally:
+        _ENABLED, _stats, _callback = previous
+
+
+def _record(operation, tags, seconds, samples=0, flops=0):
+    """Record an event, if enabled."""
+    if not _ENABLED:
+        return
+    event = {"operation": operation, "tags": tags, "seconds": seconds, "samples": samples, "flops": flops}
+    stats, callback = _stats, _callback
+    if stats is not None:
+        stats.record(event)
+    if callback is not None:
+        callback(event)
+
+
+class _Timer:
+    """Splits the time since its creation into phases, and carries the tags of the event."""
+
+    __slots__ = ("seconds", "tags", "_last")
+
+    def __init__(self):
+        self.seconds, self.tags = {}, {}
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        """Add the time since the last lap to ``phase``."""
+        now = time.perf_counter()
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + now - self._last
+        self._last = now
+
+
+def _timer():
+    """A new :class:`_Timer` if enabled, otherwise ``None``."""
+    return _Timer() if _ENABLED else None
+
+
+_DISABLED = contextlib.nullcontext()
+
+
+def stage(operation, phase, **tags):
+    """Context manager recording the time spent in its block as ``phase`` of ``operation``.
+
+    Stages nest: the time of inner stages of the same thread is subtracted from the outer stage,
+    so that every second is attributed to the innermost stage only. While disabled, a shared
+    no-op context manager is returned.
+
+    Parameters
+    ----------
+    operation : str
+        Name of the operation, e.g. ``'RandomizedERA'``.
+    phase : str
+        Name of the stage within the operation, e.g. ``'qr'``.
+    **tags
+        Tags of the event, e.g. the working ``dtype``.
+    """
+    return _Stage(operation, phase, tags) if _ENABLED else _DISABLED
+
+
+class _Stage:
+    __slots__ = ("operation", "phase", "tags", "start", "inner")
+
+    def __init__(self, operation, phase, tags):
+        self.operation, self.phase, self.tags = operation, phase, tags
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault("stages", [])
+        stack.append(self)
+        self.inner = 0.0
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _local.stages
+        stack.pop()
+        if stack:
+            stack[-1].inner += elapsed
+        _record(self.operation, self.tags, {self.phase: elapsed - self.inner})
+        return False
@@ -0,0 +1,151 @@
+"""Versioned binary file format for the models of :mod:`ssmsolve.models`.
+
+A model file holds the arrays that define a model in its working dtype and storage order, so that
+:func:`load` maps them into memory as they are, without copying them or repeating the
+decompositions of the structured models::
+
+    offset 0    b"SSMSOLVE", the format version and the header size as little-endian uint32
+    offset 16   UTF-8 JSON header: class, dtype, storage, sampling rate, comment, the attributes
+                of the model, and shape, dtype, order and offset of every array
+    ...         the arrays, each starting at a multiple of 64 bytes
+
+Files are memory-mapped copy-on-write. The operating system keeps one copy of their pages in the
+page cache, which is shared by all processes mapping the same file, so serving many models from
+many worker processes costs the physical memory of the matrices only once. The state of every
+loaded model is private to its process. Files on a ``tmpfs`` such as ``/dev/shm`` are shared
+memory without a disk behind them.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from ssmsolve.models import (
+    DiagonalStateSpaceModel,
+    QuantizedStateSpaceModel,
+    StateSpaceModel,
+    TriangularStateSpaceModel,
+)
+
+__all__ = ["FORMAT_VERSION", "load", "save"]
+
+FORMAT_VERSION = 1
+
+_MAGIC = b"SSMSOLVE"
+_PREFIX = struct.Struct("<8sII")
+# cache line size, and the alignment of AVX-512 loads
+_ALIGNMENT = 64
+_CLASSES = {
+    cls.__name__: cls
+    for cls in (StateSpaceModel, DiagonalStateSpaceModel, TriangularStateSpaceModel, QuantizedStateSpaceModel)
+}
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def save(sys, path):
+    """Write the model ``sys`` to the file ``path``.
+
+    The file is written to a temporary file next to ``path`` first and then renamed, so processes
+    loading ``path`` concurrently never see a partial file.
+
+    Parameters
+    ----------
+    sys : StateSpaceModel
+        The model, an instance of one of the classes of :mod:`ssmsolve.models`. Its state is not
+        stored.
+    path : str
+        The file name.
+    """
+    name = type(sys).__name__
+    assert _CLASSES.get(name) is type(sys), f"Only the models of ssmsolve.models can be saved, got {name}."
+    arrays, attributes = sys._fields()
+    layout, offset = {}, 0
+    for key, a in arrays.items():
+        fortran = bool(a.flags.f_contiguous and not a.flags.c_contiguous)
+        layout[key] = {"shape": list(a.shape), "dtype": a.dtype.str, "fortran": fortran, "offset": offset}
+        offset = _aligned(offset + a.nbytes)
+    header = {
+        "class": name,
+        "dtype": sys.dtype.name,
+        "storage": sys.storage,
+        "sampling_rate": None if sys.sampling_rate is None else float(sys.sampling_rate),
+        "comment": sys.comment,
+        "attributes": attributes,
+        "arrays": layout,
+    }
+    header = json.dumps(header).encode()
+    start = _aligned(_PREFIX.size + len(header))
+
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(_MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for key, a in arrays.items():
+            f.seek(start + layout[key]["offset"])
+            # the transpose of a Fortran-ordered array is C-contiguous and written without a copy
+            (a.T if layout[key]["fortran"] else np.ascontiguousarray(a)).tofile(f)
+    os.replace(tmp, path)
+
+
+def load(path, mmap=True, **kwargs):
+    """Read a model written by :func:`save`.
+
+    Parameters
+    ----------
+    path : str
+        The file name.
+    mmap : bool, optional
+        Map the arrays copy-on-write into memory, sharing their pages with all processes that map
+        the same file. Otherwise, the file is read into private memory. Defaults to ``True``.
+    **kwargs
+        ``method``, ``n_workers``, ``silence_threshold`` and ``backend`` of the model, see
+        :class:`StateSpaceModel`.
+
+    Returns
+    -------
+    StateSpaceModel
+        The model, an instance of the class it was saved from, with a zero state.
+
+    Raises
+    ------
+    ValueError
+        If ``path`` is not a model file or was written in a newer version of the format.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        magic, version, size = _PREFIX.unpack(prefix) if len(prefix) == _PREFIX.size else (None, 0, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not an ssmsolve model file.")
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"{path} has format version {version}, this version of ssmsolve reads up to {FORMAT_VERSION}."
+            )
+        header = json.loads(f.read(size))
+    start = _aligned(_PREFIX.size + size)
+    buffer = np.memmap(path, dtype=np.uint8, mode="c") if mmap else np.fromfile(path, dtype=np.uint8)
+    arrays = {
+        key: np.ndarray(
+            spec["shape"],
+            spec["dtype"],
+            buffer=buffer,
+            offset=start + spec["offset"],
+            order="F" if spec["fortran"] else "C",
+        )
+        for key, spec in header["arrays"].items()
+    }
+    sys = _CLASSES[header["class"]]._from_fields(
+        arrays,
+        header["attributes"],
+        header["sampling_rate"],
+        header["dtype"],
+        header["storage"],
+        header["comment"],
+        **kwargs,
+    )
+    sys.init_state()
+    return sys
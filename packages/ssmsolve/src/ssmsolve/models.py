@@ -1,15 +1,35 @@
 #!/usr/bin/env python3
 
+import contextlib
+import functools
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from pyfar.classes.filter import StateSpaceModel as PyfarStateSpaceModel
+from scipy.linalg import rsf2csf, schur, solve_discrete_lyapunov
+
+from ssmsolve import autotune as _autotune
+from ssmsolve import backends as _backends
+from ssmsolve import instrumentation as _instrumentation
+from ssmsolve.backends import BACKENDS, get_solver, load_backend
 
-from ssmsolve.backends import _solver as _backend_solve
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+# largest order solved sample by sample without BLAS calls, whose overhead dominates below
+_SMALL_ORDER = 32
+# entries of the solution per chunk of frequencies in frequency_response, i.e. 32 or 64 MiB
+_CHUNK_SIZE = 2**22
 
 
 class StateSpaceModel(PyfarStateSpaceModel):
     """State-space model with pluggable solver backend.
 
-    The active backend is selected at import time in priority order:
+    The active backend is selected on first use in priority order:
     ``rust`` (ssmsolve-rs) → ``numba`` (numba) → ``numpy`` (pure fallback).
     Install the appropriate extra to enable a backend:
 
@@ -19,7 +39,8 @@ class StateSpaceModel(PyfarStateSpaceModel):
         pip install ssmsolve[jit]    # Numba JIT
 
     Without either extra the pyfar BLAS solver (scipy ``gemv``) is used as a fallback.
-    The active backend name is available as :data:`ssmsolve.BACKEND`.
+    The active backend name is available as :data:`ssmsolve.BACKEND`. The ``backend`` argument
+    overrides the choice for a single model, or selects the fastest configuration by measurement.
 
 
     The solver computes the discrete-time state equations:
@@ -50,13 +71,70 @@ class StateSpaceModel(PyfarStateSpaceModel):
     storage : {'F', 'C'}, optional
         Memory layout for the system matrices (``'F'`` for column-major, ``'C'`` for row-major).
         Defaults to ``'F'``.
+    method : {'sample', 'block'}, optional
+        Solver mode. ``'sample'`` evaluates all four matrix-vector products per sample. ``'block'``
+        computes ``B @ u`` and ``D @ u`` for the whole chunk as matrix-matrix products, keeps only
+        ``x = A @ x + (B @ u)[:, i]`` in the sequential loop and maps the stored state trajectory
+        to the output with a single ``C @ X``. This trades ``n * T`` of scratch memory for BLAS-3
+        throughput and pays off for many inputs and outputs. With ``'sample'``, models of at most
+        ``_SMALL_ORDER = 32`` states run a fused kernel without BLAS calls, whose overhead
+        dominates at such orders. Defaults to ``'sample'``.
+    n_workers : int, optional
+        Number of threads for the time-parallel solver. With more than one worker, long signals
+        are split into ``n_workers`` segments that are run from a zero state in parallel, the true
+        states at the segment boundaries are recovered with a short scan using ``A**L`` for segment
+        length ``L``, and a second parallel pass adds their free responses to the outputs. The work
+        roughly doubles, but is spread over the workers. The final state is propagated through
+        the recursion of the last segment, so streaming across calls is preserved. Segments are
+        at least ``n`` samples long, shorter signals are processed sequentially. Defaults to ``1``.
+    backend : {'rust', 'numba', 'pyfar', 'autotune'}, optional
+        Backend running this model, overriding the detected one. ``'autotune'``
+        times every installed backend, both storage orders and both methods for the block size of
+        the first call of :meth:`process` or :meth:`init_block`, and switches the model to the
+        fastest combination, overriding ``storage`` and ``method``. Decisions are persisted per
+        shape, dtype, block size, CPU and package versions, see :mod:`ssmsolve.autotune`. Defaults
+        to ``None``, i.e. the detected backend.
     comment : str, optional
         Any comment.
+    silence_threshold : float, optional
+        Enables the handling of silent input with the ``'sample'`` method of a backend. Samples
+        whose inputs are all zero only compute the free response ``C @ x`` and ``A @ x``, and once
+        the norm of the state is at most ``silence_threshold`` on such a sample, the state is set
+        to zero and the outputs are zero up to the next nonzero input, without any products.
+        :meth:`decay_threshold` returns the threshold for a bound of the resulting output error.
+        ``0`` only skips the input products and is exact. The threshold is ignored with
+        ``method='block'``, and ``backend='autotune'`` only considers the ``'sample'`` method while
+        it is set. Defaults to ``None``, i.e. disabled.
+
+    Notes
+    -----
+    :attr:`outputs` restricts :meth:`process` and :meth:`process_block` to a subset of the outputs,
+    and :meth:`set_output_map` replaces ``C`` and ``D``, optionally crossfading from the previous
+    output map. Both keep ``A``, ``B`` and the state, so the state recursion runs unchanged.
     """
 
     _SUPPORTED_DTYPES = (np.float32, np.float64)
+    # whether outputs and set_output_map are supported
+    _OUTPUT_MAPS = True
+    # timer of the running process call while instrumentation is enabled
+    _timer = None
 
-    def __init__(self, A, B, C, D=None, sampling_rate=None, state=None, dtype=None, storage="F", comment=""):
+    def __init__(
+        self,
+        A,
+        B,
+        C,
+        D=None,
+        sampling_rate=None,
+        state=None,
+        dtype=None,
+        storage="F",
+        method="sample",
+        n_workers=1,
+        backend=None,
+        comment="",
+        silence_threshold=None,
+    ):
         D = np.zeros((C.shape[0], B.shape[1])) if D is None else D
         assert all([isinstance(M, np.ndarray) and (M.ndim == 2) for M in (A, B, C, D)])
         assert A.shape[1] == A.shape[0], "A needs to be square."
@@ -67,8 +145,13 @@ class StateSpaceModel(PyfarStateSpaceModel):
         super(PyfarStateSpaceModel, self).__init__(sampling_rate=sampling_rate, state=state, comment=comment)
         dtype = np.result_type(A, B, C, D) if dtype is None else np.dtype(dtype)
         self._A, self._B, self._C, self._D, self.dtype = A, B, C, D, dtype
+        self._outputs, self._fade = None, None
         # storage setter does the typecast
         self.storage = storage
+        self.method = method
+        self.n_workers = n_workers
+        self.silence_threshold = silence_threshold
+        self.backend = backend
 
     @property
     def dtype(self):
@@ -96,9 +179,179 @@ class StateSpaceModel(PyfarStateSpaceModel):
             self._D.astype(self.dtype, order=value),
         )
         self._storage = value
+        self._powers = None
+        self._resolvent = None
+        self._selected = None
+        self._fused_cache = None
+        self._block = None
+
+    @property
+    def method(self):
+        """The solver mode, either ``'sample'`` or ``'block'``."""
+        return self._method
+
+    @method.setter
+    def method(self, value):
+        assert value in ("sample", "block"), "Method must be either 'sample' or 'block'."
+        self._method = value
+        self._block = None
+
+    @property
+    def silence_threshold(self):
+        """State norm at which silent input ends the recursion, ``None`` if disabled."""
+        return self._silence_threshold
+
+    @silence_threshold.setter
+    def silence_threshold(self, value):
+        assert value is None or float(value) >= 0, "The silence threshold must be non-negative."
+        self._silence_threshold = None if value is None else float(value)
+        # autotuning decisions depend on the threshold
+        self._block, self._tuned = None, set()
+
+    def decay_threshold(self, error_energy):
+        """Silence threshold whose state reset costs at most ``error_energy`` of output error.
+
+        Setting a state ``x`` to zero removes its free response ``C @ A**k @ x``, ``k >= 0``, from
+        all later outputs, also after the input resumes. The energy of the removed response,
+        summed over all outputs and samples, is ``x @ W @ x <= lambda_max(W) * |x|**2`` with the
+        observability Gramian ``W = A.T @ W @ A + C.T @ C`` of the stable system. Every reset
+        during a silent span contributes at most ``error_energy``.
+
+        Parameters
+        ----------
+        error_energy : float
+            Largest error energy per reset, e.g. ``1e-12`` for an error 120 dB below a signal of
+            unit energy.
+
+        Returns
+        -------
+        float
+            The threshold for :attr:`silence_threshold`.
+        """
+        A, C = self._A.astype(np.float64), self._C.astype(np.float64)
+        assert np.max(np.abs(np.linalg.eigvals(A)), initial=0) < 1, "The error bound requires a stable system."
+        W = solve_discrete_lyapunov(A.T, C.T @ C)
+        return float(np.sqrt(error_energy / max(np.linalg.eigvalsh(W)[-1], np.finfo(np.float64).tiny)))
+
+    @property
+    def n_workers(self):
+        """The number of threads of the time-parallel solver, ``1`` solves sequentially."""
+        return self._n_workers
+
+    @n_workers.setter
+    def n_workers(self, value):
+        assert int(value) >= 1, "Number of workers must be a positive integer."
+        self._n_workers = int(value)
+
+    @property
+    def outputs(self):
+        """Indices of the outputs computed by :meth:`process`, ``None`` if all are computed.
+
+        With a selection, only the selected rows of ``C`` and ``D`` are gathered into the output
+        operands of the kernel, once, and :meth:`process` and :meth:`process_block` return
+        ``len(outputs)`` outputs in the order of the indices. The state recursion is unchanged.
+        Setting the selection completes a running crossfade of :meth:`set_output_map` and
+        updates the operands of :meth:`process_block`, whose output buffer needs
+        ``len(outputs)`` rows. :meth:`process_batch` always computes all outputs.
+        """
+        return self._outputs
+
+    @outputs.setter
+    def outputs(self, value):
+        assert self._OUTPUT_MAPS, f"{type(self).__name__} does not support output selection."
+        if value is not None:
+            value = np.asarray(value, dtype=np.intp).ravel()
+            assert value.size > 0, "Select at least one output."
+            assert np.all((value >= 0) & (value < self.n_outputs)), f"Outputs must be in [0, {self.n_outputs})."
+        self._outputs = value
+        self._selected = None
+        self._fade = None
+        self._refresh_block()
+
+    def set_output_map(self, C, D=None, crossfade=0):
+        """Replace the output matrices, optionally crossfading from the current ones.
+
+        ``A``, ``B`` and the state are kept, so the new map reads the state of the running
+        recursion. ``C`` is given in the original coordinates of the model and transformed once
+        to the coordinates of :attr:`state` by the structured models. The arrays of a dense model
+        are used as they are if they are in the working dtype and storage, otherwise they are
+        converted once. With ``crossfade``, the output of the next
+        ``crossfade`` samples is ``(1 - g) * y_old + g * y_new`` with ``g`` rising linearly from
+        ``1 / crossfade`` to ``1``, evaluated per sample by the ``solve_crossfade`` kernel for
+        dense models with the ``'sample'`` method and by the regular solver on both maps
+        otherwise. The fade continues across calls of :meth:`process` and :meth:`process_block`,
+        so switching at a block boundary is glitch-free. A running crossfade is cut short, i.e.
+        the new one starts from the previous target map.
+
+        Parameters
+        ----------
+        C : numpy.ndarray, shape (p, n)
+            Output matrix in the original coordinates, i.e. of the ``A`` the model was built from.
+        D : numpy.ndarray, shape (p, m), optional
+            Feed-through matrix. Defaults to zeros.
+        crossfade : int, optional
+            Length of the crossfade in samples. Defaults to ``0``, i.e. an immediate switch.
+        """
+        assert self._OUTPUT_MAPS, f"{type(self).__name__} does not support output maps."
+        D = np.zeros((self.n_outputs, self.n_inputs)) if D is None else D
+        assert C.shape == self._C.shape, f"C needs to be of shape {self._C.shape}."
+        assert D.shape == self._D.shape, f"D needs to be of shape {self._D.shape}."
+        assert int(crossfade) >= 0, "The crossfade length must be non-negative."
+        previous = self._output_map()
+        self._C = np.asarray(self._state_output_matrix(C), dtype=self.dtype, order=self.storage)
+        self._D = np.asarray(D, dtype=self.dtype, order=self.storage)
+        self._selected = None
+        self._resolvent = None
+        self._fade = (previous, 0, int(crossfade)) if crossfade else None
+        self._refresh_block()
+
+    def _output_map(self):
+        """``(C, D)`` of the selected outputs, gathered once in the working dtype and storage."""
+        if self._outputs is None:
+            return self._C, self._D
+        if self._selected is None:
+            order = np.asfortranarray if self.storage == "F" else np.ascontiguousarray
+            self._selected = tuple(order(M[self._outputs]) for M in (self._C, self._D))
+        return self._selected
+
+    @property
+    def backend(self):
+        """Name of the backend running the model, the winner once ``'autotune'`` has run."""
+        return _backends.BACKEND if self._backend is None else self._backend
+
+    @backend.setter
+    def backend(self, value):
+        assert value in (None, "autotune", *BACKENDS), f"Backend must be one of {BACKENDS} or 'autotune'."
+        self._autotune = value == "autotune"
+        self._tuned = set()
+        self._use_backend(None if self._autotune else value)
+
+    def _use_backend(self, name):
+        """Run the model on backend ``name``, ``None`` follows the detected backend."""
+        self._backend = name
+        self._backend_module = None if name is None else load_backend(name)
+        self._block = None
+
+    def _kernel(self, kernel):
+        """Backend function ``kernel``, ``None`` selects the pyfar fallback."""
+        if self._backend is None:
+            return _default_kernel(kernel)
+        return None if self._backend_module is None else getattr(self._backend_module, kernel)
+
+    def _tune(self, n_samples):
+        """Switch to the fastest configuration for blocks of ``n_samples`` in autotuning mode."""
+        block = _autotune.block_size(n_samples)
+        if not self._autotune or block in self._tuned:
+            return
+        decision = _autotune.autotune(self, n_samples)
+        self._use_backend(decision["backend"])
+        if decision["storage"] != self.storage:
+            self.storage = decision["storage"]
+        self.method = decision["method"]
+        self._tuned.add(block)
 
     @classmethod
-    def from_pyfar(cls, sys: PyfarStateSpaceModel, storage="F"):
+    def from_pyfar(cls, sys: PyfarStateSpaceModel, storage="F", method="sample", **kwargs):
         """Construct a :class:`StateSpaceModel` from a pyfar :class:`StateSpaceModel`.
 
         Parameters
@@ -107,6 +360,10 @@ class StateSpaceModel(PyfarStateSpaceModel):
             Source system.
         storage : {'F', 'C'}, optional
             Memory layout for the internal matrices.
+        method : {'sample', 'block'}, optional
+            Solver mode, see :class:`StateSpaceModel`.
+        **kwargs
+            Further keyword arguments passed to the constructor.
 
         Returns
         -------
@@ -120,35 +377,877 @@ class StateSpaceModel(PyfarStateSpaceModel):
             sampling_rate=sys.sampling_rate,
             dtype=sys.dtype,
             storage=storage,
+            method=method,
+            **kwargs,
+        )
+
+    def _solver(self):
+        """Backend kernel for the current method, ``None`` selects the pyfar fallback."""
+        if self.method == "block":
+            return self._kernel("solve_block")
+        if self._silent():
+            return self._kernel("solve_silent")
+        if self._small():
+            return self._kernel("solve_small")
+        return self._kernel("solve")
+
+    def _operands(self, output_map=None):
+        """System arrays passed to the backend kernel between the state and the input.
+
+        ``output_map`` replaces ``(C, D)`` of the selected outputs.
+        """
+        C, D = self._output_map() if output_map is None else output_map
+        if self._silent():
+            return self._A, self._B, C, D, self.dtype.type(self._silence_threshold)
+        if self._small():
+            return self._fused(C, D)
+        return self._A, self._B, C, D
+
+    def _small(self):
+        """Whether the ``solve_small`` kernel runs the model."""
+        return (
+            self.method == "sample"
+            and not self._silent()
+            and self.n_states <= _SMALL_ORDER
+            and self._kernel("solve_small") is not None
         )
 
+    def _fused(self, C, D):
+        """``M = [[C, D], [A, B]]`` in Fortran order and a scratch vector of ``p + n`` entries.
+
+        The operands of ``solve_small``, packed once per output map, so that the kernel allocates
+        nothing per call.
+        """
+        key = (self._A, self._B, C, D)
+        if self._fused_cache is None or any(a is not b for a, b in zip(key, self._fused_cache[:4], strict=True)):
+            M = np.asfortranarray(np.block([[C, D], [self._A, self._B]]), dtype=self.dtype)
+            self._fused_cache = (*key, M, np.zeros(len(M), self.dtype))
+        return self._fused_cache[4:]
+
+    def _crossfade_kernel(self):
+        """Backend kernel crossfading between two output maps, ``None`` runs both maps stacked."""
+        if self.method == "block" or self._silent():
+            return None
+        return self._kernel("solve_crossfade")
+
+    def _state_output_matrix(self, C):
+        """Output matrix ``C`` of the original coordinates in the coordinates of :attr:`state`."""
+        return C
+
+    def _silent(self):
+        """Whether the ``solve_silent`` kernel runs the model."""
+        return self._silence_threshold is not None and self.method == "sample"
+
+    def _fields(self):
+        """Arrays and JSON-serialisable attributes that define the model, see :mod:`ssmsolve.io`."""
+        return {"A": self._A, "B": self._B, "C": self._C, "D": self._D}, {}
+
+    def _restore(self, arrays, attributes):
+        """Inverse of :meth:`_fields`, taking over ``arrays`` without copying them."""
+        self._A, self._B, self._C, self._D = arrays["A"], arrays["B"], arrays["C"], arrays["D"]
+
+    @classmethod
+    def _from_fields(cls, arrays, attributes, sampling_rate, dtype, storage, comment="", **kwargs):
+        """Model of the output of :meth:`_fields`, without copying ``arrays``.
+
+        The constructor is bypassed, since it would copy the arrays and repeat the decompositions
+        of the structured models. ``kwargs`` are ``method``, ``n_workers``, ``silence_threshold``
+        and ``backend``.
+        """
+        sys = cls.__new__(cls)
+        super(PyfarStateSpaceModel, sys).__init__(sampling_rate=sampling_rate, state=None, comment=comment)
+        sys.dtype, sys._storage = np.dtype(dtype), storage
+        sys._powers, sys._resolvent, sys._block = None, None, None
+        sys._outputs, sys._selected, sys._fade = None, None, None
+        sys._fused_cache = None
+        sys._restore(arrays, attributes)
+        sys.method = kwargs.get("method", "sample")
+        sys.n_workers = kwargs.get("n_workers", 1)
+        sys.silence_threshold = kwargs.get("silence_threshold")
+        sys.backend = kwargs.get("backend")
+        return sys
+
+    def _flops_per_sample(self):
+        """Floating-point operations of one sample of the state equations, for instrumentation."""
+        n, m, p = self.n_states, self.n_inputs, self.n_outputs
+        return 2 * (n + p) * (n + m)
+
+    def process(self, signal):
+        """Process a signal with the state-space model.
+
+        While :mod:`ssmsolve.instrumentation` is enabled, the call is timed by phase and recorded:
+        ``convert`` up to the input in the working dtype and storage, including the selection of
+        the kernel, ``allocate`` for the output, ``solve`` for the backend kernel and ``wrap`` for
+        the construction of the output signal.
+
+        Parameters
+        ----------
+        signal : pyfar.Signal
+            Input signal with ``cshape = (m,)``.
+
+        Returns
+        -------
+        pyfar.Signal
+            Output signal with ``cshape = (p,)``.
+        """
+        timer = _instrumentation._timer()
+        if timer is None:
+            return super().process(signal)
+        self._timer = timer
+        try:
+            out = super().process(signal)
+        finally:
+            self._timer = None
+        timer.lap("wrap")
+        n_samples = out.n_samples
+        _instrumentation._record(
+            f"{type(self).__name__}.process",
+            timer.tags,
+            timer.seconds,
+            n_samples,
+            n_samples * self._flops_per_sample(),
+        )
+        return out
+
     def _process(self, u):
-        if _backend_solve is None:
-            return super(StateSpaceModel, self)._process(u)
-        y = np.zeros((self.n_outputs, u.shape[1]), self.dtype, order=self.storage)
+        timer = self._timer
+        self._tune(u.shape[1])
+        solve = self._solver()
+        if solve is None and self._fade is None:
+            if timer is not None:
+                timer.lap("convert")
+                timer.tags = self._tags("pyfar")
+            y = self._pyfar_process(u)
+            if timer is not None:
+                timer.lap("solve")
+            return y
         if self.storage == "F":
             u = np.asfortranarray(u, dtype=self.dtype)
         else:
             u = np.ascontiguousarray(u, dtype=self.dtype)
-        _backend_solve(y, self.state, self._A, self._B, self._C, self._D, u)
+        if timer is not None:
+            timer.lap("convert")
+        y = np.zeros((len(self._output_map()[0]), u.shape[1]), self.dtype, order=self.storage)
+        if timer is not None:
+            timer.lap("allocate")
+        n_segments = min(self.n_workers, u.shape[1] // self.n_states)
+        solve_parallel = self._kernel("solve_parallel")
+        if self._fade is not None:
+            kernel = self._crossfade(y, u)
+        elif n_segments > 1 and solve_parallel is not None:
+            L = -(-u.shape[1] // n_segments)
+            solve_parallel(y, self.state, self._A, self._B, *self._output_map(), u, self._power(L), L)
+            kernel = solve_parallel.__name__
+        else:
+            solve(y, self.state, *self._operands(), u)
+            kernel = solve.__name__
+        if timer is not None:
+            timer.lap("solve")
+            timer.tags = self._tags(kernel)
         return y
 
+    def _pyfar_process(self, u, output_map=None):
+        """Run the pyfar solver on the selected outputs, or on ``output_map`` instead."""
+        C, D = self._C, self._D
+        self._C, self._D = self._output_map() if output_map is None else output_map
+        try:
+            return super(StateSpaceModel, self)._process(u)
+        finally:
+            self._C, self._D = C, D
+
+    def _crossfade(self, y, u):
+        """Solve the next samples of the running crossfade into ``y``, return the kernel name."""
+        previous, position, length = self._fade
+        n_samples = u.shape[1]
+        gain = np.minimum(np.arange(position + 1, position + n_samples + 1) / length, 1).astype(self.dtype)
+        solve = self._crossfade_kernel()
+        if solve is not None:
+            solve(y, self.state, self._A, self._B, *previous, *self._output_map(), gain, u)
+            kernel = solve.__name__
+        else:
+            # both maps as one output map of twice the outputs, mixed afterwards
+            order = np.asfortranarray if self.storage == "F" else np.ascontiguousarray
+            stacked = tuple(order(np.concatenate(M)) for M in zip(previous, self._output_map(), strict=True))
+            solve = self._solver()
+            if solve is None:
+                z = self._pyfar_process(u, stacked)
+                kernel = "pyfar"
+            else:
+                z = np.zeros((2 * len(y), n_samples), self.dtype, order=self.storage)
+                solve(z, self.state, *self._operands(stacked), u)
+                kernel = solve.__name__
+            y[...] = z[: len(y)] + gain * (z[len(y) :] - z[: len(y)])
+        position += n_samples
+        self._fade = (previous, position, length) if position < length else None
+        return kernel
+
+    def _tags(self, kernel):
+        """Tags of the instrumentation events of a call running ``kernel``."""
+        backend = "pyfar" if kernel == "pyfar" else self.backend
+        return dict(_event_tags(backend, kernel, self.dtype, self.storage, self.method))
+
+    def init_block(self, n_samples):
+        """Prepare :meth:`process_block` for blocks of ``n_samples`` samples.
+
+        Resolves the backend kernel and its operands, brings the state to the working dtype and
+        allocates input and output buffers in the working dtype and storage. Call again after
+        changing :attr:`storage`, :attr:`method` or :attr:`backend`. In autotuning mode, the
+        model is tuned for ``n_samples`` first.
+
+        Parameters
+        ----------
+        n_samples : int
+            Block size.
+
+        Returns
+        -------
+        u : numpy.ndarray, shape (m, n_samples)
+            Input buffer to be filled by the caller.
+        out : numpy.ndarray, shape (p, n_samples)
+            Output buffer written by :meth:`process_block`, with one row per selected output.
+        """
+        self._tune(n_samples)
+        if self.state is None:
+            self.init_state()
+        self.state = np.ascontiguousarray(self.state, dtype=self.dtype)
+        solve = self._solver()
+        self._block = (solve, self._operands() if solve is not None else None)
+        u = np.zeros((self.n_inputs, n_samples), self.dtype, order=self.storage)
+        out = np.zeros((len(self._output_map()[0]), n_samples), self.dtype, order=self.storage)
+        return u, out
+
+    def _refresh_block(self):
+        """Resolve the operands of :meth:`process_block` again after a change of the output map."""
+        if self._block is not None and self._block[0] is not None:
+            self._block = (self._block[0], self._operands())
+
+    def process_block(self, u, out):
+        """Process a block of raw samples into caller-provided memory.
+
+        Low-latency streaming counterpart of :meth:`process`: no :class:`pyfar.Signal` is
+        constructed and no layout conversion or validation takes place, the input and output buffers
+        are reused across calls. The kernels may still allocate temporaries, e.g. for their
+        matrix-vector products or, with ``'block'``, the ``n x T`` state trajectory. Only the fused
+        kernel of small orders allocates nothing. ``u`` and ``out`` must be in the working dtype and
+        storage, e.g. the buffers returned by :meth:`init_block`, which has to be called once
+        beforehand. The state is carried across calls as with :meth:`process`. Without a backend,
+        the pyfar solver is used and its result copied to ``out``.
+
+        Parameters
+        ----------
+        u : numpy.ndarray, shape (m, T)
+            Input block.
+        out : numpy.ndarray, shape (p, T)
+            Output block, overwritten in-place.
+
+        Returns
+        -------
+        out : numpy.ndarray, shape (p, T)
+            The output block.
+        """
+        assert self._block is not None, "Call init_block before process_block."
+        solve, operands = self._block
+        if self._fade is not None:
+            self._crossfade(out, u)
+        elif solve is None:
+            out[...] = self._pyfar_process(u)
+        else:
+            solve(out, self.state, *operands, u)
+        return out
+
+    def _power(self, L):
+        """``A**L`` in the working dtype and storage, cached for the last segment length."""
+        if self._powers is None or self._powers[0] != L:
+            AL = np.linalg.matrix_power(self._A.astype(np.float64), L)
+            self._powers = (L, AL.astype(self.dtype, order=self.storage))
+        return self._powers[1]
+
+    def _complex_schur(self):
+        """Complex Schur form ``(T, Z)`` of ``A`` with ``A = Z @ T @ Z.conj().T``."""
+        return schur(self._A.astype(np.float64), output="complex")
+
+    def _resolvent_form(self):
+        """``(T, B, C)`` in the complex coordinates used by :meth:`frequency_response`.
+
+        ``T`` is upper triangular, or a vector of poles for a diagonal form. The decomposition is
+        computed once and cached in the complex counterpart of the working dtype.
+        """
+        if self._resolvent is None:
+            T, Z = self._complex_schur()
+            ctype = np.result_type(self.dtype, np.complex64)
+            self._resolvent = tuple(M.astype(ctype) for M in (T, Z.conj().T @ self._B, self._C @ Z))
+        return self._resolvent
+
+    def frequency_response(self, frequencies):
+        """Evaluate the transfer function ``C @ inv(z I - A) @ B + D`` on the unit circle.
+
+        ``A`` is reduced once to complex Schur form ``T``, or to its poles for a model in modal
+        form, so that each frequency costs a triangular solve in ``O(n**2 m)``, or ``O(n m)`` for
+        the modal form, instead of a dense ``O(n**3)`` solve. All frequencies of a chunk are
+        solved at once. With ``n_workers`` greater than one, the chunks are distributed over as
+        many threads. The computation runs in the complex counterpart of the working dtype.
+
+        Parameters
+        ----------
+        frequencies : array_like, shape (n_frequencies,)
+            Frequencies in Hz, evaluated at ``z = exp(2j * pi * frequencies / sampling_rate)``.
+
+        Returns
+        -------
+        H : numpy.ndarray, shape (p, m, n_frequencies)
+            The frequency response from every input to every output.
+        """
+        assert self.sampling_rate is not None, "The sampling rate is required for the frequency response."
+        T, B, C = self._resolvent_form()
+        D = self._D.astype(B.dtype)
+        z = np.exp(2j * np.pi * np.asarray(frequencies, dtype=np.float64).ravel() / self.sampling_rate)
+        z = z.astype(B.dtype)
+        step = max(1, _CHUNK_SIZE // (self.n_states * self.n_inputs or 1))
+        chunks = [z[i : i + step] for i in range(0, len(z), step)]
+        if self.n_workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(min(self.n_workers, len(chunks))) as pool:
+                H = list(pool.map(lambda zc: _transfer(zc, T, B, C, D), chunks))
+        else:
+            H = [_transfer(zc, T, B, C, D) for zc in chunks]
+        return np.concatenate(H, axis=-1) if H else np.empty((self.n_outputs, self.n_inputs, 0), B.dtype)
+
+    def process_batch(self, u, states=None):
+        """Run independent instances of the system on a stack of input signals.
+
+        All instances share the system matrices but carry their own state. Instead of one
+        matrix-vector loop per instance, each sample advances the whole batch with matrix-matrix
+        products ``X = A @ X + B @ U``, so ``A`` is loaded once per sample for all instances.
+
+        Parameters
+        ----------
+        u : numpy.ndarray, shape (batch, m, T)
+            Input signals, one per instance.
+        states : numpy.ndarray, shape (batch, n), optional
+            States of the instances in the coordinates of :attr:`state`. Updated in-place, so
+            sequential calls carry the states across chunk boundaries. Defaults to zeros.
+
+        Returns
+        -------
+        y : numpy.ndarray, shape (batch, p, T)
+            Output signals, one per instance.
+        """
+        assert u.ndim == 3 and u.shape[1] == self.n_inputs, f"u needs to be of shape (batch, {self.n_inputs}, T)."
+        batch, _, n_samples = u.shape
+        if states is None:
+            states = np.zeros((batch, self.n_states), self.dtype)
+        assert states.shape == (batch, self.n_states), f"states needs to be of shape ({batch}, {self.n_states})."
+        # every time slice is a (·, batch) matrix in the storage order, i.e. the batch axis is the
+        # leading dimension in memory for Fortran order
+        if self.storage == "F":
+            y = np.zeros((n_samples, batch, self.n_outputs), self.dtype).transpose(0, 2, 1)
+            u = np.ascontiguousarray(u.transpose(2, 0, 1), dtype=self.dtype).transpose(0, 2, 1)
+            X = np.asfortranarray(states.T, dtype=self.dtype)
+        else:
+            y = np.zeros((n_samples, self.n_outputs, batch), self.dtype)
+            u = np.ascontiguousarray(u.transpose(2, 1, 0), dtype=self.dtype)
+            X = np.ascontiguousarray(states.T, dtype=self.dtype)
+        solve = self._kernel("solve_batch") or _solve_batch
+        solve(y, X, self._A, self._B, self._C, self._D, u)
+        if not np.shares_memory(X, states):
+            states[...] = X.T
+        return y.transpose(2, 1, 0)
+
 
 class TriangularStateSpaceModel(StateSpaceModel):
-    packed = False
+    """State-space model in real Schur form.
 
-    @classmethod
-    def from_pyfar(cls, sys: StateSpaceModel):
-        raise NotImplementedError("TriangularStateSpaceModel is not implemented yet.")
+    ``A`` is reduced to quasi-upper-triangular form ``T = Z.T @ A @ Z`` by the orthogonal real
+    Schur decomposition, and ``B`` and ``C`` are transformed accordingly. Complex-conjugate pole
+    pairs appear as 2x2 blocks on the diagonal, so ``T`` has nonzeros below the diagonal only on
+    its first subdiagonal. The backend kernels apply the upper triangle with ``trmv``-style
+    products and add the subdiagonal separately, which touches half of the entries of a dense
+    ``A @ x``. Since ``Z`` is orthogonal, this is the numerically safe alternative to
+    :class:`DiagonalStateSpaceModel` for models with an ill-conditioned modal form. :attr:`state`
+    lives in Schur coordinates, the original state is ``Z @ state``. ``Z`` is kept, so that
+    :meth:`set_output_map` takes output matrices in the original coordinates.
 
-    def process(self, signal):
-        raise NotImplementedError("TriangularStateSpaceModel is not implemented yet.")
+    Parameters
+    ----------
+    A, B, C, D, sampling_rate, dtype, storage, method, n_workers, backend, comment
+        See :class:`StateSpaceModel`.
+    state : numpy.ndarray, shape (n,), optional
+        Initial state vector in the original coordinates. Defaults to zeros.
+    packed : bool, optional
+        Run the state update on the upper triangle in packed storage (column by column,
+        ``n * (n + 1) / 2`` entries, ``tpmv``-style) instead of the dense Schur factor
+        (``trmv``-style). Defaults to ``False``.
+    """
+
+    def __init__(
+        self,
+        A,
+        B,
+        C,
+        D=None,
+        sampling_rate=None,
+        state=None,
+        dtype=None,
+        storage="F",
+        method="sample",
+        n_workers=1,
+        backend=None,
+        packed=False,
+        comment="",
+    ):
+        D = np.zeros((C.shape[0], B.shape[1])) if D is None else D
+        dtype = np.result_type(A, B, C, D) if dtype is None else np.dtype(dtype)
+        T, Z = schur(np.asarray(A, dtype=np.float64), output="real")
+        state = None if state is None else Z.T @ state
+        B, C = Z.T @ B, C @ Z
+        super().__init__(T, B, C, D, sampling_rate, state, dtype, storage, method, n_workers, backend, comment)
+        self._subdiagonal = np.diag(self._A, -1).copy()
+        self._Z = Z
+        self.packed = packed
+
+    @property
+    def packed(self):
+        """Whether the state update runs on the packed upper triangle of the Schur factor."""
+        return self._packed
+
+    @packed.setter
+    def packed(self, value):
+        # column-major packed upper triangle, i.e. the lower triangle of T.T row by row
+        self._Ap = self._A.T[np.tril_indices(self.n_states)] if value else None
+        self._packed = bool(value)
+        self._block = None
+
+    def _state_output_matrix(self, C):
+        return C @ self._Z
+
+    def _complex_schur(self):
+        # A is in real Schur form already, only its 2x2 blocks need to be triangularised
+        return rsf2csf(self._A.astype(np.float64), np.eye(self.n_states))
+
+    def _solver(self):
+        kernel = "solve_packed" if self.packed else "solve_triangular"
+        return self._kernel(f"{kernel}_block" if self.method == "block" else kernel)
+
+    def _operands(self, output_map=None):
+        T = self._Ap if self.packed else self._A
+        C, D = self._output_map() if output_map is None else output_map
+        return T, self._subdiagonal, self._B, C, D
+
+    def _crossfade_kernel(self):
+        return None
+
+    def _flops_per_sample(self):
+        n, m, p = self.n_states, self.n_inputs, self.n_outputs
+        # upper triangle and first subdiagonal of T instead of all of A
+        return 2 * (n * (n + 1) // 2 + n - 1 + n * m + p * (n + m))
+
+    def _fields(self):
+        arrays, attributes = super()._fields()
+        arrays["subdiagonal"], arrays["Z"] = self._subdiagonal, self._Z
+        if self.packed:
+            arrays["Ap"] = self._Ap
+        return arrays, attributes | {"packed": self.packed}
+
+    def _restore(self, arrays, attributes):
+        super()._restore(arrays, attributes)
+        self._subdiagonal, self._Ap, self._packed = arrays["subdiagonal"], arrays.get("Ap"), attributes["packed"]
+        self._Z = arrays["Z"]
 
 
 class DiagonalStateSpaceModel(StateSpaceModel):
-    @classmethod
-    def from_pyfar(cls, sys: StateSpaceModel):
-        raise NotImplementedError("DiagonalStateSpaceModel is not implemented yet.")
+    """State-space model in real modal form with an elementwise state update.
 
-    def process(self, signal):
-        raise NotImplementedError("DiagonalStateSpaceModel is not implemented yet.")
+    ``A`` is eigendecomposed and the system is transformed to real modal coordinates: real poles
+    become scalar modes and complex-conjugate pole pairs ``sigma ± i omega`` become 2x2
+    rotation-scaling blocks ``[[sigma, omega], [-omega, sigma]]``. The backend kernels then update
+    the state elementwise in ``O(n)`` instead of computing the dense ``A @ x``. The transformation
+    leaves the input-output behaviour unchanged, but :attr:`state` lives in modal coordinates, the
+    original state is ``V @ state`` for the eigenvector matrix ``V``. ``V`` is kept, so that
+    :meth:`set_output_map` takes output matrices in the original coordinates.
+
+    If the eigenvector matrix is ill-conditioned, e.g. for (nearly) defective ``A``, the
+    transformation is skipped with a warning and the model falls back to the dense solver.
+
+    Parameters
+    ----------
+    A, B, C, D, sampling_rate, dtype, storage, method, n_workers, backend, comment
+        See :class:`StateSpaceModel`.
+    state : numpy.ndarray, shape (n,), optional
+        Initial state vector in the original coordinates. Defaults to zeros.
+    max_cond : float, optional
+        Largest accepted condition number of the eigenvector matrix. Defaults to
+        ``1 / sqrt(eps)`` of the working dtype, i.e. at most half of the significant digits are
+        lost in the transformation.
+    """
+
+    def __init__(
+        self,
+        A,
+        B,
+        C,
+        D=None,
+        sampling_rate=None,
+        state=None,
+        dtype=None,
+        storage="F",
+        method="sample",
+        n_workers=1,
+        backend=None,
+        max_cond=None,
+        comment="",
+    ):
+        D = np.zeros((C.shape[0], B.shape[1])) if D is None else D
+        dtype = np.result_type(A, B, C, D) if dtype is None else np.dtype(dtype)
+        max_cond = 1 / np.sqrt(np.finfo(dtype).eps) if max_cond is None else max_cond
+        V, ad, ae, n_real = _real_modal_form(A)
+        cond = np.linalg.cond(V)
+        self._modal = bool(cond <= max_cond)
+        if self._modal:
+            A, B, C = _modal_matrix(ad, ae, n_real), np.linalg.solve(V, B), C @ V
+            state = None if state is None else np.linalg.solve(V, state)
+        else:
+            warnings.warn(
+                f"Eigenvector matrix is ill-conditioned (cond={cond:.1e} > {max_cond:.1e}), "
+                "falling back to the dense solver.",
+                stacklevel=2,
+            )
+        super().__init__(A, B, C, D, sampling_rate, state, dtype, storage, method, n_workers, backend, comment)
+        self._ad, self._ae, self._n_real = ad.astype(self.dtype), ae.astype(self.dtype), n_real
+        self._V = V if self._modal else None
+
+    @property
+    def modal(self):
+        """Whether the system is in real modal form, ``False`` after falling back to dense."""
+        return self._modal
+
+    def _resolvent_form(self):
+        if not self.modal:
+            return super()._resolvent_form()
+        if self._resolvent is None:
+            # the 2x2 block [[sigma, omega], [-omega, sigma]] has the eigenvectors (1, ±i)
+            ctype = np.result_type(self.dtype, np.complex64)
+            poles = self._ad + 1j * self._ae
+            B, C = self._B.astype(ctype), self._C.astype(ctype)
+            k = np.arange(self._n_real, self.n_states, 2)
+            B[k], B[k + 1] = 0.5 * (self._B[k] - 1j * self._B[k + 1]), 0.5 * (self._B[k] + 1j * self._B[k + 1])
+            C[:, k], C[:, k + 1] = self._C[:, k] + 1j * self._C[:, k + 1], self._C[:, k] - 1j * self._C[:, k + 1]
+            self._resolvent = (poles.astype(ctype), B, C)
+        return self._resolvent
+
+    def _state_output_matrix(self, C):
+        return C @ self._V if self.modal else C
+
+    def _solver(self):
+        if not self.modal:
+            return super()._solver()
+        return self._kernel("solve_diagonal_block" if self.method == "block" else "solve_diagonal")
+
+    def _operands(self, output_map=None):
+        if not self.modal:
+            return super()._operands(output_map)
+        C, D = self._output_map() if output_map is None else output_map
+        return self._ad, self._ae, self._n_real, self._B, C, D
+
+    def _crossfade_kernel(self):
+        return super()._crossfade_kernel() if not self.modal else None
+
+    def _flops_per_sample(self):
+        if not self.modal:
+            return super()._flops_per_sample()
+        n, m, p = self.n_states, self.n_inputs, self.n_outputs
+        # one product per real mode, two per state of a 2x2 block
+        n_real = int(self._n_real)
+        return 2 * (n_real + 2 * (n - n_real) + n * m + p * (n + m))
+
+    def _fields(self):
+        arrays, attributes = super()._fields()
+        attributes |= {"modal": self._modal, "n_real": int(self._n_real)}
+        arrays |= {"ad": self._ad, "ae": self._ae}
+        if self._modal:
+            arrays["V"] = self._V
+        return arrays, attributes
+
+    def _restore(self, arrays, attributes):
+        super()._restore(arrays, attributes)
+        self._ad, self._ae, self._V = arrays["ad"], arrays["ae"], arrays.get("V")
+        self._modal, self._n_real = attributes["modal"], attributes["n_real"]
+
+
+class QuantizedStateSpaceModel(StateSpaceModel):
+    """State-space model with compact matrix storage and full-precision state accumulation.
+
+    For large orders, the dense state update is bound by the memory bandwidth of reading ``A``.
+    This model keeps a compact copy of ``[[C, D], [A, B]]``, equilibrated by scales of its rows
+    and columns and normalised to unit maximum per row, either as ``float16`` or ``bfloat16`` bit
+    patterns or as ``int8`` codes. The backend kernels decode it column by column while
+    streaming it once per sample and accumulate outputs and state in :attr:`dtype`, so the traffic
+    shrinks to two or one bytes per entry. ``bfloat16`` has the range of ``float32`` at 8 bits of
+    mantissa, ``float16`` 11 bits and ``int8`` 7 bits relative to the largest entry of each row.
+    Without a backend, the decoded matrix is run with NumPy. ``method`` has no effect; batch and
+    time-parallel processing and the frequency response use the full-precision matrices. If the
+    rounding moves a pole of a stable system onto or outside the unit circle, a warning is raised.
+
+    Parameters
+    ----------
+    A, B, C, D, sampling_rate, state, storage, method, n_workers, backend, comment
+        See :class:`StateSpaceModel`.
+    dtype : numpy.dtype, optional
+        Working dtype of state and signals, ``float32`` or ``float64``. Inferred from the matrices
+        when not provided.
+    matrix_dtype : {'bfloat16', 'float16', 'int8'}, optional
+        Storage format of the system matrices. Defaults to ``'bfloat16'``.
+    """
+
+    MATRIX_DTYPES = ("int8", "bfloat16", "float16")
+    # C and D are part of the codes
+    _OUTPUT_MAPS = False
+
+    def __init__(
+        self,
+        A,
+        B,
+        C,
+        D=None,
+        sampling_rate=None,
+        state=None,
+        dtype=None,
+        storage="F",
+        method="sample",
+        n_workers=1,
+        backend=None,
+        matrix_dtype="bfloat16",
+        comment="",
+    ):
+        super().__init__(A, B, C, D, sampling_rate, state, dtype, storage, method, n_workers, backend, comment)
+        self.matrix_dtype = matrix_dtype
+
+    @property
+    def matrix_dtype(self):
+        """Storage format of the system matrices."""
+        return self._matrix_dtype
+
+    @matrix_dtype.setter
+    def matrix_dtype(self, value):
+        assert value in self.MATRIX_DTYPES, f"matrix_dtype must be one of {self.MATRIX_DTYPES}."
+        M = np.block([[self._C, self._D], [self._A, self._B]]).astype(np.float64)
+        Q, S = _quantize(M, value)
+        self._Q, self._S = Q, S.astype(self.dtype)
+        self._matrix_dtype = value
+        self._block = None
+
+        # rounding moves the poles, which can turn a lightly damped model unstable
+        radius = [np.abs(np.linalg.eigvals(A)).max(initial=0) for A in (self._A, self.dequantized()[0])]
+        if radius[0] < 1 <= radius[1]:
+            warnings.warn(
+                f"The {value} matrices are unstable (spectral radius {radius[1]:.6f}, "
+                f"{radius[0]:.6f} at full precision), consider a wider matrix_dtype.",
+                stacklevel=2,
+            )
+
+    @property
+    def nbytes(self):
+        """Size of the compact matrices and their scales in bytes."""
+        return self._Q.nbytes + self._S.nbytes
+
+    def dequantized(self):
+        """The stored ``(A, B, C, D)`` in float64, i.e. the system the kernels actually run."""
+        M = _dequantize(self._Q, self._S.astype(np.float64), self.MATRIX_DTYPES.index(self.matrix_dtype))
+        p, n = self.n_outputs, self.n_states
+        return M[p:, :n], M[p:, n:], M[:p, :n], M[:p, n:]
+
+    def _solver(self):
+        return self._kernel("solve_quantized") or _solve_quantized
+
+    def _operands(self, output_map=None):
+        return self._Q, self._S, self.MATRIX_DTYPES.index(self.matrix_dtype)
+
+    def _fields(self):
+        arrays, attributes = super()._fields()
+        return arrays | {"Q": self._Q, "S": self._S}, attributes | {"matrix_dtype": self.matrix_dtype}
+
+    def _restore(self, arrays, attributes):
+        super()._restore(arrays, attributes)
+        self._Q, self._S, self._matrix_dtype = arrays["Q"], arrays["S"], attributes["matrix_dtype"]
+
+
+def process_many(models, signals, n_workers=None):
+    """Process one signal per model on a pool of threads.
+
+    The rust and numba kernels and the scipy BLAS calls of the pyfar fallback release the GIL, so
+    independent models, e.g. one per source or listener, run concurrently on separate cores. Each
+    model carries its own state, which is updated as with :meth:`StateSpaceModel.process`. While
+    the pool is running, the BLAS libraries are limited to one thread each with
+    `threadpoolctl <https://github.com/joblib/threadpoolctl>`_, if installed, so that ``n_workers``
+    threads do not oversubscribe the cores with the BLAS threads of every call. For the same
+    reason, the models should use ``n_workers=1`` themselves.
+
+    Parameters
+    ----------
+    models : sequence of StateSpaceModel
+        Distinct models; a model can not be processed by two threads at once.
+    signals : sequence of pyfar.Signal
+        One input signal per model.
+    n_workers : int, optional
+        Number of threads. Defaults to the number of CPUs, at most one per model.
+
+    Returns
+    -------
+    outputs : list of pyfar.Signal
+        The output signals in the order of ``models``.
+    """
+    assert len(models) == len(signals), "Pass one signal per model."
+    assert len({id(sys) for sys in models}) == len(models), "Models need to be distinct objects."
+    n_workers = min(n_workers or os.cpu_count() or 1, len(models))
+    if n_workers <= 1:
+        return [sys.process(sig) for sys, sig in zip(models, signals, strict=True)]
+    limits = threadpool_limits(1, user_api="blas") if threadpool_limits is not None else contextlib.nullcontext()
+    with limits, ThreadPoolExecutor(n_workers) as pool:
+        return list(pool.map(lambda sys, sig: sys.process(sig), models, signals))
+
+
+@functools.lru_cache
+def _event_tags(backend, kernel, dtype, storage, method):
+    # the name of a dtype takes microseconds to look up, which is the budget of a short block
+    return {"backend": backend, "kernel": kernel, "dtype": dtype.name, "storage": storage, "method": method}
+
+
+def _default_kernel(kernel):
+    """Kernel of the detected backend, resolved on first use.
+
+    Resolving it imports the backend, which is deferred to keep importing this module cheap. The
+    kernel is looked up on every call to allow patching.
+    """
+    name = f"_backend_{kernel}"
+    if name not in globals():
+        globals()[name], _ = get_solver(kernel)
+    return globals()[name]
+
+
+def __getattr__(name):
+    # the _backend_<kernel> attributes are created by _default_kernel on first use
+    if name.startswith("_backend_solve"):
+        return _default_kernel(name.removeprefix("_backend_"))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _solve_batch(y, X, A, B, C, D, u):
+    """NumPy batch solver, used when no backend is installed."""
+    for t in range(u.shape[0]):
+        y[t] = C @ X + D @ u[t]
+        X[...] = A @ X + B @ u[t]
+
+
+def _quantize(M, matrix_dtype):
+    """Codes of ``M`` with scales of its rows and columns.
+
+    ``M`` is first equilibrated by a few sweeps of Ruiz scaling, which divide every column and
+    every row by the square root of its largest magnitude, and then each row is normalised to unit
+    maximum. Unlike a scale per row alone, this keeps the relative precision of weakly coupled
+    states, whose entries are small in every row, e.g. those of small Hankel singular values in a
+    balanced realisation.
+
+    Returns ``Q``, in Fortran order as ``int8`` or the ``uint16`` bit patterns of ``bfloat16`` or
+    ``float16``, and ``S``, the row scales followed by the column scales, such that ``M`` is
+    approximately ``_dequantize(Q, S, code)``.
+    """
+    r, c, X = np.ones(M.shape[0]), np.ones(M.shape[1]), M.copy()
+    for _ in range(8):
+        for scale, axis in ((c, 0), (r, 1)):
+            s = np.sqrt(np.abs(X).max(axis=axis, initial=0))
+            s[s == 0] = 1
+            X /= s if axis == 0 else s[:, None]
+            scale *= s
+    s = np.abs(X).max(axis=1, initial=0)
+    s[s == 0] = 1
+    X /= s[:, None]
+    r *= s
+
+    Q = np.empty(M.shape, dtype=np.int8 if matrix_dtype == "int8" else np.uint16, order="F")
+    if matrix_dtype == "int8":
+        Q[...], r = np.rint(127 * X), r / 127
+    elif matrix_dtype == "float16":
+        # subnormals are flushed to zero, they are below 2**-14 of the largest entry
+        h = X.astype(np.float16).view(np.uint16)
+        Q[...] = np.where(h & 0x7C00, h, 0)
+    else:
+        # round to nearest even on the upper 16 bits of the float32 pattern
+        b = X.astype(np.float32).view(np.uint32)
+        Q[...] = (b + 0x7FFF + ((b >> 16) & 1)) >> 16
+    return Q, np.concatenate([r, c])
+
+
+def _dequantize(Q, S, code):
+    """Decode the output of :func:`_quantize`, ``code`` indexes ``MATRIX_DTYPES``."""
+    if code == 0:
+        X = Q.astype(np.float64)
+    elif code == 1:
+        X = (Q.astype(np.uint32) << 16).view(np.float32).astype(np.float64)
+    else:
+        X = Q.view(np.float16).astype(np.float64)
+    rows = Q.shape[0]
+    return S[:rows, None] * X * S[rows:]
+
+
+def _solve_quantized(y, x, Q, S, code, u):
+    """NumPy solver for quantized matrices, used when no backend is installed."""
+    n = x.shape[0]
+    M = _dequantize(Q, S.astype(np.float64), code).astype(x.dtype)
+    z = np.empty(Q.shape[1], x.dtype)
+    z[:n] = x
+    for i in range(u.shape[1]):
+        z[n:] = u[:, i]
+        w = M @ z
+        y[:, i], z[:n] = w[: y.shape[0]], w[y.shape[0] :]
+    x[...] = z[:n]
+
+
+def _transfer(z, T, B, C, D):
+    """``C @ inv(z I - T) @ B + D`` for a vector of ``z``, stacked along the last axis.
+
+    ``T`` is upper triangular and solved by back substitution for all ``z`` at once, or a vector
+    of poles of a diagonal form. The solution is stored state by state, so that every step of the
+    back substitution is a single matrix-vector product over all frequencies and inputs.
+    """
+    n, m = B.shape
+    if T.ndim == 1:
+        X = B[:, None, :] / (z[None, :, None] - T[:, None, None])
+    else:
+        X = np.empty((n, len(z), m), B.dtype)
+        for i in range(n - 1, -1, -1):
+            X[i] = B[i] + np.tensordot(T[i, i + 1 :], X[i + 1 :], axes=1)
+            X[i] /= (z - T[i, i])[:, None]
+    H = (C @ X.reshape(n, -1)).reshape(-1, len(z), m)
+    return H.transpose(0, 2, 1) + D[..., None]
+
+
+def _real_modal_form(A):
+    """Real modal decomposition of ``A``.
+
+    Returns ``(V, ad, ae, n_real)`` such that ``inv(V) @ A @ V`` equals
+    ``_modal_matrix(ad, ae, n_real)``. The first ``n_real`` columns of ``V`` are real
+    eigenvectors, followed by the real and imaginary parts of one eigenvector per
+    complex-conjugate pair.
+    """
+    w, W = np.linalg.eig(np.asarray(A, dtype=np.float64))
+    real, upper = w.imag == 0, w.imag > 0
+    n_real = np.count_nonzero(real)
+    wc, Wc = w[upper], W[:, upper]
+    # rotate the phase of each complex eigenvector to make its real and imaginary part orthogonal,
+    # which minimises the condition number of the corresponding 2x2 block of V
+    a, b, c = np.sum(Wc.real**2, axis=0), np.sum(Wc.imag**2, axis=0), np.sum(Wc.real * Wc.imag, axis=0)
+    Wc = Wc * np.exp(0.5j * np.arctan2(-2 * c, a - b))
+
+    V = np.empty(W.shape)
+    V[:, :n_real] = W[:, real].real
+    V[:, n_real::2], V[:, n_real + 1 :: 2] = Wc.real, Wc.imag
+    ad = np.concatenate([w[real].real, np.repeat(wc.real, 2)])
+    ae = np.zeros_like(ad)
+    ae[n_real::2], ae[n_real + 1 :: 2] = wc.imag, -wc.imag
+    return V, ad, ae, n_real
+
+
+def _modal_matrix(ad, ae, n_real):
+    """Dense block-diagonal ``A`` from its real modal representation."""
+    A = np.diag(ad)
+    k = np.arange(n_real, len(ad), 2)
+    A[k, k + 1], A[k + 1, k] = ae[k], ae[k + 1]
+    return A
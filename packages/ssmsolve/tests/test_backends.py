@@ -1,15 +1,32 @@
 """Tests for ssmsolve backend process functions.
 
-Each backend (pyfar, numba, rust) is tested independently by patching
-_backend_solve_F/_backend_solve_C in ssmsolve.models. Both storage orders
-('F' / 'C') and both precisions (float32 / float64) are covered.
+Each backend (pyfar, numba, rust) is tested independently by patching the
+_backend_<kernel> solvers in ssmsolve.models. Both storage orders ('F' / 'C'),
+both precisions (float32 / float64) and both solver methods ('sample' / 'block')
+are covered, for the dense, the modal (diagonal) and the Schur (triangular) models.
 """
 
+import json
+import subprocess
+import sys as _sys
+import threading
+import time
+
 import numpy as np
 import pytest
+import ssmsolve.autotune as _autotune
+import ssmsolve.instrumentation as _instrumentation
+import ssmsolve.io as _io
 import ssmsolve.models as _m
 from pyfar import Signal
-from ssmsolve.models import StateSpaceModel
+from ssmsolve.backends import available_backends
+from ssmsolve.models import (
+    DiagonalStateSpaceModel,
+    QuantizedStateSpaceModel,
+    StateSpaceModel,
+    TriangularStateSpaceModel,
+    process_many,
+)
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -17,6 +34,23 @@ from ssmsolve.models import StateSpaceModel
 
 _rng = np.random.default_rng(0)
 
+KERNELS = (
+    "solve",
+    "solve_small",
+    "solve_block",
+    "solve_diagonal",
+    "solve_diagonal_block",
+    "solve_triangular",
+    "solve_triangular_block",
+    "solve_packed",
+    "solve_packed_block",
+    "solve_batch",
+    "solve_parallel",
+    "solve_quantized",
+    "solve_silent",
+    "solve_crossfade",
+)
+
 
 def _make_system(n=8, m=3, p=4, T=64, dtype=np.float64, storage="F"):
     A = 0.8 * np.eye(n, dtype=dtype)
@@ -27,15 +61,128 @@ def _make_system(n=8, m=3, p=4, T=64, dtype=np.float64, storage="F"):
     return sys, sig
 
 
+def _make_modal_system(n=12, m=3, p=4, T=64, dtype=np.float64, storage="F"):
+    """Random stable system with real and complex-conjugate poles."""
+    A = _rng.standard_normal((n, n))
+    A *= 0.9 / np.max(np.abs(np.linalg.eigvals(A)))
+    B = _rng.random((n, m))
+    C = _rng.random((p, n))
+    dense = StateSpaceModel(A, B, C, sampling_rate=1, dtype=dtype, storage=storage)
+    sig = Signal(_rng.random((m, T)).astype(dtype), sampling_rate=1)
+    return dense, sig
+
+
+def _patch_backend(module):
+    """Point the ``_backend_<kernel>`` solvers of ssmsolve.models to ``module`` or pyfar."""
+    orig = {kernel: getattr(_m, f"_backend_{kernel}") for kernel in KERNELS}
+    for kernel in KERNELS:
+        setattr(_m, f"_backend_{kernel}", None if module is None else getattr(module, kernel))
+    return orig
+
+
+def _restore_backend(orig):
+    for kernel, solve in orig.items():
+        setattr(_m, f"_backend_{kernel}", solve)
+
+
 def _pyfar_reference(sys, sig):
     """Reference output using the pyfar scipy-BLAS backend."""
-    orig = _m._backend_solve
+    orig = _patch_backend(None)
     try:
-        _m._backend_solve = None
         sys.init_state()
         return sys.process(sig).time.copy()
     finally:
-        _m._backend_solve = orig
+        _restore_backend(orig)
+
+
+def _dequantized_reference(sys, sig):
+    """Reference output of the float64 system the quantized kernels run."""
+    ref = StateSpaceModel(*sys.dequantized(), sampling_rate=1, dtype=np.float64)
+    return _pyfar_reference(ref, Signal(sig.time.astype(np.float64), sampling_rate=1))
+
+
+def _batched(sys, batch=5, T=64, chunk=24):
+    """Process a batch of random inputs in chunks and compare against one instance at a time."""
+    u = _rng.random((batch, sys.n_inputs, T)).astype(sys.dtype)
+    states = np.zeros((batch, sys.n_states), sys.dtype)
+    out = np.concatenate([sys.process_batch(u[..., i : i + chunk], states) for i in range(0, T, chunk)], axis=-1)
+    ref = np.stack([_pyfar_reference(sys, Signal(u_i, sampling_rate=1)) for u_i in u])
+    return out, ref
+
+
+def _blockwise(sys, sig, block=16):
+    """Process ``sig`` through the caller-provided buffers of the block API."""
+    sys.init_state()
+    u, out = sys.init_block(block)
+    chunks = []
+    for i in range(0, sig.n_samples, block):
+        u[...] = sig.time[:, i : i + block]
+        chunks.append(sys.process_block(u, out).copy())
+    return np.concatenate(chunks, axis=-1)
+
+
+def _bursty(m, T, bursts=4, length=12):
+    """Random input that is zero except for a few bursts in its first half."""
+    u = np.zeros((m, T))
+    starts = np.linspace(0, T // 2, bursts).astype(int)
+    for start in starts:
+        u[:, start : start + length] = _rng.standard_normal((m, length))
+    return Signal(u, sampling_rate=1)
+
+
+def _chunked(sys, sig, chunk=24):
+    """Process ``sig`` in consecutive chunks, carrying the state across calls."""
+    sys.init_state()
+    chunks = [
+        sys.process(Signal(sig.time[:, i : i + chunk], sampling_rate=1)).time for i in range(0, sig.n_samples, chunk)
+    ]
+    return np.concatenate(chunks, axis=-1)
+
+
+def _longest_stall(models, T=200_000):
+    """Duration of one solve and the longest the main thread stalls while two threads are solving.
+
+    The main thread wakes up every millisecond until both threads are done. A kernel that holds the
+    GIL blocks it for a whole solve, whereas kernels releasing it let it in between.
+    """
+    calls = []
+    for sys in models:
+        sys.init_state()
+        u = _rng.random((sys.n_inputs, T)).astype(sys.dtype, order=sys.storage)
+        y = np.zeros((sys.n_outputs, T), sys.dtype, order=sys.storage)
+        solve = sys._solver()
+        calls.append((solve, (y, sys.state, *sys._operands(), u)))
+    solve, args = calls[0]
+    solve(*args)  # compiles the kernel
+    start = time.perf_counter()
+    solve(*args)
+    duration = time.perf_counter() - start
+    threads = [threading.Thread(target=solve, args=args) for solve, args in calls]
+    beat, longest = time.perf_counter(), 0.0
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(1e-3)
+        now = time.perf_counter()
+        beat, longest = now, max(longest, now - beat)
+    return duration, longest
+
+
+def _gil_models(kind, method):
+    if kind in ("dense", "small"):
+        n = _m._SMALL_ORDER + 1 if kind == "dense" else 8
+        return [StateSpaceModel.from_pyfar(_make_system(n=n)[0], method=method) for _ in range(2)]
+    dense = _make_modal_system(n=64)[0]
+    if kind == "diagonal":
+        return [DiagonalStateSpaceModel.from_pyfar(dense, method=method) for _ in range(2)]
+    return [TriangularStateSpaceModel.from_pyfar(dense, method=method) for _ in range(2)]
+
+
+def _chunked_from(sys, u, chunk=24):
+    """Process the raw input ``u`` in consecutive chunks from the current state."""
+    return np.hstack(
+        [sys.process(Signal(u[:, i : i + chunk], sampling_rate=1)).time for i in range(0, u.shape[1], chunk)]
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -44,6 +191,12 @@ def _pyfar_reference(sys, sig):
 
 DTYPES = [np.float32, np.float64]
 STORAGES = ["F", "C"]
+METHODS = ["sample", "block"]
+PACKED = [False, True]
+GIL_KINDS = ["dense", "small", "diagonal", "triangular"]
+# dense orders handled by the small-order and the general kernels
+ORDERS = [8, _m._SMALL_ORDER + 1]
+MATRIX_DTYPES = list(QuantizedStateSpaceModel.MATRIX_DTYPES)
 
 DTYPE_IDS = ["float32", "float64"]
 STORAGE_IDS = ["fortran", "c-order"]
@@ -59,21 +212,53 @@ class TestPyfarBackend:
     @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
     def test_output_shape(self, dtype, storage):
         sys, sig = _make_system(dtype=dtype, storage=storage)
-        _m._backend_solve = None
-        sys.init_state()
-        out = sys.process(sig)
+        orig = _patch_backend(None)
+        try:
+            assert sys._solver() is None
+            sys.init_state()
+            out = sys.process(sig)
+        finally:
+            _restore_backend(orig)
         assert out.time.shape == (4, 64)
 
     @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
     @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
     def test_zero_input_zero_output(self, dtype, storage):
         sys, _ = _make_system(dtype=dtype, storage=storage)
-        _m._backend_solve = None
         zero_sig = Signal(np.zeros((3, 64), dtype=dtype), sampling_rate=1)
-        sys.init_state()
-        out = sys.process(zero_sig)
+        orig = _patch_backend(None)
+        try:
+            sys.init_state()
+            out = sys.process(zero_sig)
+        finally:
+            _restore_backend(orig)
         np.testing.assert_allclose(out.time, 0.0, atol=1e-6)
 
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_process_block_matches_process(self, dtype, storage):
+        sys, sig = _make_system(dtype=dtype, storage=storage)
+        orig = _patch_backend(None)
+        try:
+            ref = _pyfar_reference(sys, sig)
+            out = _blockwise(sys, sig)
+        finally:
+            _restore_backend(orig)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_batch_matches_single(self, dtype, storage):
+        sys, _ = _make_modal_system(dtype=dtype, storage=storage)
+        orig = _patch_backend(None)
+        try:
+            out, ref = _batched(sys)
+        finally:
+            _restore_backend(orig)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
 
 # ---------------------------------------------------------------------------
 # Numba backend
@@ -83,28 +268,198 @@ class TestPyfarBackend:
 @pytest.fixture(autouse=False)
 def numba_backend():
     pytest.importorskip("numba", reason="numba not installed")
-    from ssmsolve.backends.numba import solve
+    import ssmsolve.backends.numba as backend
 
-    orig = _m._backend_solve
-    _m._backend_solve = solve
+    orig = _patch_backend(backend)
     yield
-    _m._backend_solve = orig
+    _restore_backend(orig)
 
 
 class TestNumbaBackend:
     @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
     @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
-    def test_matches_pyfar(self, numba_backend, dtype, storage):
-        sys, sig = _make_system(dtype=dtype, storage=storage)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("n", ORDERS)
+    def test_matches_pyfar(self, numba_backend, dtype, storage, method, n):
+        sys, sig = _make_system(n=n, dtype=dtype, storage=storage)
+        sys.method = method
         ref = _pyfar_reference(sys, sig)
-        from ssmsolve.backends.numba import solve
-
-        _m._backend_solve = solve
         sys.init_state()
         out = sys.process(sig).time
         atol = 1e-4 if dtype == np.float32 else 1e-10
         np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
 
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_silent_matches_pyfar(self, numba_backend, dtype, storage):
+        sys, _ = _make_system(dtype=dtype, storage=storage)
+        sig = _bursty(sys.n_inputs, 200)
+        sys.silence_threshold = 0
+        assert sys._solver() is _m._backend_solve_silent
+        ref = _pyfar_reference(sys, sig)
+        out = _chunked(sys, sig)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("n", [_m._SMALL_ORDER, _m._SMALL_ORDER + 1])
+    def test_small_order_matches_pyfar(self, numba_backend, dtype, storage, n):
+        sys, sig = _make_modal_system(n=n, dtype=dtype, storage=storage)
+        small = n <= _m._SMALL_ORDER
+        assert (sys._solver() is _m._backend_solve_small) == small
+        ref = _pyfar_reference(sys, sig)
+        out = _chunked(sys, sig)
+        atol = 1e-3 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_small_order_packs_once(self, numba_backend, storage):
+        sys, sig = _make_modal_system(n=8, storage=storage)
+        M, w = sys._operands()
+        assert M.flags.f_contiguous and M.shape == (sys.n_outputs + 8, 8 + sys.n_inputs)
+        np.testing.assert_array_equal(M, np.block([[sys.C, sys.D], [sys.A, sys.B]]))
+        _chunked(sys, sig)
+        assert all(a is b for a, b in zip(sys._operands(), (M, w), strict=True))
+        # a new output map is packed again
+        C = 2 * sys.C
+        sys.set_output_map(C, sys.D)
+        assert sys._operands()[0] is not M
+        np.testing.assert_array_equal(sys._operands()[0][: sys.n_outputs, :8], C)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("n", ORDERS)
+    def test_chunked_matches_pyfar(self, numba_backend, dtype, storage, method, n):
+        sys, sig = _make_system(n=n, dtype=dtype, storage=storage)
+        sys.method = method
+        ref = _pyfar_reference(sys, sig)
+        out = _chunked(sys, sig)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize(("m", "p"), [(1, 4), (3, 1), (3, 4)])
+    @pytest.mark.parametrize("n", [1, 2])
+    def test_low_order_matches_pyfar(self, numba_backend, storage, method, m, p, n):
+        # matrices of a single state are contiguous in both orders and typed as C-order by numba
+        A = np.array([[0.7]]) if n == 1 else np.array([[0.6, 0.3], [-0.4, 0.5]])
+        B, C, D = _rng.random((n, m)), _rng.random((p, n)), _rng.random((p, m))
+        dense = StateSpaceModel(A, B, C, D, sampling_rate=1, storage=storage, method=method)
+        sig = Signal(_rng.random((m, 64)), sampling_rate=1)
+        ref = _pyfar_reference(dense, sig)
+        silent = StateSpaceModel.from_pyfar(dense, storage=storage, method=method)
+        silent.silence_threshold = 0
+        for sys in (
+            dense,
+            silent,
+            DiagonalStateSpaceModel.from_pyfar(dense, storage=storage, method=method),
+            TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method),
+            TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method, packed=True),
+        ):
+            np.testing.assert_allclose(_chunked(sys, sig), ref, rtol=0, atol=1e-10)
+
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    def test_single_sample_blocks_match_pyfar(self, numba_backend, storage, method):
+        # buffers of a single sample are contiguous in both orders and typed as C-order by numba
+        dense, sig = _make_modal_system(n=_m._SMALL_ORDER + 8, storage=storage)
+        dense.method = method
+        ref = _pyfar_reference(dense, sig)
+        for sys in (
+            dense,
+            DiagonalStateSpaceModel.from_pyfar(dense, storage=storage, method=method),
+            TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method),
+            TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method, packed=True),
+        ):
+            np.testing.assert_allclose(_blockwise(sys, sig, block=1), ref, rtol=0, atol=1e-10)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    def test_diagonal_matches_pyfar(self, numba_backend, dtype, storage, method):
+        dense, sig = _make_modal_system(dtype=dtype, storage=storage)
+        ref = _pyfar_reference(dense, sig)
+        sys = DiagonalStateSpaceModel.from_pyfar(dense, storage=storage, method=method)
+        assert sys.modal
+        out = _chunked(sys, sig)
+        atol = 1e-3 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("packed", PACKED, ids=["dense", "packed"])
+    def test_triangular_matches_pyfar(self, numba_backend, dtype, storage, method, packed):
+        dense, sig = _make_modal_system(dtype=dtype, storage=storage)
+        ref = _pyfar_reference(dense, sig)
+        sys = TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method, packed=packed)
+        out = _chunked(sys, sig)
+        atol = 1e-3 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("matrix_dtype", MATRIX_DTYPES)
+    def test_quantized_matches_dequantized(self, numba_backend, dtype, storage, matrix_dtype):
+        dense, sig = _make_modal_system(n=40, dtype=dtype, storage=storage)
+        sys = QuantizedStateSpaceModel.from_pyfar(dense, storage=storage, matrix_dtype=matrix_dtype)
+        ref = _dequantized_reference(sys, sig)
+        out = _chunked(sys, sig)
+        atol = 1e-4 * np.abs(ref).max() if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_batch_matches_pyfar(self, numba_backend, dtype, storage):
+        sys, _ = _make_modal_system(dtype=dtype, storage=storage)
+        out, ref = _batched(sys)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_parallel_matches_pyfar(self, numba_backend, dtype, storage):
+        sys, sig = _make_modal_system(T=500, dtype=dtype, storage=storage)
+        ref = _pyfar_reference(sys, sig)
+        ref_state = sys.state.copy()
+        sys.n_workers = 4
+        out = _chunked(sys, sig, chunk=200)
+        atol = 1e-3 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+        np.testing.assert_allclose(sys.state, ref_state, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("n", ORDERS)
+    def test_process_block_matches_pyfar(self, numba_backend, dtype, storage, method, n):
+        sys, sig = _make_system(n=n, dtype=dtype, storage=storage)
+        sys.method = method
+        ref = _pyfar_reference(sys, sig)
+        out = _blockwise(sys, sig)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize(("m", "p"), [(1, 4), (3, 1), (1, 1)])
+    @pytest.mark.parametrize("n", ORDERS)
+    def test_single_channel_matches_pyfar(self, numba_backend, storage, method, m, p, n):
+        sys, sig = _make_system(n=n, m=m, p=p, storage=storage)
+        sys.method = method
+        ref = _pyfar_reference(sys, sig)
+        np.testing.assert_allclose(_chunked(sys, sig), ref, rtol=0, atol=1e-10)
+        dense, sig = _make_modal_system(m=m, p=p, storage=storage)
+        ref = _pyfar_reference(dense, sig)
+        for sys in (
+            DiagonalStateSpaceModel.from_pyfar(dense, storage=storage, method=method),
+            TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method, packed=True),
+        ):
+            np.testing.assert_allclose(_chunked(sys, sig), ref, rtol=0, atol=1e-10)
+
     @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
     @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
     def test_zero_input_zero_output(self, numba_backend, dtype, storage):
@@ -114,6 +469,15 @@ class TestNumbaBackend:
         out = sys.process(zero_sig)
         np.testing.assert_allclose(out.time, 0.0, atol=1e-6)
 
+    @pytest.mark.parametrize("kind", GIL_KINDS)
+    @pytest.mark.parametrize("method", METHODS)
+    def test_kernels_release_gil(self, numba_backend, kind, method):
+        models = _gil_models(kind, method)
+        if kind == "small" and method == "sample":
+            assert models[0]._solver() is _m._backend_solve_small
+        duration, stall = _longest_stall(models)
+        assert stall < duration / 2
+
 
 # ---------------------------------------------------------------------------
 # Rust backend
@@ -123,28 +487,167 @@ class TestNumbaBackend:
 @pytest.fixture(autouse=False)
 def rust_backend():
     pytest.importorskip("ssmsolve_rs", reason="ssmsolve-rs not installed")
-    from ssmsolve.backends.rust import solve
+    import ssmsolve.backends.rust as backend
 
-    orig = _m._backend_solve
-    _m._backend_solve = solve
+    orig = _patch_backend(backend)
     yield
-    _m._backend_solve = orig
+    _restore_backend(orig)
 
 
 class TestRustBackend:
     @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
     @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
-    def test_matches_pyfar(self, rust_backend, dtype, storage):
-        sys, sig = _make_system(dtype=dtype, storage=storage)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("n", ORDERS)
+    def test_matches_pyfar(self, rust_backend, dtype, storage, method, n):
+        sys, sig = _make_system(n=n, dtype=dtype, storage=storage)
+        sys.method = method
         ref = _pyfar_reference(sys, sig)
-        from ssmsolve.backends.rust import solve
-
-        _m._backend_solve = solve
         sys.init_state()
         out = sys.process(sig).time
         atol = 1e-4 if dtype == np.float32 else 1e-10
         np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
 
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_silent_matches_pyfar(self, rust_backend, dtype, storage):
+        sys, _ = _make_system(dtype=dtype, storage=storage)
+        sig = _bursty(sys.n_inputs, 200)
+        sys.silence_threshold = 0
+        assert sys._solver() is _m._backend_solve_silent
+        ref = _pyfar_reference(sys, sig)
+        out = _chunked(sys, sig)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("n", [_m._SMALL_ORDER, _m._SMALL_ORDER + 1])
+    def test_small_order_matches_pyfar(self, rust_backend, dtype, storage, n):
+        sys, sig = _make_modal_system(n=n, dtype=dtype, storage=storage)
+        small = n <= _m._SMALL_ORDER
+        assert (sys._solver() is _m._backend_solve_small) == small
+        ref = _pyfar_reference(sys, sig)
+        out = _chunked(sys, sig)
+        atol = 1e-3 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("n", ORDERS)
+    def test_chunked_matches_pyfar(self, rust_backend, dtype, storage, method, n):
+        sys, sig = _make_system(n=n, dtype=dtype, storage=storage)
+        sys.method = method
+        ref = _pyfar_reference(sys, sig)
+        out = _chunked(sys, sig)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    def test_diagonal_matches_pyfar(self, rust_backend, dtype, storage, method):
+        dense, sig = _make_modal_system(dtype=dtype, storage=storage)
+        ref = _pyfar_reference(dense, sig)
+        sys = DiagonalStateSpaceModel.from_pyfar(dense, storage=storage, method=method)
+        assert sys.modal
+        out = _chunked(sys, sig)
+        atol = 1e-3 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("packed", PACKED, ids=["dense", "packed"])
+    def test_triangular_matches_pyfar(self, rust_backend, dtype, storage, method, packed):
+        dense, sig = _make_modal_system(dtype=dtype, storage=storage)
+        ref = _pyfar_reference(dense, sig)
+        sys = TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method, packed=packed)
+        out = _chunked(sys, sig)
+        atol = 1e-3 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("matrix_dtype", MATRIX_DTYPES)
+    def test_quantized_matches_dequantized(self, rust_backend, dtype, storage, matrix_dtype):
+        dense, sig = _make_modal_system(n=40, dtype=dtype, storage=storage)
+        sys = QuantizedStateSpaceModel.from_pyfar(dense, storage=storage, matrix_dtype=matrix_dtype)
+        ref = _dequantized_reference(sys, sig)
+        out = _chunked(sys, sig)
+        atol = 1e-4 * np.abs(ref).max() if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_batch_matches_pyfar(self, rust_backend, dtype, storage):
+        sys, _ = _make_modal_system(dtype=dtype, storage=storage)
+        out, ref = _batched(sys)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_parallel_matches_pyfar(self, rust_backend, dtype, storage):
+        sys, sig = _make_modal_system(T=500, dtype=dtype, storage=storage)
+        ref = _pyfar_reference(sys, sig)
+        ref_state = sys.state.copy()
+        sys.n_workers = 4
+        out = _chunked(sys, sig, chunk=200)
+        atol = 1e-3 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+        np.testing.assert_allclose(sys.state, ref_state, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("n", ORDERS)
+    def test_process_block_matches_pyfar(self, rust_backend, dtype, storage, method, n):
+        sys, sig = _make_system(n=n, dtype=dtype, storage=storage)
+        sys.method = method
+        ref = _pyfar_reference(sys, sig)
+        out = _blockwise(sys, sig)
+        atol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(out, ref, rtol=0, atol=atol)
+
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize(("m", "p"), [(1, 4), (3, 1), (1, 1)])
+    @pytest.mark.parametrize("n", ORDERS)
+    def test_single_channel_matches_pyfar(self, rust_backend, storage, method, m, p, n):
+        sys, sig = _make_system(n=n, m=m, p=p, storage=storage)
+        sys.method = method
+        ref = _pyfar_reference(sys, sig)
+        np.testing.assert_allclose(_chunked(sys, sig), ref, rtol=0, atol=1e-10)
+        dense, sig = _make_modal_system(m=m, p=p, storage=storage)
+        ref = _pyfar_reference(dense, sig)
+        for sys in (
+            DiagonalStateSpaceModel.from_pyfar(dense, storage=storage, method=method),
+            TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method, packed=True),
+        ):
+            np.testing.assert_allclose(_chunked(sys, sig), ref, rtol=0, atol=1e-10)
+
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize(("m", "p"), [(1, 4), (3, 1), (3, 4)])
+    def test_single_state_matches_pyfar(self, rust_backend, storage, method, m, p):
+        # B and C are contiguous in both orders, so their strides do not tell the storage order
+        A, B, C, D = np.array([[0.7]]), _rng.random((1, m)), _rng.random((p, 1)), _rng.random((p, m))
+        dense = StateSpaceModel(A, B, C, D, sampling_rate=1, storage=storage, method=method)
+        sig = Signal(_rng.random((m, 64)), sampling_rate=1)
+        ref = _pyfar_reference(dense, sig)
+        silent = StateSpaceModel.from_pyfar(dense, storage=storage, method=method)
+        silent.silence_threshold = 0
+        for sys in (
+            dense,
+            silent,
+            DiagonalStateSpaceModel.from_pyfar(dense, storage=storage, method=method),
+            TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method),
+            TriangularStateSpaceModel.from_pyfar(dense, storage=storage, method=method, packed=True),
+        ):
+            np.testing.assert_allclose(_chunked(sys, sig), ref, rtol=0, atol=1e-10)
+
     @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
     @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
     def test_zero_input_zero_output(self, rust_backend, dtype, storage):
@@ -153,3 +656,545 @@ class TestRustBackend:
         sys.init_state()
         out = sys.process(zero_sig)
         np.testing.assert_allclose(out.time, 0.0, atol=1e-6)
+
+
+# ---------------------------------------------------------------------------
+# Modal form
+# ---------------------------------------------------------------------------
+
+
+class TestDiagonalStateSpaceModel:
+    def test_modal_structure(self):
+        dense, _ = _make_modal_system()
+        sys = DiagonalStateSpaceModel.from_pyfar(dense)
+        assert 0 < sys._n_real < sys.n_states
+        k = np.arange(sys._n_real, sys.n_states, 2)
+        np.testing.assert_array_equal(sys._ae[k], -sys._ae[k + 1])
+        np.testing.assert_allclose(
+            np.sort_complex(np.linalg.eigvals(sys._A)), np.sort_complex(np.linalg.eigvals(dense._A)), atol=1e-12
+        )
+
+    def test_pyfar_fallback(self):
+        dense, sig = _make_modal_system()
+        ref = _pyfar_reference(dense, sig)
+        sys = DiagonalStateSpaceModel.from_pyfar(dense)
+        np.testing.assert_allclose(_pyfar_reference(sys, sig), ref, rtol=0, atol=1e-10)
+
+    def test_ill_conditioned_falls_back_to_dense(self):
+        A = np.array([[0.5, 1.0], [0.0, 0.5]])  # defective, eigenvectors are parallel
+        B, C = np.ones((2, 1)), np.ones((1, 2))
+        with pytest.warns(UserWarning, match="ill-conditioned"):
+            sys = DiagonalStateSpaceModel(A, B, C, sampling_rate=1)
+        assert not sys.modal
+        np.testing.assert_array_equal(sys._A, A)
+
+
+# ---------------------------------------------------------------------------
+# Schur form
+# ---------------------------------------------------------------------------
+
+
+class TestTriangularStateSpaceModel:
+    def test_schur_structure(self):
+        dense, _ = _make_modal_system()
+        sys = TriangularStateSpaceModel.from_pyfar(dense)
+        np.testing.assert_array_equal(np.tril(sys._A, -2), 0.0)
+        np.testing.assert_array_equal(sys._subdiagonal, np.diag(sys._A, -1))
+        np.testing.assert_allclose(
+            np.sort_complex(np.linalg.eigvals(sys._A)), np.sort_complex(np.linalg.eigvals(dense._A)), atol=1e-12
+        )
+
+    def test_packed_layout(self):
+        dense, _ = _make_modal_system()
+        sys = TriangularStateSpaceModel.from_pyfar(dense, packed=True)
+        n = sys.n_states
+        assert sys._Ap.shape == (n * (n + 1) // 2,)
+        # column j of the upper triangle starts at offset j * (j + 1) / 2
+        for j in range(n):
+            np.testing.assert_array_equal(sys._Ap[j * (j + 1) // 2 : (j + 1) * (j + 2) // 2], sys._A[: j + 1, j])
+
+    def test_pyfar_fallback(self):
+        dense, sig = _make_modal_system()
+        ref = _pyfar_reference(dense, sig)
+        sys = TriangularStateSpaceModel.from_pyfar(dense)
+        np.testing.assert_allclose(_pyfar_reference(sys, sig), ref, rtol=0, atol=1e-10)
+
+
+# ---------------------------------------------------------------------------
+# Quantized storage
+# ---------------------------------------------------------------------------
+
+
+class TestQuantizedStateSpaceModel:
+    @pytest.mark.parametrize(("matrix_dtype", "eps"), [("int8", 1 / 254), ("bfloat16", 2**-8), ("float16", 2**-11)])
+    def test_rounding_error(self, matrix_dtype, eps):
+        dense, _ = _make_modal_system()
+        dense.D[...] = _rng.standard_normal(dense.D.shape)
+        sys = QuantizedStateSpaceModel.from_pyfar(dense, matrix_dtype=matrix_dtype)
+        M = np.block([[dense.C, dense.D], [dense.A, dense.B]])
+        A, B, C, D = sys.dequantized()
+        rows = M.shape[0]
+        grid = np.outer(sys._S[:rows], sys._S[rows:])
+        # half a step of the scaled integer grid, or relative rounding plus flushed subnormals
+        bound = grid / 2 if matrix_dtype == "int8" else eps * np.abs(M) + 2**-14 * grid
+        assert np.all(np.abs(np.block([[C, D], [A, B]]) - M) <= bound * (1 + 1e-6))
+        assert sys.nbytes < M.nbytes / 2
+
+    @pytest.mark.parametrize("matrix_dtype", MATRIX_DTYPES)
+    def test_state_scaling(self, matrix_dtype):
+        # a diagonal change of the state coordinates is absorbed by the row and column scales
+        dense, _ = _make_modal_system()
+        t = np.logspace(0, -4, dense.n_states)
+        A, B, C = dense.A * t[:, None] / t, dense.B * t[:, None], dense.C / t
+        z = np.exp(1j * np.linspace(0.1, 3, 16))
+
+        def response(A, B, C, *_):
+            return np.stack([C @ np.linalg.solve(zk * np.eye(len(A)) - A, B) for zk in z])
+
+        errors = []
+        for system in ((dense.A, dense.B, dense.C), (A, B, C)):
+            sys = QuantizedStateSpaceModel(*system, sampling_rate=1, matrix_dtype=matrix_dtype)
+            H, Hq = response(*system), response(*sys.dequantized())
+            errors.append(np.linalg.norm(Hq - H) / np.linalg.norm(H))
+        assert errors[1] < 2 * errors[0]
+
+    def test_unstable_warns(self):
+        # the int8 codes of cos(0.01) and sin(0.01) move the poles of radius 0.9999 outside
+        t = 0.01
+        A = 0.9999 * np.array([[np.cos(t), -np.sin(t)], [np.sin(t), np.cos(t)]])
+        B, C = np.ones((2, 1)), np.ones((1, 2))
+        with pytest.warns(UserWarning, match="unstable"):
+            QuantizedStateSpaceModel(A, B, C, sampling_rate=1, matrix_dtype="int8")
+
+    @pytest.mark.parametrize("matrix_dtype", MATRIX_DTYPES)
+    def test_pyfar_fallback(self, matrix_dtype):
+        dense, sig = _make_modal_system()
+        sys = QuantizedStateSpaceModel.from_pyfar(dense, matrix_dtype=matrix_dtype)
+        np.testing.assert_allclose(_pyfar_reference(sys, sig), _dequantized_reference(sys, sig), rtol=0, atol=1e-12)
+
+
+# ---------------------------------------------------------------------------
+# Model files
+# ---------------------------------------------------------------------------
+
+MODELS = [
+    (StateSpaceModel, {}),
+    (DiagonalStateSpaceModel, {}),
+    (TriangularStateSpaceModel, {}),
+    (TriangularStateSpaceModel, {"packed": True}),
+    (QuantizedStateSpaceModel, {"matrix_dtype": "int8"}),
+]
+MODEL_IDS = ["dense", "diagonal", "triangular", "packed", "quantized"]
+
+
+class TestModelFiles:
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize(("cls", "kwargs"), MODELS, ids=MODEL_IDS)
+    def test_roundtrip(self, cls, kwargs, dtype, storage, tmp_path):
+        dense, sig = _make_modal_system(dtype=dtype)
+        sys = cls(dense.A, dense.B, dense.C, sampling_rate=48000, dtype=dtype, storage=storage, **kwargs)
+        path = tmp_path / "model.ssm"
+        _io.save(sys, path)
+        loaded = _io.load(path)
+        assert type(loaded) is cls
+        assert (loaded.dtype, loaded.storage, loaded.sampling_rate) == (sys.dtype, sys.storage, sys.sampling_rate)
+        np.testing.assert_array_equal(_chunked(loaded, sig), _chunked(sys, sig))
+        # the arrays are mapped from the file in the storage order of the model, aligned to 64
+        # bytes, small orders run on a fused copy of them, see test_small_order_packs_once
+        fields = loaded._fields()[0]
+        for name, saved in sys._fields()[0].items():
+            mapped = fields[name]
+            assert isinstance(mapped.base, np.memmap)
+            assert mapped.flags.f_contiguous == saved.flags.f_contiguous
+            assert mapped.ctypes.data % 64 == 0
+        if cls._OUTPUT_MAPS:
+            # the basis of the state coordinates is kept for new output maps
+            np.testing.assert_array_equal(loaded._state_output_matrix(dense.C), sys._state_output_matrix(dense.C))
+
+    def test_state_is_private(self, tmp_path):
+        dense, sig = _make_modal_system()
+        path = tmp_path / "model.ssm"
+        _io.save(dense, path)
+        first, second = _io.load(path), _io.load(path, mmap=False, method="block")
+        first.process(sig)
+        assert np.any(first.state) and not np.any(second.state)
+        assert second.method == "block"
+        np.testing.assert_array_equal(_io.load(path)._A, dense._A)
+
+    def test_invalid_files(self, tmp_path):
+        dense, _ = _make_modal_system()
+        path = tmp_path / "model.ssm"
+        path.write_bytes(b"not a model")
+        with pytest.raises(ValueError, match="not an ssmsolve model"):
+            _io.load(path)
+        _io.save(dense, path)
+        data = bytearray(path.read_bytes())
+        data[8] = _io.FORMAT_VERSION + 1
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="format version"):
+            _io.load(path)
+
+
+# ---------------------------------------------------------------------------
+# Frequency response
+# ---------------------------------------------------------------------------
+
+
+def _dense_frequency_response(sys, frequencies):
+    """Reference with one dense solve per frequency."""
+    A, B, C, D = (M.astype(np.float64) for M in (sys._A, sys._B, sys._C, sys._D))
+    z = np.exp(2j * np.pi * frequencies / sys.sampling_rate)
+    return np.stack([C @ np.linalg.solve(zk * np.eye(sys.n_states) - A, B) + D for zk in z], axis=-1)
+
+
+class TestFrequencyResponse:
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("cls", [StateSpaceModel, TriangularStateSpaceModel, DiagonalStateSpaceModel])
+    def test_matches_dense_solve(self, cls, dtype):
+        dense, _ = _make_modal_system()
+        dense.D[...] = _rng.random(dense.D.shape)
+        sys = cls(dense.A, dense.B, dense.C, dense.D, sampling_rate=1, dtype=dtype)
+        f = np.linspace(0, 0.5, 101)
+        H = sys.frequency_response(f)
+        assert H.shape == (sys.n_outputs, sys.n_inputs, len(f))
+        assert H.dtype == (np.complex64 if dtype == np.float32 else np.complex128)
+        rtol = 1e-4 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(H, _dense_frequency_response(dense, f), rtol=rtol, atol=rtol * np.abs(H).max())
+
+    def test_parallel_matches_sequential(self, monkeypatch):
+        dense, _ = _make_modal_system()
+        f = np.linspace(0, 0.5, 1001)
+        H = dense.frequency_response(f)
+        # chunks of 10 frequencies
+        monkeypatch.setattr(_m, "_CHUNK_SIZE", 10 * dense.n_states * dense.n_inputs)
+        sys = StateSpaceModel.from_pyfar(dense, n_workers=3)
+        np.testing.assert_allclose(sys.frequency_response(f), H, rtol=1e-12)
+
+
+# ---------------------------------------------------------------------------
+# Concurrent processing
+# ---------------------------------------------------------------------------
+
+
+class TestProcessMany:
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_matches_sequential(self, backend):
+        systems = [_make_system(n=16, T=256) for _ in range(5)]
+        refs = [_chunked(sys, sig) for sys, sig in systems]
+        models = [StateSpaceModel.from_pyfar(sys, backend=backend) for sys, _ in systems]
+        for sys in models:
+            sys.init_state()
+        out = process_many(models, [sig for _, sig in systems], n_workers=3)
+        for sys, y, ref in zip(models, out, refs, strict=True):
+            np.testing.assert_allclose(y.time, ref, rtol=1e-10)
+            assert np.all(sys.state != 0)
+
+    def test_rejects_shared_model(self):
+        sys, sig = _make_system()
+        with pytest.raises(AssertionError):
+            process_many([sys, sys], [sig, sig])
+
+
+# ---------------------------------------------------------------------------
+# Silent input
+# ---------------------------------------------------------------------------
+
+SOLVER_BACKENDS = [name for name in available_backends() if name != "pyfar"]
+
+
+class TestSilentInput:
+    @pytest.mark.parametrize("backend", SOLVER_BACKENDS)
+    def test_decay_error_is_bounded(self, backend):
+        dense, _ = _make_modal_system(n=24, T=400)
+        sys = StateSpaceModel.from_pyfar(dense, backend=backend)
+        sig = _bursty(sys.n_inputs, 400)
+        ref = _pyfar_reference(sys, sig)
+        error_energy = 1e-8
+        sys.silence_threshold = sys.decay_threshold(error_energy)
+        sys.init_state()
+        out = sys.process(sig).time
+        # at most one reset per silent span, here one after every burst
+        assert np.sum((out - ref) ** 2) <= 4 * error_energy
+        # the recursion stopped before the end of the last silent span
+        assert np.all(sys.state == 0) and np.all(out[:, -10:] == 0)
+
+    @pytest.mark.parametrize("backend", SOLVER_BACKENDS)
+    def test_block_api_matches_process(self, backend):
+        dense, _ = _make_modal_system(n=24, T=400)
+        sys = StateSpaceModel.from_pyfar(dense, backend=backend, silence_threshold=1e-3)
+        sig = _bursty(sys.n_inputs, 400)
+        sys.init_state()
+        ref = sys.process(sig).time
+        np.testing.assert_array_equal(_blockwise(sys, sig), ref)
+
+    def test_decay_threshold_requires_stable_system(self):
+        sys, _ = _make_system()
+        unstable = StateSpaceModel(1.1 * np.eye(4), np.ones((4, 1)), np.ones((1, 4)))
+        assert sys.decay_threshold(1e-12) > 0
+        with pytest.raises(AssertionError):
+            unstable.decay_threshold(1e-12)
+
+
+# ---------------------------------------------------------------------------
+# Output maps
+# ---------------------------------------------------------------------------
+
+OUTPUT_MODELS = ["dense", "triangular", "diagonal"]
+
+
+def _output_model(kind, backend, method):
+    dense, sig = _make_modal_system(n=24, T=144)
+    sys = {
+        "dense": StateSpaceModel,
+        "triangular": TriangularStateSpaceModel,
+        "diagonal": DiagonalStateSpaceModel,
+    }[kind].from_pyfar(dense, method=method, backend=backend)
+    return sys, sig, dense
+
+
+class TestOutputMaps:
+    @pytest.mark.parametrize("backend", [*SOLVER_BACKENDS, "pyfar"])
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("kind", OUTPUT_MODELS)
+    def test_selection_matches_all_outputs(self, kind, backend, method):
+        sys, sig, _ = _output_model(kind, backend, method)
+        sys.init_state()
+        ref = sys.process(sig).time
+        sys.outputs = [3, 1]
+        sys.init_state()
+        np.testing.assert_allclose(sys.process(sig).time, ref[[3, 1]], rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(_blockwise(sys, sig), ref[[3, 1]], rtol=1e-12, atol=1e-12)
+        sys.outputs = None
+        assert _blockwise(sys, sig).shape == ref.shape
+
+    @pytest.mark.parametrize("backend", [*SOLVER_BACKENDS, "pyfar"])
+    @pytest.mark.parametrize("method", METHODS)
+    @pytest.mark.parametrize("kind", OUTPUT_MODELS)
+    @pytest.mark.parametrize("crossfade", [0, 40])
+    def test_crossfade_mixes_both_maps(self, kind, backend, method, crossfade):
+        sys, sig, dense = _output_model(kind, backend, method)
+        sys.init_state()
+        ref = sys.process(sig).time
+        # the new map reverses and doubles the outputs, given in the original coordinates
+        C, D = dense.C[::-1] * 2, dense.D[::-1] * 2
+        gain = np.minimum(np.arange(1, 105) / max(crossfade, 1), 1)
+        expected = ref.copy()
+        expected[:, 40:] += gain * (2 * ref[::-1, 40:] - ref[:, 40:])
+        sys.outputs = [0, 2]
+        sys.init_state()
+        first = sys.process(Signal(sig.time[:, :40], sampling_rate=1)).time
+        sys.set_output_map(C, D, crossfade=crossfade)
+        # the fade continues across calls
+        rest = _chunked_from(sys, sig.time[:, 40:], chunk=24)
+        np.testing.assert_allclose(np.hstack([first, rest]), expected[[0, 2]], rtol=1e-12, atol=1e-12)
+        assert sys._fade is None
+
+    @pytest.mark.parametrize("backend", SOLVER_BACKENDS)
+    @pytest.mark.parametrize("dtype", DTYPES, ids=DTYPE_IDS)
+    @pytest.mark.parametrize("storage", STORAGES, ids=STORAGE_IDS)
+    def test_crossfade_kernel_in_block_api(self, backend, dtype, storage):
+        sys, sig = _make_system(n=40, p=3, T=96, dtype=dtype, storage=storage)
+        sys.backend = backend
+        sys.outputs = [2]
+        C = np.asarray(sys._C[::-1] * 2, order=storage)
+        assert sys._crossfade_kernel() is not None
+        sys.init_state()
+        ref = sys.process(sig).time
+        sys.init_state()
+        u, out = sys.init_block(16)
+        sys.set_output_map(C, crossfade=40)
+        chunks = []
+        for i in range(0, sig.n_samples, 16):
+            u[...] = sig.time[:, i : i + 16]
+            chunks.append(sys.process_block(u, out).copy())
+        gain = np.minimum(np.arange(1, 97) / 40, 1)
+        # the selected output 2 fades to twice the output 0
+        expected = ref + gain * (_pyfar_reference(StateSpaceModel(sys._A, sys._B, C[[2]]), sig) - ref)
+        tol = 1e-5 if dtype == np.float32 else 1e-10
+        np.testing.assert_allclose(np.hstack(chunks), expected, rtol=tol, atol=tol)
+        # no copy of a map in the working dtype and storage
+        assert sys._C is C
+
+    def test_quantized_has_no_output_maps(self):
+        sys, _ = _make_system()
+        quantized = QuantizedStateSpaceModel(sys._A, sys._B, sys._C, sampling_rate=1)
+        with pytest.raises(AssertionError):
+            quantized.outputs = [0]
+        with pytest.raises(AssertionError):
+            quantized.set_output_map(sys._C)
+
+    def test_selection_is_validated(self):
+        sys, _ = _make_system()
+        with pytest.raises(AssertionError):
+            sys.outputs = [sys.n_outputs]
+        with pytest.raises(AssertionError):
+            sys.set_output_map(sys._C[:1])
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation
+# ---------------------------------------------------------------------------
+
+
+class TestInstrumentation:
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_phases_and_tags(self, backend):
+        sys, sig = _make_system(n=16, m=3, p=4, T=100, dtype=np.float32, storage="C")
+        sys.backend = backend
+        sys.init_state()
+        events = []
+        with _instrumentation.instrument(events.append) as stats:
+            sys.process(sig)
+            sys.process(sig)
+        assert not _instrumentation._ENABLED
+        assert len(events) == 2
+        tags = events[0]["tags"]
+        assert (tags["backend"], tags["dtype"], tags["storage"]) == (backend, "float32", "C")
+        phases = {"convert", "solve", "wrap"} | ({"allocate"} if backend != "pyfar" else set())
+        assert set(events[0]["seconds"]) == phases
+        [row] = stats.summary()
+        assert (row["operation"], row["calls"], row["samples"]) == ("StateSpaceModel.process", 2, 200)
+        assert row["flops"] == 200 * 2 * (16 + 4) * (16 + 3)
+        assert row["total"] == pytest.approx(sum(row["seconds"].values()))
+        assert row["samples_per_second"] > 0 and row["gflops"] > 0
+
+    def test_disabled_records_nothing(self):
+        sys, sig = _make_system()
+        with _instrumentation.instrument() as stats:
+            pass
+        ref = _pyfar_reference(sys, sig)
+        sys.init_state()
+        np.testing.assert_allclose(sys.process(sig).time, ref, rtol=1e-10)
+        assert stats.summary() == []
+
+    def test_nested_stages_are_exclusive(self):
+        with _instrumentation.instrument() as stats:
+            with _instrumentation.stage("reduction", "outer", dtype="float64"):
+                for _ in range(3):
+                    with _instrumentation.stage("reduction", "inner", dtype="float64"):
+                        pass
+        [row] = stats.summary()
+        assert row["calls"] == 4 and set(row["seconds"]) == {"outer", "inner"}
+        assert _instrumentation._local.stages == []
+
+
+# ---------------------------------------------------------------------------
+# Backend selection
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def tuning_cache(tmp_path, monkeypatch):
+    """Empty autotuning cache in a temporary directory."""
+    monkeypatch.setenv("SSMSOLVE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(_autotune, "_decisions", None)
+    return tmp_path / "autotune.json"
+
+
+class TestBackendSelection:
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_override_matches_pyfar(self, backend):
+        sys, sig = _make_system()
+        ref = _pyfar_reference(sys, sig)
+        sys.backend = backend
+        assert sys.backend == backend
+        # the override is independent of the import-time kernels
+        orig = _patch_backend(None)
+        try:
+            sys.init_state()
+            np.testing.assert_allclose(sys.process(sig).time, ref, rtol=1e-10, atol=1e-12)
+        finally:
+            _restore_backend(orig)
+
+    def test_autotune_matches_pyfar(self, tuning_cache):
+        dense, sig = _make_modal_system()
+        ref = _pyfar_reference(dense, sig)
+        for cls in (StateSpaceModel, DiagonalStateSpaceModel, TriangularStateSpaceModel):
+            sys = cls.from_pyfar(dense, backend="autotune")
+            np.testing.assert_allclose(_blockwise(sys, sig), ref, rtol=0, atol=1e-10)
+            assert sys.backend in available_backends()
+
+    def test_autotune_decision_is_persisted(self, tuning_cache, monkeypatch):
+        sys, sig = _make_system(T=100)
+        sys.backend = "autotune"
+        sys.init_state()
+        sys.process(sig)
+        decision = {"backend": sys.backend, "storage": sys.storage, "method": sys.method}
+        with open(tuning_cache) as f:
+            assert list(json.load(f).values()) == [decision]
+
+        # a new model of the same shape reuses the decision from disk without measuring
+        def _fail(*args):
+            raise AssertionError("measured again")
+
+        monkeypatch.setattr(_autotune, "_decisions", None)
+        monkeypatch.setattr(_autotune, "_measure", _fail)
+        other, _ = _make_system(T=100)
+        other.backend = "autotune"
+        other.init_block(128)
+        assert (other.backend, other.storage, other.method) == tuple(decision.values())
+
+    def test_autotune_keeps_silence_threshold(self, tuning_cache):
+        sys, _ = _make_system(T=100)
+        sys.silence_threshold = 0
+        sys.backend = "autotune"
+        sys.init_block(128)
+        assert sys.method == "sample" and sys._silent()
+        with open(tuning_cache) as f:
+            (key,) = json.load(f)
+        assert json.loads(key)["silence_threshold"] == 0
+        # the decision depends on the threshold, so changing it tunes again
+        sys.silence_threshold = None
+        sys.init_block(128)
+        with open(tuning_cache) as f:
+            assert len(json.load(f)) == 2
+
+    def test_autotune_key_distinguishes_structure(self, tuning_cache):
+        dense, _ = _make_modal_system()
+        models = [
+            TriangularStateSpaceModel.from_pyfar(dense),
+            TriangularStateSpaceModel.from_pyfar(dense, packed=True),
+            QuantizedStateSpaceModel.from_pyfar(dense, matrix_dtype="int8"),
+            QuantizedStateSpaceModel.from_pyfar(dense, matrix_dtype="float16"),
+        ]
+        keys = [_autotune._key(sys, 128) for sys in models]
+        assert len(set(keys)) == len(keys)
+        assert [json.loads(key)["packed"] for key in keys] == [False, True, None, None]
+        assert [json.loads(key)["matrix_dtype"] for key in keys] == [None, None, "int8", "float16"]
+
+
+# ---------------------------------------------------------------------------
+# Import time
+# ---------------------------------------------------------------------------
+
+
+def _import_profile(statement):
+    """Cumulative import time in seconds of every module imported by ``statement``.
+
+    Runs ``statement`` in a fresh interpreter with ``python -X importtime``.
+    """
+    result = subprocess.run(
+        [_sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if line.startswith("import time:") and len(fields) == 3 and fields[1].strip().isdigit():
+            profile[fields[2].strip()] = int(fields[1]) * 1e-6
+    return profile
+
+
+class TestImportTime:
+    def test_package_import_is_cheap(self):
+        profile = _import_profile("import ssmsolve")
+        assert "ssmsolve" in profile
+        assert not {"numpy", "numba", "ssmsolve_rs", "pyfar"} & profile.keys()
+
+    def test_backend_is_imported_on_first_use(self):
+        profile = _import_profile("import ssmsolve.models")
+        assert not {"numba", "ssmsolve_rs"} & profile.keys()
+        # the detected backend is imported when it is first needed
+        profile = _import_profile("import ssmsolve; ssmsolve.BACKEND")
+        dependency = {"rust": "ssmsolve_rs", "numba": "numba", "pyfar": "ssmsolve"}[available_backends()[0]]
+        assert dependency in profile